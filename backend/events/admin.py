@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Event
+from .models import Event, EventOccurrenceOverride
 
 
 @admin.register(Event)
@@ -9,7 +9,10 @@ class EventAdmin(admin.ModelAdmin):
     list_display = ['title', 'pet', 'owner', 'event_type', 'event_date', 'send_reminder']
     list_filter = ['event_type', 'send_reminder', 'event_date', 'created_at']
     search_fields = ['title', 'pet__name', 'owner__username']
-    readonly_fields = ['reminder_sent_at', 'created_at', 'updated_at']
+    readonly_fields = [
+        'recurrence_end', 'reminder_sent_at', 'reminder_claimed_until', 'reminder_claim_token',
+        'created_at', 'updated_at'
+    ]
     date_hierarchy = 'event_date'
 
     fieldsets = [
@@ -17,10 +20,20 @@ class EventAdmin(admin.ModelAdmin):
             'fields': ('owner', 'pet', 'title', 'event_type', 'description')
         }),
         ('Schedule', {
-            'fields': ('event_date', 'send_reminder', 'reminder_sent_at')
+            'fields': ('event_date', 'rrule', 'recurrence_end', 'send_reminder', 'reminder_sent_at')
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     ]
+
+
+@admin.register(EventOccurrenceOverride)
+class EventOccurrenceOverrideAdmin(admin.ModelAdmin):
+    """Admin interface for EventOccurrenceOverride model."""
+
+    list_display = ['event', 'original_date', 'event_date', 'is_cancelled']
+    list_filter = ['is_cancelled']
+    search_fields = ['event__title', 'event__pet__name']
+    readonly_fields = ['created_at', 'updated_at']
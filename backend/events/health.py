@@ -0,0 +1,128 @@
+"""
+Health due dates (vaccinations, vet visits, grooming, medication).
+
+For every pet and health event type, HealthDueDate stores when the task was
+last done, whether it is already scheduled and when it is next due according
+to settings.HEALTH_DUE_INTERVALS. The rows for a set of pets are computed from
+a single date-windowed query over their events and replaced in one bulk
+write, so dashboards read a small table instead of scanning events per pet.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from pets.caching import bump_version
+from pets.models import Pet
+
+from .models import Event, HealthDueDate
+from .recurrence import Series, parse_rrule, window_q
+
+# History older than this is ignored; with the default intervals anything
+# that old would be overdue anyway
+LOOKBACK_INTERVALS = 2
+
+
+def health_intervals():
+    return {
+        event_type: timedelta(days=days)
+        for event_type, days in settings.HEALTH_DUE_INTERVALS.items()
+    }
+
+
+def _last_and_next(event_date, rrule, now):
+    """(latest occurrence <= now, earliest occurrence > now) for one event."""
+    if not rrule:
+        return (event_date, None) if event_date <= now else (None, event_date)
+    series = Series(parse_rrule(rrule), event_date)
+    index = series.first_index_at_or_after(now)
+    if series.occurrence(index) == now:
+        index += 1
+    previous = series.occurrence(index - 1) if index else None
+    upcoming = series.occurrence(index)
+    if not series.in_bounds(index, upcoming):
+        upcoming = None
+        # The series ended; its final occurrence is the last one done
+        previous = series.last()
+    return previous, upcoming
+
+
+def compute_due_dates(pet_ids, now=None):
+    """Unsaved HealthDueDate rows for the given pets, from one query."""
+    now = now or timezone.now()
+    intervals = health_intervals()
+    if not intervals or not pet_ids:
+        return []
+    longest = max(intervals.values())
+    rows = Event.objects.filter(
+        window_q(now - longest * LOOKBACK_INTERVALS, now + longest),
+        pet_id__in=pet_ids,
+        event_type__in=intervals,
+    ).values_list('pet_id', 'event_type', 'event_date', 'rrule')
+
+    state = {}
+    for pet_id, event_type, event_date, rrule in rows.iterator(chunk_size=2000):
+        previous, upcoming = _last_and_next(event_date, rrule, now)
+        last_done, scheduled_for = state.get((pet_id, event_type), (None, None))
+        if previous and (last_done is None or previous > last_done):
+            last_done = previous
+        if upcoming and (scheduled_for is None or upcoming < scheduled_for):
+            scheduled_for = upcoming
+        state[(pet_id, event_type)] = (last_done, scheduled_for)
+
+    return [
+        HealthDueDate(
+            pet_id=pet_id,
+            event_type=event_type,
+            last_done=last_done,
+            scheduled_for=scheduled_for,
+            next_due=last_done + intervals[event_type] if last_done else scheduled_for,
+        )
+        for (pet_id, event_type), (last_done, scheduled_for) in state.items()
+    ]
+
+
+def refresh_health_due_dates(pet_ids=None, owner_id=None, now=None):
+    """Recompute the due dates of the given pets or of one owner's pets."""
+    pets = Pet.objects.all()
+    if owner_id is not None:
+        pets = pets.filter(owner_id=owner_id)
+    if pet_ids is not None:
+        pets = pets.filter(id__in=pet_ids)
+    pet_owners = dict(pets.values_list('id', 'owner_id'))
+    pet_ids = list(pet_owners)
+    rows = compute_due_dates(pet_ids, now)
+    with transaction.atomic():
+        HealthDueDate.objects.filter(pet_id__in=pet_ids).delete()
+        HealthDueDate.objects.bulk_create(rows, batch_size=1000)
+        for owner_id in set(pet_owners.values()):
+            transaction.on_commit(lambda owner_id=owner_id: bump_version('dashboard', owner_id))
+    return len(rows)
+
+
+def rebuild_health_due_dates(owners_per_batch=200, now=None):
+    """Recompute due dates for every pet, a batch of owners at a time."""
+    now = now or timezone.now()
+    owner_ids = list(
+        Pet.objects.order_by('owner_id').values_list('owner_id', flat=True).distinct()
+    )
+    written = 0
+    for offset in range(0, len(owner_ids), owners_per_batch):
+        pet_ids = list(Pet.objects.filter(
+            owner_id__in=owner_ids[offset:offset + owners_per_batch]
+        ).values_list('id', flat=True))
+        written += refresh_health_due_dates(pet_ids=pet_ids, now=now)
+    return written
+
+
+def health_status(due, now=None):
+    """'overdue', 'due_soon' or 'ok' for a HealthDueDate row."""
+    now = now or timezone.now()
+    if due.next_due is None:
+        return 'ok'
+    if due.next_due < now and not due.scheduled_for:
+        return 'overdue'
+    if due.next_due <= now + timedelta(days=settings.HEALTH_DUE_SOON_DAYS):
+        return 'due_soon'
+    return 'ok'
@@ -0,0 +1,124 @@
+"""
+Per-user iCalendar feed.
+
+Calendar apps cannot send a JWT, so the feed URL carries a signed token that
+identifies the user and their auth version, which revokes it along with
+their JWTs. The feed is written as a stream, one VEVENT at a time. Its ETag and
+Last-Modified come from a single aggregate query (latest updated_at and row
+counts), so polling clients mostly get a 304 without the feed being rendered.
+"""
+from datetime import timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import Event, EventOccurrenceOverride
+
+FEED_SALT = 'events.ical-feed'
+PRODID = '-//Life of Pets//Events//EN'
+
+
+def feed_token(user):
+    return signing.Signer(salt=FEED_SALT).sign(f'{user.pk}:{user.auth_version}')
+
+
+def user_id_from_token(token):
+    """
+    The user id a feed token was issued for, or None if it is not valid or
+    the user's auth version has changed since.
+    """
+    try:
+        user_id, version = map(int, signing.Signer(salt=FEED_SALT).unsign(token).split(':'))
+    except (signing.BadSignature, ValueError):
+        return None
+    if not get_user_model().objects.filter(pk=user_id, auth_version=version, is_active=True).exists():
+        return None
+    return user_id
+
+
+def feed_state(user_id):
+    """
+    (last modified, etag) for a user's feed; deletions change the counts.
+    Pets are included because their names appear in event summaries.
+    """
+    events = Event.objects.filter(owner_id=user_id).aggregate(
+        last=Max('updated_at'), pets=Max('pet__updated_at'), count=Count('id')
+    )
+    overrides = EventOccurrenceOverride.objects.filter(event__owner_id=user_id).aggregate(
+        last=Max('updated_at'), count=Count('id')
+    )
+    stamps = [stamp for stamp in (events['last'], events['pets'], overrides['last']) if stamp]
+    last_modified = max(stamps) if stamps else None
+    etag = f"{events['count']}-{overrides['count']}-{last_modified.timestamp() if last_modified else 0}"
+    return last_modified, etag
+
+
+def _escape(text):
+    return (
+        text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    """Fold a content line at 75 octets as RFC 5545 requires."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts, start = [], 0
+    limit = 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Do not split a multi-byte character
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode('utf-8'))
+        start, limit = end, 74
+    return '\r\n '.join(parts) + '\r\n'
+
+
+def _stamp(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _vevent(event, dtstamp, override=None):
+    uid = f'event-{event.id}@lifeofpets'
+    lines = ['BEGIN:VEVENT', f'UID:{uid}', f'DTSTAMP:{dtstamp}']
+    if override is None:
+        lines.append(f'DTSTART:{_stamp(event.event_date)}')
+        title, description = event.title, event.description
+        if event.rrule:
+            lines.append(f'RRULE:{event.rrule}')
+            cancelled = [o.original_date for o in event.overrides.all() if o.is_cancelled]
+            if cancelled:
+                lines.append('EXDATE:' + ','.join(_stamp(day) for day in cancelled))
+    else:
+        lines.append(f'RECURRENCE-ID:{_stamp(override.original_date)}')
+        lines.append(f'DTSTART:{_stamp(override.event_date or override.original_date)}')
+        title = override.title or event.title
+        description = override.description or event.description
+    lines.append(f'SUMMARY:{_escape(f"{title} ({event.pet.name})")}')
+    if description:
+        lines.append(f'DESCRIPTION:{_escape(description)}')
+    lines.append(f'CATEGORIES:{_escape(event.get_event_type_display())}')
+    lines.append(f'LAST-MODIFIED:{_stamp(event.updated_at)}')
+    lines.append('END:VEVENT')
+    return ''.join(_fold(line) for line in lines)
+
+
+def iter_calendar(user_id, chunk_size=500):
+    """Yield the user's calendar piece by piece."""
+    dtstamp = _stamp(timezone.now())
+    yield ''.join(_fold(line) for line in (
+        'BEGIN:VCALENDAR', 'VERSION:2.0', f'PRODID:{PRODID}', 'CALSCALE:GREGORIAN',
+        'X-WR-CALNAME:Life of Pets',
+    ))
+    events = Event.objects.filter(owner_id=user_id).select_related('pet').prefetch_related('overrides')
+    for event in events.order_by('event_date', 'id').iterator(chunk_size=chunk_size):
+        yield _vevent(event, dtstamp)
+        for override in event.overrides.all():
+            if not override.is_cancelled:
+                yield _vevent(event, dtstamp, override)
+    yield _fold('END:VCALENDAR')
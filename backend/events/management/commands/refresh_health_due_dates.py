@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from events.health import rebuild_health_due_dates
+
+
+class Command(BaseCommand):
+    """Nightly job: due dates move as time passes even without event writes."""
+
+    help = 'Recompute vaccination and other health due dates for all pets.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--owners-per-batch', type=int, default=200)
+
+    def handle(self, *args, **options):
+        written = rebuild_health_due_dates(owners_per_batch=options['owners_per_batch'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {written} health due dates.'))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_initial'),
+        ('pets', '0010_feeding_reminders'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='reminder_claim_token',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='reminder_claimed_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('reminder_sent_at__isnull', True), ('send_reminder', True)), fields=['event_date'], name='events_reminder_due'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0004_event_recurrence'),
+        ('pets', '0010_feeding_reminders'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['owner', 'event_date'], name='events_owner_date'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_event_owner_date_index'),
+        ('pets', '0010_feeding_reminders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HealthDueDate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('vaccination', 'Vaccination'), ('vet_visit', 'Vet Visit'), ('grooming', 'Grooming'), ('feeding', 'Feeding'), ('medication', 'Medication'), ('other', 'Other')], max_length=20)),
+                ('last_done', models.DateTimeField(blank=True, null=True)),
+                ('scheduled_for', models.DateTimeField(blank=True, null=True)),
+                ('next_due', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('pet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='health_due_dates', to='pets.pet')),
+            ],
+            options={
+                'db_table': 'health_due_dates',
+                'indexes': [models.Index(fields=['next_due'], name='health_due_next_due')],
+                'unique_together': {('pet', 'event_type')},
+            },
+        ),
+    ]
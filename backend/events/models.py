@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models import Q
 from django.conf import settings
 from pets.models import Pet
 
@@ -34,9 +35,17 @@ class Event(models.Model):
     description = models.TextField(blank=True)
     event_date = models.DateTimeField()
 
+    # Recurrence (RRULE subset, see events.recurrence); event_date is the
+    # first occurrence and recurrence_end the last one, null when endless
+    rrule = models.CharField(max_length=200, blank=True)
+    recurrence_end = models.DateTimeField(null=True, blank=True)
+
     # Reminder settings
     send_reminder = models.BooleanField(default=True)
     reminder_sent_at = models.DateTimeField(null=True, blank=True)
+    # Lease taken by a reminder worker while it sends this reminder
+    reminder_claimed_until = models.DateTimeField(null=True, blank=True)
+    reminder_claim_token = models.CharField(max_length=32, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -44,8 +53,88 @@ class Event(models.Model):
     def __str__(self):
         return f"{self.title} for {self.pet.name}"
 
+    def save(self, *args, **kwargs):
+        from .recurrence import series_for
+
+        self.recurrence_end = series_for(self).last() if self.rrule else None
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'rrule', 'event_date'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'recurrence_end'}
+        super().save(*args, **kwargs)
+
     class Meta:
         db_table = 'events'
         verbose_name = 'Event'
         verbose_name_plural = 'Events'
         ordering = ['event_date']
+        indexes = [
+            models.Index(fields=['owner', 'event_date'], name='events_owner_date'),
+            # Only unsent reminders are indexed, so the due scan stays small
+            models.Index(
+                fields=['event_date'],
+                name='events_reminder_due',
+                condition=Q(send_reminder=True, reminder_sent_at__isnull=True),
+            ),
+        ]
+
+
+class EventOccurrenceOverride(models.Model):
+    """A moved, edited or cancelled occurrence of a recurring event."""
+
+    event = models.ForeignKey(
+        Event,
+        on_delete=models.CASCADE,
+        related_name='overrides'
+    )
+    # Date the occurrence would have had according to the rule
+    original_date = models.DateTimeField()
+    is_cancelled = models.BooleanField(default=False)
+    # Blank fields fall back to the event's own values
+    event_date = models.DateTimeField(null=True, blank=True)
+    title = models.CharField(max_length=200, blank=True)
+    description = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.event.title} on {self.original_date:%Y-%m-%d}"
+
+    class Meta:
+        db_table = 'event_occurrence_overrides'
+        unique_together = ['event', 'original_date']
+        indexes = [
+            models.Index(fields=['event_date'], name='event_override_moved_date'),
+        ]
+
+
+class HealthDueDate(models.Model):
+    """
+    Cached next-due date of a recurring health task for a pet, computed from
+    its events by events.health. Rebuilt on event writes and nightly.
+    """
+
+    pet = models.ForeignKey(
+        Pet,
+        on_delete=models.CASCADE,
+        related_name='health_due_dates'
+    )
+    event_type = models.CharField(max_length=20, choices=Event.EVENT_TYPES)
+    # Most recent occurrence in the past, if any
+    last_done = models.DateTimeField(null=True, blank=True)
+    # Earliest upcoming occurrence already on the calendar, if any
+    scheduled_for = models.DateTimeField(null=True, blank=True)
+    # last_done plus the interval for this type
+    next_due = models.DateTimeField(null=True, blank=True)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.get_event_type_display()} for pet {self.pet_id}"
+
+    class Meta:
+        db_table = 'health_due_dates'
+        unique_together = ['pet', 'event_type']
+        indexes = [
+            models.Index(fields=['next_due'], name='health_due_next_due'),
+        ]
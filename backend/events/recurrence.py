@@ -0,0 +1,246 @@
+"""
+Recurring events.
+
+An Event with an rrule describes a whole series; occurrences are never stored.
+They are computed arithmetically for the requested window only: the index of
+the first occurrence at or after the window start is derived directly from
+the rule, so expanding a month costs O(occurrences in the month) no matter
+how old the series is. Moved or cancelled occurrences are stored sparsely as
+EventOccurrenceOverride rows keyed by their original date.
+
+Supported RRULE subset: FREQ=DAILY|WEEKLY|MONTHLY|YEARLY, INTERVAL, COUNT
+and UNTIL. Monthly and yearly rules starting on a day the target month lacks
+(e.g. the 31st) fall on that month's last day.
+"""
+import calendar
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import EventOccurrenceOverride
+
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')
+FIXED_STEPS = {'DAILY': timedelta(days=1), 'WEEKLY': timedelta(weeks=1)}
+MONTH_STEPS = {'MONTHLY': 1, 'YEARLY': 12}
+
+
+@dataclass(frozen=True)
+class Rule:
+    freq: str
+    interval: int = 1
+    count: int = None
+    until: datetime = None
+
+
+def _parse_until(value):
+    for fmt in ('%Y%m%dT%H%M%SZ', '%Y%m%dT%H%M%S', '%Y%m%d'):
+        try:
+            parsed = datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+        if fmt == '%Y%m%d':
+            parsed = parsed.replace(hour=23, minute=59, second=59)
+        if fmt.endswith('Z'):
+            return parsed.replace(tzinfo=dt_timezone.utc)
+        return timezone.make_aware(parsed)
+    raise ValueError(f'Invalid UNTIL value: {value}')
+
+
+def parse_rrule(value):
+    """Parse an RRULE string such as 'FREQ=WEEKLY;INTERVAL=2;COUNT=10'."""
+    value = value.strip()
+    if value.upper().startswith('RRULE:'):
+        value = value[6:]
+    parts = {}
+    for part in filter(None, value.split(';')):
+        key, sep, item = part.partition('=')
+        if not sep or not item:
+            raise ValueError(f'Invalid rule part: {part}')
+        parts[key.strip().upper()] = item.strip()
+
+    unsupported = parts.keys() - {'FREQ', 'INTERVAL', 'COUNT', 'UNTIL'}
+    if unsupported:
+        raise ValueError(f"Unsupported rule parts: {', '.join(sorted(unsupported))}")
+    freq = parts.get('FREQ', '').upper()
+    if freq not in FREQUENCIES:
+        raise ValueError(f"FREQ must be one of {', '.join(FREQUENCIES)}")
+    try:
+        interval = int(parts.get('INTERVAL', 1))
+        count = int(parts['COUNT']) if 'COUNT' in parts else None
+    except ValueError:
+        raise ValueError('INTERVAL and COUNT must be integers')
+    if interval < 1 or (count is not None and count < 1):
+        raise ValueError('INTERVAL and COUNT must be positive')
+    if count is not None and 'UNTIL' in parts:
+        raise ValueError('COUNT and UNTIL cannot be combined')
+    until = _parse_until(parts['UNTIL']) if 'UNTIL' in parts else None
+    return Rule(freq=freq, interval=interval, count=count, until=until)
+
+
+def _add_months(local_start, months):
+    month_index = local_start.month - 1 + months
+    year, month = local_start.year + month_index // 12, month_index % 12 + 1
+    day = min(local_start.day, calendar.monthrange(year, month)[1])
+    return local_start.replace(year=year, month=month, day=day)
+
+
+def _months_between(earlier, later):
+    return (later.year - earlier.year) * 12 + later.month - earlier.month
+
+
+class Series:
+    """Occurrence arithmetic for one event's rule, in local wall-clock time."""
+
+    def __init__(self, rule, dtstart):
+        self.rule = rule
+        self.dtstart = dtstart
+        # Steps are added to local wall time so a 9:00 series stays at 9:00
+        # across DST changes
+        self.local_start = timezone.localtime(dtstart).replace(tzinfo=None)
+
+    def occurrence(self, index):
+        """The index-th occurrence (0-based), ignoring COUNT and UNTIL."""
+        if self.rule.freq in FIXED_STEPS:
+            local = self.local_start + FIXED_STEPS[self.rule.freq] * (self.rule.interval * index)
+        else:
+            local = _add_months(self.local_start, MONTH_STEPS[self.rule.freq] * self.rule.interval * index)
+        return timezone.make_aware(local)
+
+    def first_index_at_or_after(self, moment):
+        """Smallest index whose occurrence is at or after moment."""
+        if moment <= self.dtstart:
+            return 0
+        local = timezone.localtime(moment).replace(tzinfo=None)
+        if self.rule.freq in FIXED_STEPS:
+            step = FIXED_STEPS[self.rule.freq] * self.rule.interval
+            index = (local - self.local_start) // step
+        else:
+            step_months = MONTH_STEPS[self.rule.freq] * self.rule.interval
+            index = _months_between(self.local_start, local) // step_months
+        # The estimate can be off by one around DST shifts and month ends
+        index = max(index - 1, 0)
+        while self.occurrence(index) < moment:
+            index += 1
+        return index
+
+    def in_bounds(self, index, value):
+        if self.rule.count is not None and index >= self.rule.count:
+            return False
+        return self.rule.until is None or value <= self.rule.until
+
+    def between(self, start, end):
+        """Yield occurrence datetimes in [start, end)."""
+        index = self.first_index_at_or_after(start)
+        while True:
+            value = self.occurrence(index)
+            if value >= end or not self.in_bounds(index, value):
+                return
+            yield value
+            index += 1
+
+    def last(self):
+        """Datetime of the final occurrence, or None for an endless series."""
+        if self.rule.count is not None:
+            return self.occurrence(self.rule.count - 1)
+        if self.rule.until is not None:
+            if self.rule.until < self.dtstart:
+                return self.dtstart
+            index = self.first_index_at_or_after(self.rule.until)
+            if self.occurrence(index) > self.rule.until:
+                index -= 1
+            return self.occurrence(index)
+        return None
+
+
+def window_q(start=None, end=None):
+    """
+    Events that have an occurrence in [start, end): single events by their
+    date, recurring series by their span. Either bound may be None.
+    """
+    single = Q(rrule='')
+    recurring = ~Q(rrule='')
+    if start is not None:
+        single &= Q(event_date__gte=start)
+        recurring &= Q(recurrence_end__isnull=True) | Q(recurrence_end__gte=start)
+    if end is not None:
+        single &= Q(event_date__lt=end)
+        recurring &= Q(event_date__lt=end)
+    return single | recurring
+
+
+def series_for(event):
+    return Series(parse_rrule(event.rrule), event.event_date)
+
+
+def expand_events(events, overrides, start, end):
+    """
+    Turn events (recurring or not) into occurrence dicts within [start, end),
+    sorted by date. overrides are EventOccurrenceOverride rows for the given
+    events whose original or moved date touches the window.
+    """
+    by_key = {(o.event_id, o.original_date): o for o in overrides}
+    events_by_id = {event.id: event for event in events}
+    occurrences = []
+
+    def add(event, original_date, override=None):
+        occurrence_date = original_date
+        if override is not None:
+            if override.is_cancelled:
+                return
+            occurrence_date = override.event_date or original_date
+            if not start <= occurrence_date < end:
+                return
+        occurrences.append({
+            'event': event,
+            'original_date': original_date,
+            'event_date': occurrence_date,
+            'title': (override and override.title) or event.title,
+            'description': (override and override.description) or event.description,
+            'is_recurring': bool(event.rrule),
+            'is_override': override is not None,
+        })
+
+    for event in events:
+        if not event.rrule:
+            if start <= event.event_date < end:
+                add(event, event.event_date)
+            continue
+        series = series_for(event)
+        for original_date in series.between(start, end):
+            add(event, original_date, by_key.pop((event.id, original_date), None))
+
+    # Occurrences moved into the window from outside it
+    for (event_id, original_date), override in by_key.items():
+        event = events_by_id.get(event_id)
+        if event is None or not override.event_date or start <= original_date < end:
+            continue
+        if not start <= override.event_date < end:
+            continue
+        series = series_for(event)
+        index = series.first_index_at_or_after(original_date)
+        if series.occurrence(index) == original_date and series.in_bounds(index, original_date):
+            add(event, original_date, override)
+
+    occurrences.sort(key=lambda item: (item['event_date'], item['event'].id))
+    return occurrences
+
+
+def occurrences_between(events, start, end):
+    """
+    Load and expand the occurrences of events (a queryset of one owner's
+    events) within [start, end).
+    """
+    # Series whose span touches the window, plus any whose occurrence was
+    # moved into it; older occurrences are never materialised
+    moved_into_window = EventOccurrenceOverride.objects.filter(
+        event__in=events, event_date__gte=start, event_date__lt=end
+    ).values('event_id')
+    events = list(events.filter(window_q(start, end) | Q(id__in=moved_into_window)))
+    recurring_ids = [event.id for event in events if event.rrule]
+    overrides = EventOccurrenceOverride.objects.filter(event_id__in=recurring_ids).filter(
+        Q(original_date__gte=start, original_date__lt=end)
+        | Q(event_date__gte=start, event_date__lt=end)
+    )
+    return expand_events(events, overrides, start, end)
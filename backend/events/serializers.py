@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from .models import Event
+from .health import health_status
+from .models import Event, EventOccurrenceOverride, HealthDueDate
+from .recurrence import parse_rrule
 
 
 class EventSerializer(serializers.ModelSerializer):
@@ -13,18 +15,75 @@ class EventSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'owner', 'owner_username', 'pet', 'pet_name',
             'title', 'event_type', 'description', 'event_date',
+            'rrule', 'recurrence_end',
             'send_reminder', 'reminder_sent_at',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'owner', 'reminder_sent_at', 'created_at', 'updated_at']
+        read_only_fields = [
+            'id', 'owner', 'recurrence_end', 'reminder_sent_at', 'created_at', 'updated_at'
+        ]
 
     def create(self, validated_data):
         # Set the owner to the current user
         validated_data['owner'] = self.context['request'].user
         return super().create(validated_data)
 
+    def validate_rrule(self, value):
+        """Accept only the supported RRULE subset, stored without an 'RRULE:' prefix."""
+        if value:
+            try:
+                parse_rrule(value)
+            except ValueError as exc:
+                raise serializers.ValidationError(str(exc))
+            value = value.strip()
+            if value.upper().startswith('RRULE:'):
+                value = value[6:]
+        return value
+
     def validate_pet(self, value):
         """Ensure user can only create events for their own pets."""
         if value.owner != self.context['request'].user:
             raise serializers.ValidationError("You can only create events for your own pets.")
         return value
+
+
+class EventOccurrenceOverrideSerializer(serializers.ModelSerializer):
+    """Serializer for moving, editing or cancelling one occurrence."""
+
+    class Meta:
+        model = EventOccurrenceOverride
+        fields = [
+            'id', 'event', 'original_date', 'is_cancelled',
+            'event_date', 'title', 'description',
+            'created_at', 'updated_at'
+        ]
+        read_only_fields = ['id', 'event', 'created_at', 'updated_at']
+
+
+class EventOccurrenceSerializer(serializers.Serializer):
+    """Read-only serializer for occurrences expanded from events."""
+
+    event = serializers.IntegerField(source='event.id')
+    pet = serializers.IntegerField(source='event.pet_id')
+    pet_name = serializers.CharField(source='event.pet.name')
+    event_type = serializers.CharField(source='event.event_type')
+    title = serializers.CharField()
+    description = serializers.CharField()
+    event_date = serializers.DateTimeField()
+    original_date = serializers.DateTimeField()
+    is_recurring = serializers.BooleanField()
+    is_override = serializers.BooleanField()
+
+
+class HealthDueDateSerializer(serializers.ModelSerializer):
+    """Serializer for a pet's cached health due date."""
+
+    status = serializers.SerializerMethodField()
+
+    class Meta:
+        model = HealthDueDate
+        fields = ['event_type', 'last_done', 'scheduled_for', 'next_due', 'status']
+        read_only_fields = fields
+
+    def get_status(self, obj):
+        return health_status(obj)
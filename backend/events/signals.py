@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from pets.dashboard import dashboard_changed
+
+from .models import Event, EventOccurrenceOverride
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def event_changed(sender, instance, **kwargs):
+    """Drop the owner's cached dashboard when an event changes."""
+    dashboard_changed(instance.owner_id)
+
+
+@receiver(post_save, sender=EventOccurrenceOverride)
+@receiver(post_delete, sender=EventOccurrenceOverride)
+def override_changed(sender, instance, **kwargs):
+    """Drop the owner's cached dashboard when an occurrence is moved or cancelled."""
+    owner_id = Event.objects.filter(pk=instance.event_id).values_list('owner_id', flat=True).first()
+    if owner_id is not None:
+        dashboard_changed(owner_id)
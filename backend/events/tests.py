@@ -1,3 +1,250 @@
-from django.test import TestCase
+import io
+import random
+from datetime import datetime, timedelta, timezone as dt_timezone
 
-# Create your tests here.
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from pets.models import Pet
+from users.models import User
+
+from .models import Event, EventOccurrenceOverride, HealthDueDate
+from .recurrence import Series, parse_rrule
+
+UTC = dt_timezone.utc
+
+
+def expand_one_by_one(rule, dtstart, start, end):
+    """Occurrences in [start, end) found by stepping through the series."""
+    series = Series(rule, dtstart)
+    found = []
+    index = 0
+    while True:
+        value = series.occurrence(index)
+        if not series.in_bounds(index, value) or value >= end:
+            return found
+        if value >= start:
+            found.append(value)
+        index += 1
+
+
+class EventTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', 'owner@example.com', 'Str0ngPass!x')
+        self.other = User.objects.create_user('other', 'other@example.com', 'Str0ngPass!x')
+        self.pet = Pet.objects.create(owner=self.user, name='Rex')
+        self.client.force_authenticate(self.user)
+
+    def create_event(self, **data):
+        data.setdefault('pet', self.pet.id)
+        return self.client.post('/api/events/', data, format='json')
+
+
+class RecurrenceTests(EventTestCase):
+    """Recurring events are expanded arithmetically and can be overridden."""
+
+    def test_between_matches_stepping(self):
+        rnd = random.Random(1)
+        for _ in range(300):
+            rrule = f"FREQ={rnd.choice(['DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY'])};INTERVAL={rnd.randint(1, 4)}"
+            if rnd.random() < .3:
+                rrule += f';COUNT={rnd.randint(1, 40)}'
+            elif rnd.random() < .3:
+                rrule += ';UNTIL=20270315T000000Z'
+            rule = parse_rrule(rrule)
+            dtstart = datetime(2024, rnd.randint(1, 12), rnd.randint(1, 28), 9, tzinfo=UTC)
+            if rnd.random() < .3:
+                dtstart = datetime(2024, 1, 31, 9, tzinfo=UTC)
+            start = dtstart + timedelta(days=rnd.randint(-30, 900))
+            end = start + timedelta(days=rnd.randint(1, 120))
+
+            series = Series(rule, dtstart)
+            self.assertEqual(list(series.between(start, end)), expand_one_by_one(rule, dtstart, start, end), rrule)
+            if rule.count or rule.until:
+                every = expand_one_by_one(rule, dtstart, dtstart, datetime(2400, 1, 1, tzinfo=UTC))
+                self.assertEqual(series.last(), every[-1] if every else dtstart)
+
+    def test_occurrences_and_overrides(self):
+        response = self.create_event(
+            title='Pill', event_type='medication', event_date='2020-01-31T09:00:00Z', rrule='FREQ=MONTHLY'
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertIsNone(response.data['recurrence_end'])
+        event_id = response.data['id']
+        self.assertEqual(
+            self.create_event(title='Bad', event_date='2020-01-31T09:00:00Z', rrule='FREQ=HOURLY').status_code, 400
+        )
+        self.create_event(title='Old', event_date='2020-01-01T09:00:00Z', rrule='FREQ=DAILY;COUNT=3')
+        self.create_event(title='Vet', event_date='2026-02-10T09:00:00Z')
+
+        response = self.client.get('/api/events/occurrences/', {'start': '2026-02-01', 'end': '2026-03-31'})
+        self.assertEqual(
+            [occurrence['event_date'] for occurrence in response.data],
+            ['2026-02-10T09:00:00Z', '2026-02-28T09:00:00Z', '2026-03-31T09:00:00Z'],
+        )
+
+        # Move the February occurrence into April and cancel March
+        response = self.client.post(f'/api/events/{event_id}/override/', {
+            'original_date': '2026-02-28T09:00:00Z', 'event_date': '2026-04-02T10:00:00Z', 'title': 'Moved',
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        response = self.client.post(f'/api/events/{event_id}/override/', {
+            'original_date': '2026-03-31T09:00:00Z', 'is_cancelled': True,
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        response = self.client.post(f'/api/events/{event_id}/override/', {
+            'original_date': '2026-03-30T09:00:00Z', 'is_cancelled': True,
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get('/api/events/occurrences/', {'start': '2026-02-01', 'end': '2026-03-31'})
+        self.assertEqual([occurrence['title'] for occurrence in response.data], ['Vet'])
+        response = self.client.get('/api/events/occurrences/', {'start': '2026-04-01', 'end': '2026-04-30'})
+        self.assertEqual(
+            [(occurrence['title'], occurrence['event_date']) for occurrence in response.data],
+            [('Moved', '2026-04-02T10:00:00Z'), ('Pill', '2026-04-30T09:00:00Z')],
+        )
+        self.assertEqual(self.client.get('/api/events/occurrences/', {'start': '2026-04-01'}).status_code, 400)
+
+    def test_recurrence_end(self):
+        self.create_event(title='Old', event_date='2020-01-01T09:00:00Z', rrule='FREQ=DAILY;COUNT=3')
+        self.assertEqual(Event.objects.get(title='Old').recurrence_end, datetime(2020, 1, 3, 9, tzinfo=UTC))
+
+
+class EventWindowAndFeedTests(EventTestCase):
+    """Date-window pagination and the iCalendar feed."""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(120):
+            Event.objects.create(
+                owner=self.user, pet=self.pet, title=f'Event {i}',
+                event_date=datetime(2026, 1, 1, 9, tzinfo=UTC) + timedelta(days=i),
+            )
+        self.series = Event.objects.create(
+            owner=self.user, pet=self.pet, title='Pill; daily, yes', rrule='FREQ=WEEKLY',
+            event_date=datetime(2025, 1, 1, 8, tzinfo=UTC), description='line1\nline2 ' + 'ü' * 80,
+        )
+        EventOccurrenceOverride.objects.create(
+            event=self.series, original_date=datetime(2025, 1, 8, 8, tzinfo=UTC), is_cancelled=True
+        )
+        EventOccurrenceOverride.objects.create(
+            event=self.series, original_date=datetime(2025, 1, 15, 8, tzinfo=UTC),
+            event_date=datetime(2025, 1, 16, 8, tzinfo=UTC),
+        )
+        other_pet = Pet.objects.create(owner=self.other, name='Tom')
+        Event.objects.create(owner=self.other, pet=other_pet, title='Other', event_date=datetime(2026, 2, 1, tzinfo=UTC))
+
+    def feed_path(self):
+        url = self.client.get('/api/events/feed/').data['url']
+        return url.replace('http://testserver', '')
+
+    def test_window_pagination(self):
+        self.assertEqual(self.client.get('/api/events/').data['count'], 121)
+        response = self.client.get('/api/events/', {'start': '2026-02-01', 'end': '2026-02-28'})
+        titles = [event['title'] for event in response.data['results']]
+        self.assertEqual(len(titles), 29)
+        self.assertIn('Pill; daily, yes', titles)
+        self.assertIsNone(response.data['next'])
+
+        response = self.client.get('/api/events/', {'start': '2026-01-01'})
+        self.assertEqual(len(response.data['results']), 50)
+        seen = [event['id'] for event in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            seen += [event['id'] for event in response.data['results']]
+        self.assertEqual(len(seen), 121)
+        self.assertEqual(len(set(seen)), 121)
+
+        self.assertEqual(self.client.get('/api/events/', {'start': '2026-02-01', 'end': '2026-01-01'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/events/', {'start': 'bad'}).status_code, 400)
+
+    def test_feed(self):
+        path = self.feed_path()
+        self.client.force_authenticate(None)
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        body = b''.join(response.streaming_content).decode()
+        self.assertEqual(body.count('BEGIN:VEVENT'), 122)
+        self.assertIn('RRULE:FREQ=WEEKLY\r\n', body)
+        self.assertIn('EXDATE:20250108T080000Z', body)
+        self.assertIn('RECURRENCE-ID:20250115T080000Z', body)
+        self.assertTrue(all(len(line.encode()) <= 75 for line in body.split('\r\n')))
+
+        etag = response['ETag']
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Event.objects.filter(title='Event 5').delete()
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        self.assertEqual(self.client.get(path[:-6] + 'x.ics').status_code, 404)
+        self.assertEqual(self.client.get('/api/events/feed/').status_code, 401)
+
+    def test_pet_rename_changes_feed(self):
+        path = self.feed_path()
+        self.client.force_authenticate(None)
+        etag = self.client.get(path)['ETag']
+        self.pet.name = 'Max'
+        self.pet.save()
+        response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        body = b''.join(response.streaming_content).decode()
+        self.assertIn('SUMMARY:Event 5 (Max)\r\n', body)
+        self.assertNotIn('(Rex)', body)
+
+    def test_password_change_revokes_feed(self):
+        path = self.feed_path()
+        self.assertEqual(self.client.get(path).status_code, 200)
+        self.user.set_password('An0therPass!x')
+        self.user.save()
+        self.assertEqual(self.client.get(path).status_code, 404)
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(self.feed_path()).status_code, 200)
+
+    def test_rrule_prefix_is_not_stored(self):
+        response = self.create_event(title='Walk', event_date='2026-01-01T09:00:00Z', rrule='RRULE:FREQ=DAILY')
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(Event.objects.get(title='Walk').rrule, 'FREQ=DAILY')
+        body = b''.join(self.client.get(self.feed_path()).streaming_content).decode()
+        self.assertIn('RRULE:FREQ=DAILY\r\n', body)
+        self.assertNotIn('RRULE:RRULE:', body)
+
+
+class HealthDueDateTests(EventTestCase):
+    """Per-pet health due dates kept up to date from events."""
+
+    def setUp(self):
+        super().setUp()
+        self.now = timezone.now()
+        self.mia = Pet.objects.create(owner=self.user, name='Mia')
+        response = self.create_event(
+            title='Rabies', event_type='vaccination', event_date=(self.now - timedelta(days=400)).isoformat()
+        )
+        self.assertEqual(response.status_code, 201, response.data)
+        self.create_event(title='Groom', event_type='grooming', event_date=(self.now - timedelta(days=10)).isoformat())
+        self.create_event(
+            pet=self.mia.id, title='Pill', event_type='medication',
+            event_date=(self.now - timedelta(days=100)).isoformat(), rrule='FREQ=MONTHLY',
+        )
+        self.create_event(pet=self.mia.id, title='Other', event_type='other', event_date=self.now.isoformat())
+
+    def test_statuses_in_pet_list(self):
+        pets = {pet['name']: pet for pet in self.client.get('/api/pets/').data['results']}
+        statuses = {due['event_type']: due['status'] for due in pets['Rex']['health_due']}
+        self.assertEqual(statuses, {'vaccination': 'overdue', 'grooming': 'ok'})
+        [medication] = pets['Mia']['health_due']
+        self.assertEqual(medication['event_type'], 'medication')
+        self.assertIsNotNone(medication['scheduled_for'])
+
+    def test_follow_event_changes(self):
+        self.create_event(
+            title='Rabies', event_type='vaccination', event_date=(self.now + timedelta(days=5)).isoformat()
+        )
+        self.assertIsNotNone(HealthDueDate.objects.get(pet=self.pet, event_type='vaccination').scheduled_for)
+
+        call_command('refresh_health_due_dates', stdout=io.StringIO())
+        self.assertEqual(HealthDueDate.objects.count(), 3)
+
+        self.client.delete(f"/api/events/{Event.objects.get(title='Groom').id}/")
+        self.assertFalse(HealthDueDate.objects.filter(event_type='grooming').exists())
@@ -1,10 +1,11 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import EventViewSet
+from .views import EventViewSet, ical_feed
 
 router = DefaultRouter()
 router.register(r'', EventViewSet, basename='event')
 
 urlpatterns = [
+    path('feed/<str:token>.ics', ical_feed, name='event-ical-feed'),
     path('', include(router.urls)),
 ]
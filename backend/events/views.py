@@ -1,7 +1,43 @@
-from rest_framework import viewsets
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import condition, require_GET
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
 from rest_framework.permissions import IsAuthenticated
-from .models import Event
-from .serializers import EventSerializer
+from rest_framework.response import Response
+
+from pets.views import parse_date_param
+
+from .health import refresh_health_due_dates
+from .ical import feed_state, feed_token, iter_calendar, user_id_from_token
+from .models import Event, EventOccurrenceOverride
+from .recurrence import occurrences_between, series_for, window_q
+from .serializers import (
+    EventOccurrenceOverrideSerializer,
+    EventOccurrenceSerializer,
+    EventSerializer,
+)
+
+MAX_OCCURRENCE_WINDOW_DAYS = 366
+
+
+def window_bounds(start_day, end_day):
+    """Aware [start, end) datetimes covering the inclusive day range."""
+    start = timezone.make_aware(datetime.combine(start_day, time.min))
+    end = timezone.make_aware(datetime.combine(end_day + timedelta(days=1), time.min))
+    return start, end
+
+
+class EventWindowPagination(CursorPagination):
+    """Keyset pagination for date-windowed event listings."""
+
+    page_size = 50
+    ordering = ('event_date', 'id')
 
 
 class EventViewSet(viewsets.ModelViewSet):
@@ -18,4 +54,155 @@ class EventViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         """Set the owner to the current user when creating an event."""
-        serializer.save(owner=self.request.user)
+        with transaction.atomic():
+            event = serializer.save(owner=self.request.user)
+            refresh_health_due_dates(pet_ids=[event.pet_id])
+
+    def perform_update(self, serializer):
+        """Save the event and refresh due dates of its old and new pet."""
+        old_pet_id = serializer.instance.pet_id
+        with transaction.atomic():
+            event = serializer.save()
+            refresh_health_due_dates(pet_ids={old_pet_id, event.pet_id})
+
+    def perform_destroy(self, instance):
+        """Delete the event and refresh its pet's due dates."""
+        pet_id = instance.pet_id
+        with transaction.atomic():
+            instance.delete()
+            refresh_health_due_dates(pet_ids=[pet_id])
+
+    def list(self, request, *args, **kwargs):
+        """
+        List events. With ?start= and/or ?end= (inclusive YYYY-MM-DD dates)
+        only events in that window are returned, in keyset-paginated pages.
+        """
+        start_day, error = parse_date_param(request, 'start')
+        if error:
+            return error
+        end_day, error = parse_date_param(request, 'end')
+        if error:
+            return error
+        if start_day is None and end_day is None:
+            return super().list(request, *args, **kwargs)
+        if start_day and end_day and end_day < start_day:
+            return Response(
+                {'error': 'end must be on or after start'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        start = end = None
+        if start_day:
+            start = window_bounds(start_day, start_day)[0]
+        if end_day:
+            end = window_bounds(end_day, end_day)[1]
+        queryset = self.filter_queryset(self.get_queryset()).filter(window_q(start, end))
+        paginator = EventWindowPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    @action(detail=False, methods=['get'])
+    def occurrences(self, request):
+        """
+        Expand events into occurrences between ?start= and ?end= (inclusive
+        YYYY-MM-DD dates). Optional ?pet= filter.
+        """
+        start_day, error = parse_date_param(request, 'start')
+        if error:
+            return error
+        end_day, error = parse_date_param(request, 'end')
+        if error:
+            return error
+        if not start_day or not end_day:
+            return Response(
+                {'error': 'start and end are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if end_day < start_day or (end_day - start_day).days >= MAX_OCCURRENCE_WINDOW_DAYS:
+            return Response(
+                {'error': f'end must be on or after start and within {MAX_OCCURRENCE_WINDOW_DAYS} days'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        start, end = window_bounds(start_day, end_day)
+
+        events = self.get_queryset()
+        pet_id = request.query_params.get('pet')
+        if pet_id:
+            try:
+                events = events.filter(pet_id=int(pet_id))
+            except ValueError:
+                return Response({'error': 'Invalid pet'}, status=status.HTTP_400_BAD_REQUEST)
+
+        occurrences = occurrences_between(events, start, end)
+        return Response(EventOccurrenceSerializer(occurrences, many=True).data)
+
+    @action(detail=True, methods=['post'], url_path='override')
+    def override(self, request, pk=None):
+        """Move, edit or cancel one occurrence of a recurring event."""
+        event = self.get_object()
+        if not event.rrule:
+            return Response(
+                {'error': 'Only recurring events have occurrences to override'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        serializer = EventOccurrenceOverrideSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        original_date = serializer.validated_data['original_date']
+
+        series = series_for(event)
+        index = series.first_index_at_or_after(original_date)
+        if series.occurrence(index) != original_date or not series.in_bounds(index, original_date):
+            return Response(
+                {'error': 'original_date is not an occurrence of this event'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        override, created = EventOccurrenceOverride.objects.update_or_create(
+            event=event,
+            original_date=original_date,
+            defaults={
+                key: value for key, value in serializer.validated_data.items()
+                if key != 'original_date'
+            },
+        )
+        return Response(
+            EventOccurrenceOverrideSerializer(override).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+    @action(detail=False, methods=['get'], url_path='feed')
+    def feed(self, request):
+        """Return the URL of the user's iCalendar feed."""
+        url = reverse('event-ical-feed', args=[feed_token(request.user)])
+        return Response({'url': request.build_absolute_uri(url)})
+
+
+def _feed_user_id(request, token):
+    user_id = user_id_from_token(token)
+    if user_id is None:
+        raise Http404('Unknown calendar feed')
+    # ETag and Last-Modified are both derived from one query per request
+    if not hasattr(request, '_feed_state'):
+        request._feed_state = feed_state(user_id)
+    return user_id
+
+
+def _feed_etag(request, token):
+    _feed_user_id(request, token)
+    return request._feed_state[1]
+
+
+def _feed_last_modified(request, token):
+    _feed_user_id(request, token)
+    return request._feed_state[0]
+
+
+@require_GET
+@condition(etag_func=_feed_etag, last_modified_func=_feed_last_modified)
+def ical_feed(request, token):
+    """Stream the user's events as an iCalendar file."""
+    user_id = _feed_user_id(request, token)
+    response = StreamingHttpResponse(iter_calendar(user_id), content_type='text/calendar; charset=utf-8')
+    response['Content-Disposition'] = 'inline; filename="events.ics"'
+    response['Cache-Control'] = 'private, no-cache'
+    return response
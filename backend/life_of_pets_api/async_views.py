@@ -0,0 +1,50 @@
+"""
+Async DRF views.
+
+APIView.dispatch is synchronous, so a DRF view holds a worker thread for the
+whole request. AsyncAPIView awaits async handlers instead: authentication,
+permission and throttle checks (which may query the database) run through
+sync_to_async, and DRF's exception handling and response finalisation are
+reused unchanged. Handlers read with the async ORM and must prefetch
+everything their serializers touch, since lazy queries raise in async code.
+Served by an ASGI server (see README), a request waiting on the database no
+longer occupies a thread of its own.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from rest_framework.views import APIView
+
+
+async def alist(queryset):
+    """Evaluate a queryset (prefetches included) with the async ORM."""
+    return [obj async for obj in queryset]
+
+
+class AsyncAPIView(APIView):
+    """APIView whose handlers are coroutines. All handlers must be async."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    async def options(self, request, *args, **kwargs):
+        return await sync_to_async(super().options)(request, *args, **kwargs)
@@ -0,0 +1,63 @@
+"""
+Retention policies for rows that are only useful for a limited time.
+
+Apps declare RetentionPolicy objects in a retention.py module; the
+purge_stale_rows command discovers them and deletes matching rows in small
+primary-key batches with a pause in between, so no single statement holds
+the write lock for long (SQLite has one database-wide writer).
+"""
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+registry = {}
+
+
+@dataclass
+class RetentionPolicy:
+    """
+    Rows of a model older than a retention period. stale(now, cutoff) returns
+    the queryset to purge; settings.RETENTION_DAYS[name] overrides days.
+    """
+
+    name: str
+    description: str
+    days: int
+    stale: callable
+
+    def retention_days(self):
+        return getattr(settings, 'RETENTION_DAYS', {}).get(self.name, self.days)
+
+    def queryset(self, now=None):
+        now = now or timezone.now()
+        return self.stale(now, now - timedelta(days=self.retention_days()))
+
+
+def register(policy):
+    registry[policy.name] = policy
+    return policy
+
+
+def discover():
+    """Import every installed app's retention module and return the registry."""
+    autodiscover_modules('retention')
+    return registry
+
+
+def purge(policy, batch_size=500, pause=0.1, now=None):
+    """Delete the policy's stale rows batch by batch. Returns rows deleted."""
+    queryset = policy.queryset(now)
+    model = queryset.model
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += model._default_manager.filter(pk__in=ids).delete()[1].get(model._meta.label, 0)
+        if len(ids) < batch_size:
+            return deleted
+        time.sleep(pause)
@@ -29,6 +29,7 @@ INSTALLED_APPS = [
     # Third-party apps
     'rest_framework',
     'rest_framework_simplejwt',
+    'rest_framework_simplejwt.token_blacklist',
     'corsheaders',
     'drf_spectacular',
     'django_extensions',
@@ -37,6 +38,7 @@ INSTALLED_APPS = [
     'users',
     'pets',
     'events',
+    'notifications',
 ]
 
 MIDDLEWARE = [
@@ -78,6 +80,15 @@ DATABASES = {
     }
 }
 
+# Cache (used for derived data such as downsampled activity history).
+# Use a shared backend (e.g. Redis) in production so invalidation reaches every worker.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='life-of-pets'),
+    }
+}
+
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
 
@@ -97,6 +108,13 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+AUTHENTICATION_BACKENDS = ['users.backends.PooledHashingBackend']
+
+# Password hashing runs in a bounded pool (see users/hashing.py); requests
+# beyond workers + queue get a 503 instead of waiting
+PASSWORD_HASHING_WORKERS = config('PASSWORD_HASHING_WORKERS', default=0, cast=int) or None
+PASSWORD_HASHING_QUEUE = config('PASSWORD_HASHING_QUEUE', default=32, cast=int)
+
 # Internationalization
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -117,11 +135,16 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_THROTTLE_RATES': {
+        # Sliding-window limits for login, register and password reset
+        'auth_ip': config('THROTTLE_AUTH_IP_RATE', default='30/min'),
+        'auth_account': config('THROTTLE_AUTH_ACCOUNT_RATE', default='5/min'),
+    },
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
@@ -131,14 +154,43 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=config('JWT_ACCESS_TOKEN_LIFETIME', default=60, cast=int)),
     'REFRESH_TOKEN_LIFETIME': timedelta(minutes=config('JWT_REFRESH_TOKEN_LIFETIME', default=1440, cast=int)),
-    'ROTATE_REFRESH_TOKENS': False,
+    'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'UPDATE_LAST_LOGIN': True,
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.VersionedTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.VersionedTokenRefreshSerializer',
+    'TOKEN_BLACKLIST_SERIALIZER': 'users.serializers.VersionedTokenBlacklistSerializer',
+}
+
+# Seconds between pulls of new blacklist rows into each process (see users/blacklist.py)
+TOKEN_BLACKLIST_SYNC_SECONDS = config('TOKEN_BLACKLIST_SYNC_SECONDS', default=5, cast=int)
+
+# Google sign-in: ID tokens must be issued for one of these OAuth client ids
+GOOGLE_CLIENT_IDS = [
+    client_id for client_id in config('GOOGLE_CLIENT_IDS', default='').split(',') if client_id
+]
+
+# HTTP clients for social login providers (see users/providers.py); URLs
+# can point at a local stub server in tests
+SOCIAL_PROVIDER_URLS = {}
+SOCIAL_PROVIDER_HTTP = {
+    'connect_timeout': config('SOCIAL_PROVIDER_CONNECT_TIMEOUT', default=2, cast=float),
+    'read_timeout': config('SOCIAL_PROVIDER_READ_TIMEOUT', default=5, cast=float),
+    'retries': 2,
+    'pool_size': 20,
 }
 
+# Where auth throttle counters live: 'local' (per process) or 'cache'
+# (shared through CACHES, use with several workers)
+THROTTLE_STORE = config('THROTTLE_STORE', default='local')
+
+# In-process cache of authenticated users (see users/authentication.py)
+AUTH_USER_CACHE_SIZE = config('AUTH_USER_CACHE_SIZE', default=1024, cast=int)
+AUTH_USER_CACHE_TTL = config('AUTH_USER_CACHE_TTL', default=30, cast=int)
+
 # CORS Settings for React Native
 CORS_ALLOWED_ORIGINS = config(
     'CORS_ALLOWED_ORIGINS',
@@ -154,3 +206,31 @@ SPECTACULAR_SETTINGS = {
     'VERSION': '1.0.0',
     'SERVE_INCLUDE_SCHEMA': False,
 }
+
+# Email: requests only queue messages in the outbox; drain_email_outbox sends them
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=10, cast=int)
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='webmaster@localhost')
+
+# Reminder delivery (see notifications/backends.py)
+NOTIFICATION_BACKEND = config('NOTIFICATION_BACKEND', default='notifications.backends.ConsoleBackend')
+EVENT_REMINDER_LEAD_HOURS = config('EVENT_REMINDER_LEAD_HOURS', default=24, cast=int)
+REMINDER_DIGEST_WINDOW_MINUTES = config('REMINDER_DIGEST_WINDOW_MINUTES', default=60, cast=int)
+
+# Overrides for retention periods in days, keyed by policy name (see
+# life_of_pets_api/retention.py and each app's retention.py)
+RETENTION_DAYS = {}
+
+# Days between repeats of each health task, used for due dates and overdue flags
+HEALTH_DUE_INTERVALS = {
+    'vaccination': 365,
+    'vet_visit': 365,
+    'grooming': 56,
+    'medication': 30,
+}
+HEALTH_DUE_SOON_DAYS = 14
@@ -0,0 +1,54 @@
+"""
+Pluggable delivery backends for reminders.
+
+A message is a dict with user_id, title, body, kind and object_id. Backends
+work like Django's email backends: send_messages() takes a batch and returns
+how many were delivered. NOTIFICATION_BACKEND selects the class.
+"""
+import sys
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Messages delivered by LocmemBackend, for tests and local development
+outbox = []
+
+
+class BaseBackend:
+    """Base class for notification backends."""
+
+    def send_messages(self, messages):
+        raise NotImplementedError('Subclasses must implement send_messages().')
+
+
+class ConsoleBackend(BaseBackend):
+    """Writes messages to a stream (stdout by default)."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lock = threading.Lock()
+
+    def send_messages(self, messages):
+        with self._lock:
+            for message in messages:
+                self.stream.write(
+                    f"[{message['kind']}] user={message['user_id']} "
+                    f"{message['title']}: {message['body']}\n"
+                )
+            self.stream.flush()
+        return len(messages)
+
+
+class LocmemBackend(BaseBackend):
+    """Keeps messages in notifications.backends.outbox."""
+
+    def send_messages(self, messages):
+        outbox.extend(messages)
+        return len(messages)
+
+
+def get_backend(path=None, **kwargs):
+    """Instantiate the configured notification backend."""
+    path = path or getattr(settings, 'NOTIFICATION_BACKEND', 'notifications.backends.ConsoleBackend')
+    return import_string(path)(**kwargs)
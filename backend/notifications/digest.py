@@ -0,0 +1,120 @@
+"""
+Per-owner reminder digests.
+
+Instead of one message per reminder, everything that becomes due within the
+digest window (event reminders and feedings) is grouped by owner and sent as
+a single message per owner. Each chunk of owners costs one send call and one
+UPDATE per table, so delivery work grows with owners rather than reminders.
+A chunk the backend delivers only in part is left unmarked for the next run.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from events.models import Event
+from pets.models import FeedingSchedule
+
+from .backends import get_backend
+from .event_reminders import EventReminderWorker, event_message, reminder_lead
+from .feeding import feeding_message
+
+
+def digest_window():
+    return timedelta(minutes=getattr(settings, 'REMINDER_DIGEST_WINDOW_MINUTES', 60))
+
+
+def due_feedings(now, window):
+    """
+    Active feedings whose time of day falls within [now, now + window) and
+    that were not already included in a digest during the last window.
+    """
+    window = min(window, timedelta(days=1))
+    start = timezone.localtime(now)
+    end = start + window
+    if window == timedelta(days=1):
+        in_window = Q()
+    elif start.time() <= end.time():
+        in_window = Q(time__gte=start.time(), time__lt=end.time())
+    else:
+        in_window = Q(time__gte=start.time()) | Q(time__lt=end.time())
+    return FeedingSchedule.objects.filter(in_window, is_active=True).exclude(
+        last_reminded_at__gte=now - window
+    )
+
+
+def digest_message(owner_id, messages):
+    """Combine one owner's reminder messages into a single message."""
+    if len(messages) == 1:
+        return messages[0]
+    return {
+        'user_id': owner_id,
+        'kind': 'digest',
+        'object_id': None,
+        'title': f"{len(messages)} upcoming reminders",
+        'body': '\n'.join(f"{message['title']}: {message['body']}" for message in messages),
+    }
+
+
+class ReminderDigest:
+    """Collects due reminders and sends them as one digest per owner."""
+
+    def __init__(self, backend=None, clock=None, window=None, owners_per_batch=500, lease_seconds=300):
+        self.backend = backend or get_backend()
+        self.clock = clock or timezone.now
+        self.window = window or digest_window()
+        self.owners_per_batch = owners_per_batch
+        # Events are claimed with the same leases as the event reminder worker,
+        # so both can run without sending an event twice
+        self.events = EventReminderWorker(
+            backend=self.backend,
+            clock=self.clock,
+            lease_seconds=lease_seconds,
+            lead=reminder_lead() + self.window,
+        )
+
+    def collect(self, now):
+        """Group due events and feedings by owner id."""
+        groups = defaultdict(lambda: ([], []))
+        while True:
+            events = self.events.claim_batch(now)
+            if not events:
+                break
+            for event in events:
+                groups[event.owner_id][0].append(event)
+        feedings = due_feedings(now, self.window).select_related('pet')
+        for schedule in feedings.iterator(chunk_size=2000):
+            groups[schedule.pet.owner_id][1].append(schedule)
+        return groups
+
+    def run(self):
+        """Send one digest to every owner with due reminders. Returns messages sent."""
+        now = self.clock()
+        groups = self.collect(now)
+        owner_ids = sorted(groups)
+        sent = 0
+        for offset in range(0, len(owner_ids), self.owners_per_batch):
+            messages, event_ids, feeding_ids = [], [], []
+            for owner_id in owner_ids[offset:offset + self.owners_per_batch]:
+                events, feedings = groups[owner_id]
+                messages.append(digest_message(
+                    owner_id,
+                    [event_message(event) for event in events]
+                    + [feeding_message(schedule) for schedule in feedings]
+                ))
+                event_ids.extend(event.id for event in events)
+                feeding_ids.extend(schedule.id for schedule in feedings)
+            delivered = self.backend.send_messages(messages)
+            claimed = Event.objects.filter(id__in=event_ids, reminder_claim_token=self.events.token)
+            if delivered < len(messages):
+                # As in EventReminderWorker.run_batch: retry the chunk later
+                claimed.update(reminder_claimed_until=None)
+                continue
+            sent += delivered
+            if event_ids:
+                claimed.update(reminder_sent_at=now, reminder_claimed_until=None)
+            if feeding_ids:
+                FeedingSchedule.objects.filter(id__in=feeding_ids).update(last_reminded_at=now)
+        return sent
@@ -0,0 +1,111 @@
+"""
+Event reminder worker.
+
+Due reminders are found through the partial index on unsent events, claimed
+in batches with a time-limited lease so concurrent workers never pick the same
+rows, sent through the notification backend, and marked sent with one UPDATE
+per batch. A worker that dies mid-batch leaves its lease to expire, after
+which another worker picks the rows up again. A batch the backend delivers
+only in part is released unmarked and retried, so a reminder may arrive
+twice but is never dropped.
+"""
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from events.models import Event
+
+from .backends import get_backend
+
+
+def reminder_lead():
+    return timedelta(hours=getattr(settings, 'EVENT_REMINDER_LEAD_HOURS', 24))
+
+
+def due_events(now, lead=None):
+    """Unsent reminders for events starting between now and now + lead time."""
+    return Event.objects.filter(
+        send_reminder=True,
+        reminder_sent_at__isnull=True,
+        event_date__gte=now,
+        event_date__lte=now + (lead or reminder_lead()),
+    )
+
+
+def event_message(event):
+    return {
+        'user_id': event.owner_id,
+        'kind': 'event',
+        'object_id': event.id,
+        'title': f"Upcoming: {event.title}",
+        'body': f"{event.get_event_type_display()} for {event.pet.name} "
+                f"on {timezone.localtime(event.event_date):%Y-%m-%d %H:%M}",
+    }
+
+
+class EventReminderWorker:
+    """Claims, sends and marks event reminders in batches."""
+
+    def __init__(self, backend=None, clock=None, batch_size=500, lease_seconds=300, lead=None):
+        self.backend = backend or get_backend()
+        self.lead = lead
+        self.clock = clock or timezone.now
+        self.batch_size = batch_size
+        self.lease = timedelta(seconds=lease_seconds)
+        self.token = uuid.uuid4().hex
+
+    def claim_batch(self, now):
+        """Lease up to batch_size due events to this worker and return them."""
+        claimable = due_events(now, self.lead).filter(
+            Q(reminder_claimed_until__isnull=True) | Q(reminder_claimed_until__lt=now)
+        )
+        candidate_ids = list(
+            claimable.order_by('event_date').values_list('id', flat=True)[:self.batch_size]
+        )
+        if not candidate_ids:
+            return []
+        # The claimable conditions are re-checked by the UPDATE itself, so a
+        # row another worker leased in the meantime is left alone
+        claimable.filter(id__in=candidate_ids).update(
+            reminder_claimed_until=now + self.lease,
+            reminder_claim_token=self.token,
+        )
+        return list(
+            Event.objects.filter(id__in=candidate_ids, reminder_claim_token=self.token)
+            .select_related('pet')
+        )
+
+    def run_batch(self):
+        """
+        Claim and send one batch. Returns the number of reminders marked
+        sent, which is 0 when the backend delivered only part of the batch.
+        """
+        now = self.clock()
+        events = self.claim_batch(now)
+        if not events:
+            return 0
+        sent = self.backend.send_messages([event_message(event) for event in events])
+        claimed = Event.objects.filter(
+            id__in=[event.id for event in events], reminder_claim_token=self.token
+        )
+        if sent < len(events):
+            # Backends only report a count, so release the whole batch for a
+            # retry rather than mark undelivered reminders sent
+            claimed.update(reminder_claimed_until=None)
+            return 0
+        claimed.update(reminder_sent_at=now, reminder_claimed_until=None)
+        return sent
+
+    def run_until_idle(self, max_batches=None):
+        """Send batches until nothing is due. Returns the total sent."""
+        total = batches = 0
+        while max_batches is None or batches < max_batches:
+            sent = self.run_batch()
+            if not sent:
+                break
+            total += sent
+            batches += 1
+        return total
@@ -0,0 +1,179 @@
+"""
+Feeding reminder scheduler.
+
+Active schedules are loaded once into a min-heap keyed by their next due
+time. After that the scheduler only polls for schedules changed since the
+last poll and pushes their new due time; outdated heap entries are skipped
+when they surface (lazy deletion). Due reminders are sent in batches and
+each schedule is pushed back for the next day. If the backend delivers
+only part of a batch, the whole batch is retried shortly after instead.
+"""
+import heapq
+import time as time_module
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+from pets.models import FeedingSchedule
+
+from .backends import get_backend
+
+# Re-read a little before the watermark so rows committed late are not missed;
+# re-applying a change is harmless.
+SYNC_OVERLAP = timedelta(seconds=5)
+# How long to wait before resending a batch the backend only partly delivered
+RETRY_DELAY = timedelta(minutes=1)
+
+
+def next_due(feeding_time, now):
+    """Next datetime after now at which a daily feeding_time occurs."""
+    local_now = timezone.localtime(now)
+    due = timezone.make_aware(datetime.combine(local_now.date(), feeding_time))
+    if due <= now:
+        due = timezone.make_aware(datetime.combine(local_now.date() + timedelta(days=1), feeding_time))
+    return due
+
+
+def feeding_message(schedule):
+    portion = f" ({schedule.portion})" if schedule.portion else ''
+    food = schedule.food_type or 'food'
+    return {
+        'user_id': schedule.pet.owner_id,
+        'kind': 'feeding',
+        'object_id': schedule.id,
+        'title': f"Time to feed {schedule.pet.name}",
+        'body': f"{food}{portion} at {schedule.time:%H:%M}",
+    }
+
+
+class FeedingScheduler:
+    """
+    Heap of next-due feedings. clock returns an aware datetime and sleep
+    pauses the loop, so tests can drive it with a fake clock.
+    """
+
+    def __init__(self, backend=None, clock=None, sleep=None, batch_size=500, poll_interval=30):
+        self.backend = backend or get_backend()
+        self.clock = clock or timezone.now
+        self.sleep = sleep or time_module.sleep
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.heap = []
+        self.entries = {}  # schedule id -> due time of its live heap entry
+        self.times = {}  # schedule id -> feeding time the entry was computed from
+        self.watermark = None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _push(self, schedule_id, due):
+        self.entries[schedule_id] = due
+        heapq.heappush(self.heap, (due, schedule_id))
+
+    def _track(self, updated_at):
+        if self.watermark is None or updated_at > self.watermark:
+            self.watermark = updated_at
+
+    def load(self):
+        """Build the heap from all active schedules."""
+        now = self.clock()
+        self.heap, self.entries, self.times, self.watermark = [], {}, {}, None
+        rows = FeedingSchedule.objects.filter(is_active=True).order_by('time').values_list(
+            'id', 'time', 'updated_at'
+        )
+        for schedule_id, feeding_time, updated_at in rows.iterator(chunk_size=2000):
+            self.entries[schedule_id] = next_due(feeding_time, now)
+            self.times[schedule_id] = feeding_time
+            self._track(updated_at)
+        self.heap = [(due, schedule_id) for schedule_id, due in self.entries.items()]
+        heapq.heapify(self.heap)
+        if self.watermark is None:
+            self.watermark = FeedingSchedule.objects.order_by('-updated_at').values_list(
+                'updated_at', flat=True
+            ).first()
+
+    def sync(self):
+        """Apply schedules created, edited or deactivated since the last poll."""
+        changed = FeedingSchedule.objects.all()
+        if self.watermark is not None:
+            changed = changed.filter(updated_at__gt=self.watermark - SYNC_OVERLAP)
+        now = self.clock()
+        count = 0
+        for schedule_id, feeding_time, is_active, updated_at in changed.values_list(
+            'id', 'time', 'is_active', 'updated_at'
+        ):
+            if not is_active:
+                self.entries.pop(schedule_id, None)
+                self.times.pop(schedule_id, None)
+            elif self.times.get(schedule_id) != feeding_time:
+                self.times[schedule_id] = feeding_time
+                self._push(schedule_id, next_due(feeding_time, now))
+            self._track(updated_at)
+            count += 1
+        return count
+
+    def pop_due(self):
+        """Remove and return the ids of all schedules due by now."""
+        now = self.clock()
+        due_ids = []
+        while self.heap and self.heap[0][0] <= now:
+            due, schedule_id = heapq.heappop(self.heap)
+            if self.entries.get(schedule_id) != due:
+                continue  # Superseded or deactivated
+            del self.entries[schedule_id]
+            due_ids.append((schedule_id, due))
+        return due_ids
+
+    def dispatch(self, due):
+        """Send reminders for (schedule id, due time) pairs in batches. Returns sent count."""
+        sent = 0
+        now = self.clock()
+        for offset in range(0, len(due), self.batch_size):
+            batch = dict(due[offset:offset + self.batch_size])
+            schedules = list(
+                FeedingSchedule.objects.filter(id__in=batch, is_active=True).select_related('pet')
+            )
+            delivered = 0
+            if schedules:
+                delivered = self.backend.send_messages([feeding_message(s) for s in schedules])
+                sent += delivered
+            if delivered < len(schedules):
+                # Backends only report a count, so retry the whole batch
+                for schedule in schedules:
+                    self.times[schedule.id] = schedule.time
+                    self._push(schedule.id, now + RETRY_DELAY)
+            else:
+                if schedules:
+                    # update() leaves updated_at alone, so this is not seen as an edit by sync()
+                    FeedingSchedule.objects.filter(id__in=[s.id for s in schedules]).update(
+                        last_reminded_at=now
+                    )
+                for schedule in schedules:
+                    self.times[schedule.id] = schedule.time
+                    self._push(schedule.id, next_due(schedule.time, now))
+            # Deleted or deactivated schedules are simply not pushed back
+            for schedule_id in batch.keys() - {s.id for s in schedules}:
+                self.times.pop(schedule_id, None)
+        return sent
+
+    def tick(self):
+        """One scheduler step: apply changes, then send what is due."""
+        self.sync()
+        return self.dispatch(self.pop_due())
+
+    def seconds_until_next(self):
+        while self.heap and self.entries.get(self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+        if not self.heap:
+            return None
+        return max((self.heap[0][0] - self.clock()).total_seconds(), 0)
+
+    def run(self, iterations=None):
+        """Run the loop, waking for the next due feeding or the next poll."""
+        self.load()
+        count = 0
+        while iterations is None or count < iterations:
+            self.tick()
+            wait = self.seconds_until_next()
+            self.sleep(self.poll_interval if wait is None else min(wait, self.poll_interval))
+            count += 1
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    """Worker that delivers queued emails over one SMTP connection per drain."""
+
+    help = 'Send emails queued in the outbox, retrying failures with backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep polling instead of exiting when the outbox is empty.')
+        parser.add_argument('--interval', type=float, default=5,
+                            help='Seconds to sleep between polls with --loop.')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = drain_outbox(batch_size=options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f'Sent {sent} emails, {failed} failed.')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from notifications.feeding import FeedingScheduler
+
+
+class Command(BaseCommand):
+    """Long-running process that sends feeding reminders when they are due."""
+
+    help = 'Run the feeding reminder scheduler.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--poll-interval', type=float, default=30,
+                            help='Seconds between polls for changed schedules.')
+        parser.add_argument('--once', action='store_true',
+                            help='Load, send whatever is due now and exit.')
+
+    def handle(self, *args, **options):
+        scheduler = FeedingScheduler(
+            batch_size=options['batch_size'],
+            poll_interval=options['poll_interval'],
+        )
+        if options['once']:
+            scheduler.load()
+            sent = scheduler.tick()
+            self.stdout.write(self.style.SUCCESS(f'Sent {sent} feeding reminders.'))
+            return
+
+        self.stdout.write(f'Feeding scheduler started (poll every {options["poll_interval"]}s).')
+        try:
+            scheduler.run()
+        except KeyboardInterrupt:
+            self.stdout.write('Feeding scheduler stopped.')
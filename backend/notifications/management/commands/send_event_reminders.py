@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.event_reminders import EventReminderWorker
+
+
+class Command(BaseCommand):
+    """Worker that sends due event reminders; several can run side by side."""
+
+    help = 'Send reminders for upcoming events in leased batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--lease', type=int, default=300,
+                            help='Seconds a claimed batch stays reserved for this worker.')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep polling instead of exiting when idle.')
+        parser.add_argument('--interval', type=float, default=30,
+                            help='Seconds to sleep between polls with --loop.')
+
+    def handle(self, *args, **options):
+        worker = EventReminderWorker(
+            batch_size=options['batch_size'],
+            lease_seconds=options['lease'],
+        )
+        while True:
+            sent = worker.run_until_idle()
+            if sent:
+                self.stdout.write(f'Sent {sent} event reminders.')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
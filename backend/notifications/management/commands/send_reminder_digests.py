@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.digest import ReminderDigest
+
+
+class Command(BaseCommand):
+    """Sends one digest per owner instead of individual reminders."""
+
+    help = 'Send due event and feeding reminders as one digest per owner.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--owners-per-batch', type=int, default=500)
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep running, twice per digest window.')
+
+    def handle(self, *args, **options):
+        digest = ReminderDigest(owners_per_batch=options['owners_per_batch'])
+        while True:
+            sent = digest.run()
+            if sent:
+                self.stdout.write(f'Sent {sent} reminder digests.')
+            if not options['loop']:
+                break
+            # Polling faster than the window means no feeding time slips between
+            # two runs; feedings already included are skipped by last_reminded_at
+            time.sleep(digest.window.total_seconds() / 2)
@@ -0,0 +1,96 @@
+"""
+Transactional email outbox.
+
+enqueue_email() writes an OutboxEmail row inside the caller's transaction,
+so the email exists exactly when the change that caused it is committed and
+the request never waits on SMTP. drain_outbox() sends due rows in batches
+over one reused connection, retrying failures with exponential backoff.
+"""
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+MAX_ATTEMPTS = 6
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 60 * 60
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+def enqueue_email(subject, body, to, from_email=None):
+    """Queue an email; call inside the transaction that makes it necessary."""
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=body,
+        to=','.join(to),
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        next_attempt_at=timezone.now(),
+    )
+
+
+def backoff(attempts):
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS))
+
+
+def claim_batch(now, batch_size, token):
+    """Lease up to batch_size due emails to the worker holding token."""
+    due = OutboxEmail.objects.filter(status='pending', next_attempt_at__lte=now)
+    candidate_ids = list(due.values_list('id', flat=True)[:batch_size])
+    if not candidate_ids:
+        return []
+    # Pushing next_attempt_at forward is the lease; a crashed worker's rows
+    # become due again once it expires
+    due.filter(id__in=candidate_ids).update(next_attempt_at=now + CLAIM_LEASE, claim_token=token)
+    return list(OutboxEmail.objects.filter(id__in=candidate_ids, claim_token=token, status='pending'))
+
+
+def drain_outbox(batch_size=100, connection=None, clock=timezone.now):
+    """Send due emails until none are left. Returns (sent, failed) counts."""
+    sent_total = failed_total = 0
+    token = uuid.uuid4().hex
+    connection = connection or get_connection()
+    with connection:
+        while True:
+            now = clock()
+            batch = claim_batch(now, batch_size, token)
+            if not batch:
+                break
+            sent, failed = [], []
+            for email in batch:
+                message = EmailMessage(
+                    email.subject, email.body, email.from_email, email.to.split(','),
+                    connection=connection,
+                )
+                try:
+                    message.send()
+                except Exception as exc:  # Any transport error is retried
+                    # Reconnect for the next message in case the session broke
+                    connection.close()
+                    try:
+                        connection.open()
+                    except Exception:
+                        pass  # The next send() retries the connection
+                    email.attempts += 1
+                    email.last_error = str(exc)[:1000]
+                    if email.attempts >= MAX_ATTEMPTS:
+                        email.status = 'failed'
+                    else:
+                        email.next_attempt_at = now + backoff(email.attempts)
+                    failed.append(email)
+                else:
+                    sent.append(email.id)
+            if sent:
+                OutboxEmail.objects.filter(id__in=sent).update(
+                    status='sent', sent_at=now, last_error='', claim_token=''
+                )
+            if failed:
+                OutboxEmail.objects.bulk_update(
+                    failed, ['attempts', 'last_error', 'status', 'next_attempt_at']
+                )
+            sent_total += len(sent)
+            failed_total += len(failed)
+    return sent_total, failed_total
@@ -0,0 +1,14 @@
+from django.db.models import Q
+
+from life_of_pets_api.retention import RetentionPolicy, register
+
+from .models import OutboxEmail
+
+register(RetentionPolicy(
+    name='outbox_emails',
+    description='Delivered or permanently failed outbox emails',
+    days=30,
+    stale=lambda now, cutoff: OutboxEmail.objects.filter(
+        Q(status='sent', sent_at__lt=cutoff) | Q(status='failed', next_attempt_at__lt=cutoff)
+    ),
+))
@@ -0,0 +1,262 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from events.models import Event
+from pets.models import FeedingSchedule, Pet
+from users.models import PasswordResetToken, User
+
+from . import backends
+from .digest import ReminderDigest
+from .event_reminders import EventReminderWorker
+from .feeding import RETRY_DELAY, FeedingScheduler
+from .models import OutboxEmail
+from .outbox import MAX_ATTEMPTS, drain_outbox
+
+
+class Clock:
+    """Fake clock that tests move forward by hand."""
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class NotificationTestCase(TestCase):
+    def setUp(self):
+        backends.outbox.clear()
+        self.user = User.objects.create_user('owner', 'owner@example.com', 'Str0ngPass!x')
+        self.pet = Pet.objects.create(owner=self.user, name='Rex')
+
+
+class FeedingSchedulerTests(NotificationTestCase):
+    """Heap-driven feeding reminders follow schedule edits."""
+
+    def test_due_feedings_are_sent_once(self):
+        clock = Clock(datetime(2025, 1, 1, 7, 0, tzinfo=dt_timezone.utc))
+        breakfast = FeedingSchedule.objects.create(pet=self.pet, time=time(8, 0), food_type='Dry')
+        early = FeedingSchedule.objects.create(pet=self.pet, time=time(6, 0))
+        scheduler = FeedingScheduler(backend=backends.LocmemBackend(), clock=clock)
+        scheduler.load()
+        self.assertEqual(scheduler.tick(), 0)
+
+        clock.now += timedelta(hours=1)
+        self.assertEqual(scheduler.tick(), 1)
+        self.assertEqual(backends.outbox[-1]['object_id'], breakfast.id)
+        breakfast.refresh_from_db()
+        self.assertIsNotNone(breakfast.last_reminded_at)
+        clock.now += timedelta(seconds=30)
+        self.assertEqual(scheduler.tick(), 0)
+
+        # An edited time and a new schedule are picked up by sync()
+        early.time = time(8, 30)
+        early.save()
+        late = FeedingSchedule.objects.create(pet=self.pet, time=time(8, 45))
+        clock.now += timedelta(minutes=10)
+        scheduler.sync()
+        clock.now = datetime(2025, 1, 1, 8, 40, tzinfo=dt_timezone.utc)
+        self.assertEqual(scheduler.tick(), 1)
+        self.assertEqual(backends.outbox[-1]['object_id'], early.id)
+
+        # Deactivated and deleted schedules are skipped
+        late.is_active = False
+        late.save()
+        clock.now = datetime(2025, 1, 1, 9, 0, tzinfo=dt_timezone.utc)
+        self.assertEqual(scheduler.tick(), 0)
+        breakfast_id = breakfast.id
+        breakfast.delete()
+        clock.now = datetime(2025, 1, 2, 8, 35, tzinfo=dt_timezone.utc)
+        self.assertEqual(scheduler.tick(), 1)
+        self.assertEqual(
+            [message['object_id'] for message in backends.outbox], [breakfast_id, early.id, early.id]
+        )
+
+    def test_partly_delivered_batch_is_retried(self):
+        clock = Clock(datetime(2025, 1, 1, 7, 59, tzinfo=dt_timezone.utc))
+        first = FeedingSchedule.objects.create(pet=self.pet, time=time(8, 0))
+        second = FeedingSchedule.objects.create(pet=self.pet, time=time(8, 0))
+        backend = ShortBackend(limit=1)
+        scheduler = FeedingScheduler(backend=backend, clock=clock)
+        scheduler.load()
+
+        clock.now += timedelta(minutes=1)
+        self.assertEqual(scheduler.tick(), 1)
+        self.assertFalse(FeedingSchedule.objects.filter(last_reminded_at__isnull=False).exists())
+        self.assertEqual(scheduler.seconds_until_next(), RETRY_DELAY.total_seconds())
+
+        backend.limit = 2
+        clock.now += RETRY_DELAY
+        self.assertEqual(scheduler.tick(), 2)
+        self.assertEqual(FeedingSchedule.objects.filter(last_reminded_at=clock.now).count(), 2)
+        self.assertEqual(
+            sorted(message['object_id'] for message in backends.outbox[1:]), sorted([first.id, second.id])
+        )
+        # Back on the daily schedule, not shifted by the retry
+        self.assertEqual(scheduler.entries[first.id], datetime(2025, 1, 2, 8, 0, tzinfo=dt_timezone.utc))
+
+
+class ShortBackend(backends.LocmemBackend):
+    """Delivers at most `limit` messages per call."""
+
+    def __init__(self, limit):
+        self.limit = limit
+
+    def send_messages(self, messages):
+        return super().send_messages(messages[:self.limit])
+
+
+class EventReminderWorkerTests(NotificationTestCase):
+    """Leased batches of event reminders."""
+
+    def setUp(self):
+        super().setUp()
+        self.now = datetime(2025, 1, 1, 12, tzinfo=dt_timezone.utc)
+        Event.objects.bulk_create([
+            Event(owner=self.user, pet=self.pet, title=f'Event {i}', event_date=self.now + timedelta(hours=i))
+            for i in range(-2, 30)
+        ])
+
+    def worker(self, now, backend=None):
+        return EventReminderWorker(
+            backend=backend or backends.LocmemBackend(), clock=lambda: now, batch_size=10
+        )
+
+    def test_claims_are_disjoint_and_leases_expire(self):
+        first, second = self.worker(self.now), self.worker(self.now)
+        claimed = first.claim_batch(self.now)
+        other = second.claim_batch(self.now)
+        self.assertEqual(len(claimed), 10)
+        self.assertEqual(len(other), 10)
+        self.assertFalse({event.id for event in claimed} & {event.id for event in other})
+
+        # first never finishes; once the leases lapse its events are sent too
+        later = self.now + timedelta(minutes=6)
+        self.assertEqual(self.worker(later).run_until_idle(), 24)
+        self.assertEqual(Event.objects.filter(reminder_sent_at__isnull=False).count(), 24)
+        self.assertEqual(len({message['object_id'] for message in backends.outbox}), 24)
+
+    def test_short_send_releases_the_batch(self):
+        worker = self.worker(self.now, backend=ShortBackend(limit=4))
+        self.assertEqual(worker.run_until_idle(), 0)
+        self.assertFalse(Event.objects.filter(reminder_sent_at__isnull=False).exists())
+        self.assertFalse(Event.objects.filter(reminder_claimed_until__isnull=False).exists())
+
+        self.assertEqual(self.worker(self.now).run_until_idle(), 25)
+        self.assertEqual(Event.objects.filter(reminder_sent_at__isnull=False).count(), 25)
+
+
+class ReminderDigestTests(NotificationTestCase):
+    """One message per owner for everything due in the window."""
+
+    def setUp(self):
+        super().setUp()
+        self.now = datetime(2026, 3, 1, 11, 30, tzinfo=dt_timezone.utc)
+        pets = [self.pet] + [Pet.objects.create(owner=self.user, name=f'Pet {i}') for i in range(3)]
+        for pet in pets:
+            Event.objects.create(owner=self.user, pet=pet, title='Vaccine', event_date=self.now + timedelta(hours=2))
+            FeedingSchedule.objects.create(pet=pet, time=time(12, 0), food_type='kibble')
+            FeedingSchedule.objects.create(pet=pet, time=time(14, 0), food_type='kibble')
+        self.other = User.objects.create_user('other', 'other@example.com', 'Str0ngPass!x')
+        other_pet = Pet.objects.create(owner=self.other, name='Tom')
+        Event.objects.create(owner=self.other, pet=other_pet, title='Groom',
+                             event_date=self.now + timedelta(hours=24, minutes=30))
+        Event.objects.create(owner=self.other, pet=other_pet, title='Late', event_date=self.now + timedelta(hours=26))
+        FeedingSchedule.objects.create(pet=other_pet, time=time(23, 0))
+
+    def digest(self, now, backend=None):
+        return ReminderDigest(backend=backend or backends.LocmemBackend(), clock=lambda: now)
+
+    def test_one_message_per_owner(self):
+        self.assertEqual(self.digest(self.now).run(), 2)
+        messages = sorted(backends.outbox, key=lambda message: message['user_id'])
+        self.assertEqual(messages[0]['kind'], 'digest')
+        self.assertEqual(messages[0]['title'], '8 upcoming reminders')
+        self.assertEqual(messages[1]['kind'], 'event')
+        self.assertEqual(Event.objects.filter(reminder_sent_at=self.now).count(), 5)
+        self.assertEqual(FeedingSchedule.objects.filter(last_reminded_at=self.now).count(), 4)
+
+        self.assertEqual(self.digest(self.now + timedelta(minutes=25)).run(), 0)
+        # Feedings are due again in the same window the next day
+        self.assertEqual(self.digest(self.now + timedelta(days=1)).run(), 2)
+
+    def test_window_wraps_past_midnight(self):
+        FeedingSchedule.objects.create(pet=self.pet, time=time(0, 10))
+        self.digest(datetime(2026, 3, 5, 23, 30, tzinfo=dt_timezone.utc)).run()
+        self.assertEqual([message['user_id'] for message in backends.outbox], [self.user.id])
+
+    def test_short_send_is_retried(self):
+        self.assertEqual(self.digest(self.now, backend=ShortBackend(limit=1)).run(), 0)
+        self.assertFalse(Event.objects.filter(reminder_sent_at__isnull=False).exists())
+        self.assertFalse(Event.objects.filter(reminder_claimed_until__isnull=False).exists())
+        self.assertFalse(FeedingSchedule.objects.filter(last_reminded_at__isnull=False).exists())
+        self.assertEqual(self.digest(self.now).run(), 2)
+
+
+class FlakyEmailBackend(EmailBackend):
+    """locmem backend that fails for one recipient."""
+
+    failing = {'bad@example.com'}
+
+    def send_messages(self, messages):
+        for message in messages:
+            if set(message.to) & self.failing:
+                raise OSError('smtp down')
+        return super().send_messages(messages)
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class OutboxTests(APITestCase):
+    """Emails are queued with the request's transaction and sent by a worker."""
+
+    def setUp(self):
+        User.objects.create_user('owner', 'owner@example.com', 'Str0ngPass!x')
+        User.objects.create_user('bad', 'bad@example.com', 'Str0ngPass!x')
+
+    def forgot_password(self, email):
+        response = self.client.post('/api/auth/forgot-password/', {'email': email}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_requests_only_queue(self):
+        self.forgot_password('owner@example.com')
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+    def test_drain_sends_and_retries(self):
+        self.forgot_password('owner@example.com')
+        self.forgot_password('bad@example.com')
+        OutboxEmail.objects.bulk_create([
+            OutboxEmail(subject=f'Subject {i}', body='body', to='c@example.com', next_attempt_at=timezone.now())
+            for i in range(250)
+        ])
+        connection = FlakyEmailBackend()
+        self.assertEqual(drain_outbox(batch_size=100, connection=connection), (251, 1))
+        token = PasswordResetToken.objects.get(user__username='owner').token
+        self.assertTrue(any(token in message.body for message in mail.outbox))
+
+        bad = OutboxEmail.objects.get(to='bad@example.com')
+        self.assertEqual(bad.attempts, 1)
+        self.assertEqual(bad.status, 'pending')
+        self.assertIn('smtp down', bad.last_error)
+        # Not due again until its backoff has passed
+        self.assertEqual(drain_outbox(connection=connection), (0, 0))
+
+        now = timezone.now()
+        for day in range(1, MAX_ATTEMPTS):
+            drain_outbox(connection=connection, clock=lambda: now + timedelta(days=day))
+        bad.refresh_from_db()
+        self.assertEqual(bad.status, 'failed')
+        self.assertEqual(bad.attempts, MAX_ATTEMPTS)
+
+    def test_expired_claims_are_picked_up_again(self):
+        self.forgot_password('owner@example.com')
+        now = timezone.now()
+        OutboxEmail.objects.update(claim_token='crashed', next_attempt_at=now + timedelta(minutes=5))
+        self.assertEqual(drain_outbox(connection=FlakyEmailBackend()), (0, 0))
+        sent = drain_outbox(connection=FlakyEmailBackend(), clock=lambda: now + timedelta(minutes=6))
+        self.assertEqual(sent, (1, 0))
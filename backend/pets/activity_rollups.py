@@ -0,0 +1,102 @@
+"""
+Weekly and monthly activity rollups.
+
+Every write to an Activity row goes through activity_changed(), which
+recomputes only the week and month buckets that contain the touched dates.
+Charts read ActivityRollup rows instead of summing daily rows.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from .caching import bump_version
+from .leaderboard import sync_leaderboard
+from .models import Activity, ActivityRollup, Pet
+from .streaks import update_streaks
+
+ROLLUP_FIELDS = ('walking_minutes', 'steps', 'play_minutes')
+
+
+def week_start(day):
+    """Return the Monday of the week containing day."""
+    return day - timedelta(days=day.weekday())
+
+
+def month_start(day):
+    """Return the first day of the month containing day."""
+    return day.replace(day=1)
+
+
+def period_bounds(granularity, day):
+    """Return the [start, end) date range of the bucket containing day."""
+    if granularity == 'week':
+        start = week_start(day)
+        return start, start + timedelta(days=7)
+    start = month_start(day)
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
+
+
+def refresh_rollups(pet_id, dates):
+    """Recompute the week and month buckets containing the given dates."""
+    buckets = set()
+    for day in dates:
+        for granularity in ('week', 'month'):
+            buckets.add((granularity, period_bounds(granularity, day)))
+
+    for granularity, (start, end) in buckets:
+        totals = Activity.objects.filter(
+            pet_id=pet_id, date__gte=start, date__lt=end
+        ).aggregate(
+            active_days=Count('id'),
+            **{field: Sum(field) for field in ROLLUP_FIELDS}
+        )
+        if not totals['active_days']:
+            ActivityRollup.objects.filter(
+                pet_id=pet_id, granularity=granularity, period_start=start
+            ).delete()
+            continue
+        ActivityRollup.objects.update_or_create(
+            pet_id=pet_id,
+            granularity=granularity,
+            period_start=start,
+            defaults=totals,
+        )
+
+
+def activity_changed(pet_id, dates):
+    """
+    Bring derived activity data up to date after Activity rows were written.
+    Call this for every create, update, delete or upsert of Activity rows.
+    """
+    dates = set(dates)
+    if not dates:
+        return
+    refresh_rollups(pet_id, dates)
+    sync_leaderboard(pet_id, {week_start(day) for day in dates})
+    update_streaks(pet_id, dates)
+    owner_id = Pet.objects.filter(pk=pet_id).values_list('owner_id', flat=True).first()
+    transaction.on_commit(lambda: bump_version('activity-history', pet_id))
+    transaction.on_commit(lambda: bump_version('dashboard', owner_id))
+
+
+def rebuild_all_rollups(batch_size=1000):
+    """Rebuild every rollup from the raw Activity table. Returns rows written."""
+    ActivityRollup.objects.all().delete()
+    written = 0
+    for granularity, trunc in (('week', TruncWeek), ('month', TruncMonth)):
+        rows = Activity.objects.annotate(
+            period_start=trunc('date')
+        ).values('pet_id', 'period_start').annotate(
+            active_days=Count('id'),
+            **{field: Sum(field) for field in ROLLUP_FIELDS}
+        ).order_by()
+        rollups = [
+            ActivityRollup(granularity=granularity, **row)
+            for row in rows
+        ]
+        ActivityRollup.objects.bulk_create(rollups, batch_size=batch_size)
+        written += len(rollups)
+    return written
@@ -1,6 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import ActivityViewSet, FeedingScheduleViewSet, ExpenseViewSet
+from .views import (
+    ActivityViewSet,
+    DashboardView,
+    ExpenseViewSet,
+    FeedingScheduleViewSet,
+    TodayActivitiesView,
+)
 
 router = DefaultRouter()
 router.register(r'activities', ActivityViewSet, basename='activity')
@@ -8,5 +14,7 @@ router.register(r'feeding-schedules', FeedingScheduleViewSet, basename='feeding-
 router.register(r'expenses', ExpenseViewSet, basename='expense')
 
 urlpatterns = [
+    path('dashboard/', DashboardView.as_view(), name='dashboard'),
+    path('activities/today/', TodayActivitiesView.as_view(), name='activity-today'),
     path('', include(router.urls)),
 ]
@@ -0,0 +1,41 @@
+"""
+Versioned cache keys.
+
+Cached results embed a version number for the thing they were derived from
+(a pet, an owner, ...). Bumping the version on write makes every older entry
+unreachable without having to know or delete the individual keys.
+"""
+import time
+
+from django.core.cache import cache
+
+
+def _version_key(namespace, key):
+    return f'{namespace}:version:{key}'
+
+
+def get_version(namespace, key):
+    """Return the current version for namespace/key, creating it if needed."""
+    version_key = _version_key(namespace, key)
+    version = cache.get(version_key)
+    if version is None:
+        # Seed from the clock so an evicted version never comes back as an old value
+        cache.add(version_key, time.time_ns(), timeout=None)
+        version = cache.get(version_key)
+    return version
+
+
+def bump_version(namespace, key):
+    """Invalidate everything cached under namespace/key."""
+    version_key = _version_key(namespace, key)
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, time.time_ns(), timeout=None)
+
+
+def versioned_key(namespace, key, *parts):
+    """Build a cache key that changes whenever namespace/key is bumped."""
+    version = get_version(namespace, key)
+    suffix = ':'.join(str(part) for part in parts)
+    return f'{namespace}:{key}:v{version}:{suffix}'
@@ -0,0 +1,89 @@
+"""
+Launch dashboard: what the app's home screens load, in one response.
+
+The owner's pets are fetched once and their ids drive every other query, so
+no query joins back through Pet and related rows get their pet from memory.
+The result is cached per owner under a versioned key. Writes bump the
+owner's 'dashboard' version: the activity, expense and health due date hooks
+do it directly, and pets/signals.py and events/signals.py cover pets,
+photos, feeding schedules and events saved one at a time.
+"""
+from datetime import date, datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from events.models import Event
+from events.recurrence import occurrences_between
+from events.serializers import EventOccurrenceSerializer
+
+from .caching import bump_version, versioned_key
+from .expense_rollups import expense_summary
+from .models import Activity, FeedingSchedule, Pet
+from .serializers import ActivitySerializer, FeedingScheduleSerializer, OwnPetSerializer
+
+UPCOMING_EVENT_DAYS = 7
+# Reminder workers write Event.reminder_sent_at and
+# FeedingSchedule.last_reminded_at with update(), which does not invalidate.
+# Upcoming events leave reminder_sent_at out; last_reminded_at is shown on
+# feeding schedules and can lag by up to this timeout.
+DASHBOARD_CACHE_TIMEOUT = 10 * 60
+
+
+def dashboard_changed(owner_id):
+    """Drop the owner's cached dashboard once the current transaction commits."""
+    transaction.on_commit(lambda: bump_version('dashboard', owner_id))
+
+
+def _attach_pets(rows, pets_by_id):
+    for row in rows:
+        if row.pet_id in pets_by_id:
+            row.pet = pets_by_id[row.pet_id]
+    return rows
+
+
+def build_dashboard(owner_id, context=None, today=None):
+    """Pets, today's activities, feeding schedules, upcoming events and expense totals."""
+    today = today or date.today()
+    pets = list(
+        Pet.objects.filter(owner_id=owner_id).select_related('owner').prefetch_related(
+            'photos', 'health_due_dates'
+        )
+    )
+    pets_by_id = {pet.id: pet for pet in pets}
+
+    activities = _attach_pets(
+        Activity.objects.filter(pet_id__in=pets_by_id, date=today), pets_by_id
+    )
+    schedules = _attach_pets(FeedingSchedule.objects.filter(pet_id__in=pets_by_id), pets_by_id)
+
+    start = timezone.make_aware(datetime.combine(today, time.min))
+    end = start + timedelta(days=UPCOMING_EVENT_DAYS)
+    occurrences = occurrences_between(Event.objects.filter(owner_id=owner_id), start, end)
+    _attach_pets({occurrence['event'] for occurrence in occurrences}, pets_by_id)
+
+    categories, total = expense_summary(owner_id)
+    return {
+        'date': today,
+        'pets': OwnPetSerializer(pets, many=True, context=context).data,
+        'today_activities': ActivitySerializer(activities, many=True).data,
+        'feeding_schedules': FeedingScheduleSerializer(schedules, many=True).data,
+        'upcoming_events': EventOccurrenceSerializer(occurrences, many=True).data,
+        'expense_summary': {'categories': categories, 'total': total},
+    }
+
+
+def dashboard(owner_id, context=None, today=None):
+    """The owner's dashboard, from the cache when nothing changed since it was built."""
+    today = today or date.today()
+    # Photo URLs are made absolute from the request, so cache per origin
+    request = (context or {}).get('request')
+    origin = request.build_absolute_uri('/') if request is not None else ''
+    cache_key = versioned_key('dashboard', owner_id, today.isoformat(), origin)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+    result = build_dashboard(owner_id, context=context, today=today)
+    cache.set(cache_key, result, DASHBOARD_CACHE_TIMEOUT)
+    return result
@@ -0,0 +1,114 @@
+"""
+Downsampling of long activity series for charts.
+
+Both algorithms keep the first and last point and return indices into the
+original arrays, so every field of a selected day can be returned as-is.
+"""
+import numpy as np
+from django.core.cache import cache
+
+from .caching import versioned_key
+from .models import Activity
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets: pick threshold points that preserve the
+    visual shape of (x, y).
+    """
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 3:
+        return np.array([0, n - 1], dtype=np.int64)
+
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start = end
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Twice the area of the triangle (previous, candidate, next average)
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def minmax_indices(y, threshold):
+    """Keep the minimum and maximum of each bucket (about threshold points in total)."""
+    n = len(y)
+    if threshold >= n:
+        return np.arange(n)
+
+    buckets = max(threshold // 2, 1)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    selected = []
+    for start, end in zip(edges[:-1], edges[1:]):
+        if start == end:
+            continue
+        window = y[start:end]
+        selected.append(start + int(np.argmin(window)))
+        selected.append(start + int(np.argmax(window)))
+    selected.extend([0, n - 1])
+    return np.unique(np.array(selected, dtype=np.int64))
+
+
+HISTORY_FIELDS = ('walking_minutes', 'steps', 'play_minutes')
+HISTORY_CACHE_TIMEOUT = 60 * 60
+
+
+def activity_history(pet_id, start=None, end=None, points=None, metric='steps', mode='lttb'):
+    """
+    Return the pet's daily activity between start and end, downsampled to
+    about `points` days when given. Results are cached per pet/range/points and
+    dropped as soon as the pet's activity changes.
+    """
+    cache_key = versioned_key(
+        'activity-history', pet_id, start, end, points or 'all', metric, mode
+    )
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    queryset = Activity.objects.filter(pet_id=pet_id)
+    if start:
+        queryset = queryset.filter(date__gte=start)
+    if end:
+        queryset = queryset.filter(date__lte=end)
+    rows = list(queryset.order_by('date').values_list('date', *HISTORY_FIELDS))
+
+    total = len(rows)
+    if points and total > points:
+        values = np.array([row[1:] for row in rows], dtype=np.int64)
+        y = values[:, HISTORY_FIELDS.index(metric)]
+        if mode == 'minmax':
+            indices = minmax_indices(y, points)
+        else:
+            x = np.fromiter((row[0].toordinal() for row in rows), dtype=np.int64, count=total)
+            indices = lttb_indices(x, y, points)
+        rows = [rows[i] for i in indices.tolist()]
+
+    result = {
+        'total_points': total,
+        'downsampled': len(rows) < total,
+        'results': [
+            dict(zip(('date', *HISTORY_FIELDS), row))
+            for row in rows
+        ],
+    }
+    cache.set(cache_key, result, HISTORY_CACHE_TIMEOUT)
+    return result
@@ -0,0 +1,125 @@
+"""
+Expense trends and forecast.
+
+One values_list('date', 'category', 'amount') fetch is scattered into a
+(category x month) matrix of cents with NumPy; moving averages, year-over-year
+deltas and a linear forecast are all computed from that matrix. Results are
+cached per owner until the owner's expenses change.
+"""
+from datetime import date
+
+import numpy as np
+from django.core.cache import cache
+
+from .caching import versioned_key
+from .expense_rollups import next_month
+from .models import Expense
+
+CATEGORY_KEYS = [key for key, _ in Expense.CATEGORY_CHOICES]
+MOVING_AVERAGE_MONTHS = 3
+ANALYTICS_CACHE_TIMEOUT = 60 * 60
+
+
+def _month_number(day):
+    return day.year * 12 + day.month - 1
+
+
+def _month_label(number):
+    return f'{number // 12:04d}-{number % 12 + 1:02d}'
+
+
+def _money(values):
+    return [round(float(value) / 100, 2) for value in values]
+
+
+def _moving_average(series, window):
+    """Trailing moving average; the first months average what is available."""
+    sums = np.cumsum(series, axis=-1, dtype=np.float64)
+    shifted = np.zeros_like(sums)
+    shifted[..., window:] = sums[..., :-window]
+    counts = np.minimum(np.arange(1, series.shape[-1] + 1), window)
+    return (sums - shifted) / counts
+
+
+def _linear_forecast(series, steps):
+    """Least-squares line through each row of series, extended by steps months."""
+    months = series.shape[-1]
+    x = np.arange(months, dtype=np.float64)
+    slope, intercept = np.polyfit(x, np.atleast_2d(series).T.astype(np.float64), 1)
+    future = np.arange(months, months + steps, dtype=np.float64)
+    forecast = np.outer(slope, future) + intercept[:, None]
+    return np.clip(forecast, 0, None)
+
+
+def expense_analytics(owner_id, months=12, forecast_months=3, today=None):
+    """Monthly spend per category with trends and a forecast for the owner."""
+    today = today or date.today()
+    cache_key = versioned_key(
+        'expense-analytics', owner_id, months, forecast_months, today.isoformat()
+    )
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    last_month = _month_number(today)
+    # One extra year for the year-over-year comparison
+    first_month = last_month - months - 11
+    start = date(first_month // 12, first_month % 12 + 1, 1)
+    rows = Expense.objects.filter(
+        owner_id=owner_id, date__gte=start, date__lt=next_month(today.replace(day=1))
+    ).values_list('date', 'category', 'amount')
+
+    span = last_month - first_month + 1
+    matrix = np.zeros((len(CATEGORY_KEYS), span), dtype=np.int64)
+    category_index = {key: index for index, key in enumerate(CATEGORY_KEYS)}
+    data = list(rows)
+    if data:
+        month_idx = np.fromiter(
+            (_month_number(day) - first_month for day, _, _ in data), dtype=np.int64, count=len(data)
+        )
+        cat_idx = np.fromiter(
+            (category_index.get(category, category_index['other']) for _, category, _ in data),
+            dtype=np.int64, count=len(data)
+        )
+        cents = np.fromiter(
+            (int(amount * 100) for _, _, amount in data), dtype=np.int64, count=len(data)
+        )
+        np.add.at(matrix, (cat_idx, month_idx), cents)
+
+    window = matrix[:, -months:]
+    totals = window.sum(axis=0)
+    previous_year = matrix.sum(axis=0)[-months - 12:-12]
+    yoy_delta = totals - previous_year
+    with np.errstate(divide='ignore', invalid='ignore'):
+        yoy_pct = np.where(previous_year > 0, yoy_delta / previous_year * 100, np.nan)
+
+    category_forecast = _linear_forecast(window, forecast_months)
+    total_forecast = _linear_forecast(totals, forecast_months)[0]
+    moving = _moving_average(window, MOVING_AVERAGE_MONTHS)
+    total_moving = _moving_average(totals, MOVING_AVERAGE_MONTHS)
+
+    used = [index for index, key in enumerate(CATEGORY_KEYS) if matrix[index].any()]
+    result = {
+        'months': [_month_label(number) for number in range(last_month - months + 1, last_month + 1)],
+        'categories': {
+            CATEGORY_KEYS[index]: {
+                'monthly': _money(window[index]),
+                'moving_average': _money(moving[index]),
+                'forecast': _money(category_forecast[index]),
+            }
+            for index in used
+        },
+        'total': {
+            'monthly': _money(totals),
+            'moving_average': _money(total_moving),
+            'previous_year': _money(previous_year),
+            'yoy_delta': _money(yoy_delta),
+            'yoy_percent': [None if np.isnan(value) else round(float(value), 1) for value in yoy_pct],
+        },
+        'forecast': {
+            'months': [_month_label(last_month + step) for step in range(1, forecast_months + 1)],
+            'total': _money(total_forecast),
+        },
+    }
+    cache.set(cache_key, result, ANALYTICS_CACHE_TIMEOUT)
+    return result
@@ -0,0 +1,118 @@
+"""
+Monthly expense rollups.
+
+ExpenseRollup holds one row per (owner, pet, category, month). Every expense
+write recomputes the owner's rows for the touched months in the same
+transaction, and the expense summary reads whole months from the rollups,
+touching raw Expense rows only for partial months at the edges of a range.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+from .activity_rollups import month_start
+from .caching import bump_version
+from .models import Expense, ExpenseRollup
+
+
+def next_month(month):
+    """Return the first day of the month after month."""
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def grouped_expense_totals(expenses):
+    """Expense totals and counts grouped by owner, pet, category and month."""
+    return expenses.annotate(month=TruncMonth('date')).values(
+        'owner_id', 'pet_id', 'category', 'month'
+    ).annotate(
+        total=Sum('amount'),
+        expense_count=Count('id'),
+    ).order_by()
+
+
+def refresh_expense_rollups(owner_id, dates):
+    """Recompute the owner's rollups for the months containing the given dates."""
+    months = {month_start(day) for day in dates}
+    if not months:
+        return
+
+    in_months = Q()
+    for month in months:
+        in_months |= Q(date__gte=month, date__lt=next_month(month))
+
+    ExpenseRollup.objects.filter(owner_id=owner_id, month__in=months).delete()
+    ExpenseRollup.objects.bulk_create([
+        ExpenseRollup(**row)
+        for row in grouped_expense_totals(Expense.objects.filter(in_months, owner_id=owner_id))
+    ])
+
+
+def expenses_changed(owner_id, dates):
+    """
+    Bring derived expense data up to date after Expense rows were written.
+    Call this for every create, update, delete or bulk insert of expenses.
+    """
+    refresh_expense_rollups(owner_id, dates)
+    transaction.on_commit(lambda: bump_version('expense-analytics', owner_id))
+    transaction.on_commit(lambda: bump_version('dashboard', owner_id))
+
+
+def rebuild_expense_rollups(batch_size=1000):
+    """Rebuild every expense rollup from the raw Expense table. Returns rows written."""
+    ExpenseRollup.objects.all().delete()
+    rollups = [ExpenseRollup(**row) for row in grouped_expense_totals(Expense.objects.all())]
+    ExpenseRollup.objects.bulk_create(rollups, batch_size=batch_size)
+    return len(rollups)
+
+
+def expense_summary(owner_id, pet_id=None, category=None, start=None, end=None):
+    """
+    Totals per category for an owner's expenses, optionally filtered by pet,
+    category and an inclusive date range. Returns (categories, grand_total).
+    """
+    filters = {}
+    if pet_id is not None:
+        filters['pet_id'] = pet_id
+    if category:
+        filters['category'] = category
+
+    # Whole months inside [start, end] come from the rollups
+    full_start = start if start is None or start.day == 1 else next_month(start)
+    full_end = None if end is None else month_start(end + timedelta(days=1))
+
+    totals = {}
+
+    def add(rows):
+        for row in rows:
+            totals[row['category']] = totals.get(row['category'], 0) + row['total']
+
+    if full_start is not None and full_end is not None and full_start >= full_end:
+        # The range does not cover a whole month
+        raw = Expense.objects.filter(owner_id=owner_id, date__gte=start, date__lte=end, **filters)
+        add(raw.values('category').annotate(total=Sum('amount')).order_by())
+    else:
+        rollups = ExpenseRollup.objects.filter(owner_id=owner_id, **filters)
+        if full_start is not None:
+            rollups = rollups.filter(month__gte=full_start)
+        if full_end is not None:
+            rollups = rollups.filter(month__lt=full_end)
+        add(rollups.values('category').annotate(total=Sum('total')).order_by())
+
+        # Partial months at either edge come from the raw rows
+        edges = Q()
+        if start is not None and full_start != start:
+            edges |= Q(date__gte=start, date__lt=full_start)
+        if end is not None and full_end <= end:
+            edges |= Q(date__gte=full_end, date__lte=end)
+        if edges:
+            raw = Expense.objects.filter(edges, owner_id=owner_id, **filters)
+            add(raw.values('category').annotate(total=Sum('amount')).order_by())
+
+    categories = sorted(
+        ({'category': key, 'total': value} for key, value in totals.items()),
+        key=lambda item: item['total'],
+        reverse=True,
+    )
+    return categories, sum(item['total'] for item in categories)
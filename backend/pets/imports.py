@@ -0,0 +1,146 @@
+"""
+Bulk expense import from CSV.
+
+Rows are read as a stream and handled in chunks: one query resolves the pet
+ids of a whole chunk, valid rows go in with bulk_create, and the expense
+rollups are refreshed once per chunk. Bad rows are reported, not fatal.
+"""
+import csv
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from .expense_rollups import expenses_changed
+from .models import Expense, Pet
+
+IMPORT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+CATEGORIES = dict(Expense.CATEGORY_CHOICES)
+CATEGORY_BY_LABEL = {label.lower(): key for key, label in Expense.CATEGORY_CHOICES}
+
+
+def _clean_row(row, owned_pet_ids):
+    """Return (Expense kwargs, None) or (None, {field: message})."""
+    errors = {}
+    row = {
+        (key or '').strip().lower(): (value or '').strip()
+        for key, value in row.items()
+        if key is not None
+    }
+
+    try:
+        expense_date = parse_date(row.get('date', ''))
+    except ValueError:
+        expense_date = None
+    if expense_date is None:
+        errors['date'] = 'Enter a valid date (YYYY-MM-DD).'
+
+    category = row.get('category', '').lower() or 'other'
+    category = category if category in CATEGORIES else CATEGORY_BY_LABEL.get(category)
+    if category is None:
+        errors['category'] = f"Must be one of {', '.join(CATEGORIES)}."
+
+    try:
+        amount = Decimal(row.get('amount', ''))
+        if not amount.is_finite() or amount.as_tuple().exponent < -2 or abs(amount) >= 10 ** 8:
+            raise InvalidOperation
+    except InvalidOperation:
+        amount = None
+        errors['amount'] = 'Enter a number with at most 2 decimal places.'
+
+    description = row.get('description', '')
+    if len(description) > 200:
+        errors['description'] = 'Ensure this field has no more than 200 characters.'
+
+    pet_id = row.get('pet', '')
+    if pet_id:
+        try:
+            pet_id = int(pet_id)
+        except ValueError:
+            pet_id = None
+        if pet_id not in owned_pet_ids:
+            errors['pet'] = 'Pet not found.'
+    else:
+        pet_id = None
+
+    if errors:
+        return None, errors
+    return {
+        'date': expense_date,
+        'category': category,
+        'amount': amount,
+        'description': description,
+        'pet_id': pet_id,
+    }, None
+
+
+def _pet_ids_in(rows):
+    ids = set()
+    for _, row in rows:
+        value = (row.get('pet') or '').strip()
+        if value.isdigit():
+            ids.add(int(value))
+    return ids
+
+
+def _chunks(rows, size):
+    chunk = []
+    # Line 1 is the header
+    for line_number, row in enumerate(rows, start=2):
+        chunk.append((line_number, row))
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def import_expenses(owner, rows, chunk_size=IMPORT_CHUNK_SIZE):
+    """
+    Import expense rows (dicts with date, category, amount, description, pet)
+    for owner. Returns a report with imported/failed counts and row errors.
+    """
+    imported = failed = 0
+    errors = []
+    report = {}
+
+    try:
+        for chunk in _chunks(rows, chunk_size):
+            imported_in_chunk, failed_in_chunk = _import_chunk(owner, chunk, chunk_size, errors)
+            imported += imported_in_chunk
+            failed += failed_in_chunk
+    except (UnicodeDecodeError, csv.Error) as e:
+        # Rows before the unreadable part stay imported
+        report['error'] = f'Could not read CSV: {e}'
+
+    report.update({
+        'imported': imported,
+        'failed': failed,
+        'errors': errors,
+        'errors_truncated': failed > len(errors),
+    })
+    return report
+
+
+def _import_chunk(owner, chunk, chunk_size, errors):
+    """Validate and insert one chunk. Returns (imported, failed)."""
+    failed = 0
+    owned_pet_ids = set(
+        Pet.objects.filter(owner=owner, id__in=_pet_ids_in(chunk)).values_list('id', flat=True)
+    )
+    expenses = []
+    for line_number, row in chunk:
+        values, row_errors = _clean_row(row, owned_pet_ids)
+        if row_errors:
+            failed += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({'row': line_number, 'errors': row_errors})
+            continue
+        expenses.append(Expense(owner=owner, **values))
+
+    if expenses:
+        with transaction.atomic():
+            Expense.objects.bulk_create(expenses, batch_size=chunk_size)
+            expenses_changed(owner.id, {expense.date for expense in expenses})
+    return len(expenses), failed
@@ -0,0 +1,73 @@
+"""
+Aggregation of tracker samples into daily Activity rows.
+
+Samples are folded into per-day totals while the request body streams in,
+then written with one bulk upsert. A per-device cursor makes re-sent,
+overlapping windows idempotent.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .activity_rollups import activity_changed
+from .models import Activity, ActivityDeviceCursor
+from .parsers import SAMPLE_FIELDS
+
+
+def ingest_samples(pet, device_id, samples):
+    """
+    Add samples newer than the device cursor to the pet's daily activities.
+    Returns a summary dict with accepted/skipped counts and touched dates.
+    """
+    with transaction.atomic():
+        cursor, _ = ActivityDeviceCursor.objects.select_for_update().get_or_create(
+            pet=pet, device_id=device_id
+        )
+        watermark = cursor.last_sample_at
+        newest = watermark
+        totals = {}
+        accepted = skipped = 0
+
+        for sample in samples:
+            ts = sample['ts']
+            if watermark is not None and ts <= watermark:
+                skipped += 1
+                continue
+            day = timezone.localtime(ts).date()
+            day_totals = totals.setdefault(day, dict.fromkeys(SAMPLE_FIELDS, 0))
+            for field in SAMPLE_FIELDS:
+                day_totals[field] += sample[field]
+            if newest is None or ts > newest:
+                newest = ts
+            accepted += 1
+
+        if totals:
+            existing = {
+                row[0]: row[1:]
+                for row in Activity.objects.select_for_update().filter(
+                    pet=pet, date__in=list(totals)
+                ).values_list('date', *SAMPLE_FIELDS)
+            }
+            rows = []
+            for day, day_totals in totals.items():
+                previous = existing.get(day, (0,) * len(SAMPLE_FIELDS))
+                values = {
+                    field: old + day_totals[field]
+                    for field, old in zip(SAMPLE_FIELDS, previous)
+                }
+                rows.append(Activity(pet=pet, date=day, **values))
+            Activity.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=['pet', 'date'],
+                update_fields=[*SAMPLE_FIELDS, 'updated_at'],
+            )
+            cursor.last_sample_at = newest
+            cursor.save(update_fields=['last_sample_at', 'updated_at'])
+            activity_changed(pet.id, totals)
+
+    return {
+        'accepted': accepted,
+        'skipped': skipped,
+        'dates': sorted(totals),
+        'last_sample_at': newest,
+    }
@@ -0,0 +1,76 @@
+"""
+Weekly activity leaderboard.
+
+Only pets that opted in have LeaderboardEntry rows. Entries mirror the weekly
+rollups and are indexed by (week_start, metric), so a page of the board and a
+pet's rank are both index range reads instead of a GROUP BY over activities.
+"""
+from django.db.models import Q
+from rest_framework.pagination import CursorPagination
+
+from .models import ActivityGoal, ActivityRollup, LeaderboardEntry
+
+LEADERBOARD_METRICS = {
+    'steps': 'steps',
+    'minutes': 'active_minutes',
+}
+
+
+def _entry_from_rollup(rollup):
+    return LeaderboardEntry(
+        pet_id=rollup.pet_id,
+        week_start=rollup.period_start,
+        steps=rollup.steps,
+        active_minutes=rollup.walking_minutes + rollup.play_minutes,
+    )
+
+
+def sync_leaderboard(pet_id, week_starts):
+    """Copy the given weekly rollups of an opted-in pet into the leaderboard."""
+    if not ActivityGoal.objects.filter(pet_id=pet_id, leaderboard_opt_in=True).exists():
+        return
+    rollups = ActivityRollup.objects.filter(
+        pet_id=pet_id, granularity='week', period_start__in=week_starts
+    )
+    entries = [_entry_from_rollup(rollup) for rollup in rollups]
+    LeaderboardEntry.objects.filter(pet_id=pet_id, week_start__in=week_starts).exclude(
+        week_start__in=[entry.week_start for entry in entries]
+    ).delete()
+    LeaderboardEntry.objects.bulk_create(
+        entries,
+        update_conflicts=True,
+        unique_fields=['pet', 'week_start'],
+        update_fields=['steps', 'active_minutes', 'updated_at'],
+    )
+
+
+def set_leaderboard_opt_in(pet_id, opt_in):
+    """Add all of a pet's weeks to the leaderboard, or remove them."""
+    LeaderboardEntry.objects.filter(pet_id=pet_id).delete()
+    if opt_in:
+        rollups = ActivityRollup.objects.filter(pet_id=pet_id, granularity='week')
+        LeaderboardEntry.objects.bulk_create(
+            [_entry_from_rollup(rollup) for rollup in rollups]
+        )
+
+
+def leaderboard_rank(entries, pet_id, field):
+    """
+    1-based position of pet_id within entries ordered by (-field, pet_id),
+    the board's page order, or None if absent. Ties are broken by pet id.
+    """
+    value = entries.filter(pet_id=pet_id).values_list(field, flat=True).first()
+    if value is None:
+        return None
+    ahead = Q(**{f'{field}__gt': value}) | Q(**{field: value, 'pet_id__lt': pet_id})
+    return entries.filter(ahead).count() + 1
+
+
+class LeaderboardPagination(CursorPagination):
+    """Cursor pagination ordered by the requested leaderboard metric."""
+
+    page_size = 20
+
+    def get_ordering(self, request, queryset, view):
+        field = LEADERBOARD_METRICS.get(request.query_params.get('metric'), 'steps')
+        return (f'-{field}', 'pet_id')
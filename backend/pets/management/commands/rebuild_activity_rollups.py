@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from pets.activity_rollups import rebuild_all_rollups
+
+
+class Command(BaseCommand):
+    """Rebuild weekly and monthly activity rollups from the Activity table."""
+
+    help = 'Rebuild weekly and monthly activity rollups from raw Activity rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            written = rebuild_all_rollups(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} activity rollups.'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from pets.streaks import rebuild_streaks
+
+
+class Command(BaseCommand):
+    """Rebuild activity streak state for every pet in one pass."""
+
+    help = 'Recompute activity streaks and longest streaks from raw Activity rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pet', type=int, action='append', dest='pet_ids',
+                            help='Only rebuild these pet ids (repeatable).')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            written = rebuild_streaks(
+                pet_ids=options['pet_ids'],
+                batch_size=options['batch_size'],
+            )
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt streaks for {written} pets.'))
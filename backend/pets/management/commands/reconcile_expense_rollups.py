@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from pets.expense_rollups import grouped_expense_totals, rebuild_expense_rollups
+from pets.models import Expense, ExpenseRollup
+
+
+class Command(BaseCommand):
+    """Compare expense rollups against raw expenses and optionally repair them."""
+
+    help = 'Check monthly expense rollups against the Expense table; use --fix to rebuild.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Rebuild rollups when they differ.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        key_fields = ('owner_id', 'pet_id', 'category', 'month')
+
+        expected = {
+            tuple(row[field] for field in key_fields): (row['total'], row['expense_count'])
+            for row in grouped_expense_totals(Expense.objects.all()).iterator()
+        }
+        actual = {
+            tuple(row[field] for field in key_fields): (row['total'], row['expense_count'])
+            for row in ExpenseRollup.objects.values(*key_fields, 'total', 'expense_count').iterator()
+        }
+
+        mismatches = [
+            key for key in expected.keys() | actual.keys()
+            if expected.get(key) != actual.get(key)
+        ]
+        for key in sorted(mismatches, key=str)[:50]:
+            self.stdout.write(f'{key}: expected {expected.get(key)}, found {actual.get(key)}')
+
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS(f'All {len(actual)} expense rollups match.'))
+            return
+
+        self.stdout.write(self.style.WARNING(f'{len(mismatches)} expense rollups differ.'))
+        if options['fix']:
+            with transaction.atomic():
+                written = rebuild_expense_rollups(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Rebuilt {written} expense rollups.'))
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0004_expense_feedingschedule_activity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('week', 'Week'), ('month', 'Month')], max_length=10)),
+                ('period_start', models.DateField()),
+                ('walking_minutes', models.IntegerField(default=0)),
+                ('steps', models.IntegerField(default=0)),
+                ('play_minutes', models.IntegerField(default=0)),
+                ('active_days', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('pet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_rollups', to='pets.pet')),
+            ],
+            options={
+                'verbose_name': 'Activity Rollup',
+                'verbose_name_plural': 'Activity Rollups',
+                'db_table': 'activity_rollups',
+                'ordering': ['period_start'],
+                'unique_together': {('pet', 'granularity', 'period_start')},
+            },
+        ),
+    ]
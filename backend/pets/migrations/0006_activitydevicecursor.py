@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0005_activityrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityDeviceCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('device_id', models.CharField(max_length=100)),
+                ('last_sample_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('pet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity_device_cursors', to='pets.pet')),
+            ],
+            options={
+                'verbose_name': 'Activity Device Cursor',
+                'verbose_name_plural': 'Activity Device Cursors',
+                'db_table': 'activity_device_cursors',
+                'unique_together': {('pet', 'device_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0006_activitydevicecursor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivityGoal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('daily_steps_goal', models.IntegerField(default=5000)),
+                ('daily_minutes_goal', models.IntegerField(default=30)),
+                ('streak_start', models.DateField(blank=True, null=True)),
+                ('streak_end', models.DateField(blank=True, null=True)),
+                ('longest_streak', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('pet', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='activity_goal', to='pets.pet')),
+            ],
+            options={
+                'verbose_name': 'Activity Goal',
+                'verbose_name_plural': 'Activity Goals',
+                'db_table': 'activity_goals',
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-19 17:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0007_activitygoal'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activitygoal',
+            name='leaderboard_opt_in',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week_start', models.DateField()),
+                ('steps', models.IntegerField(default=0)),
+                ('active_minutes', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('pet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='pets.pet')),
+            ],
+            options={
+                'verbose_name': 'Leaderboard Entry',
+                'verbose_name_plural': 'Leaderboard Entries',
+                'db_table': 'leaderboard_entries',
+                'indexes': [models.Index(fields=['week_start', '-steps', 'pet'], name='leaderboard_week_steps'), models.Index(fields=['week_start', '-active_minutes', 'pet'], name='leaderboard_week_minutes')],
+                'unique_together': {('pet', 'week_start')},
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0008_leaderboard'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpenseRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('food', 'Food'), ('litter', 'Litter'), ('medicines', 'Medicines'), ('toys', 'Toys'), ('grooming', 'Grooming'), ('vet', 'Vet Bills'), ('accessories', 'Accessories'), ('other', 'Other')], max_length=20)),
+                ('month', models.DateField()),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('expense_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('owner', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expense_rollups', to=settings.AUTH_USER_MODEL)),
+                ('pet', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='expense_rollups', to='pets.pet')),
+            ],
+            options={
+                'verbose_name': 'Expense Rollup',
+                'verbose_name_plural': 'Expense Rollups',
+                'db_table': 'expense_rollups',
+                'ordering': ['month'],
+                'indexes': [models.Index(fields=['owner', 'month'], name='expense_rollup_owner_month')],
+            },
+        ),
+    ]
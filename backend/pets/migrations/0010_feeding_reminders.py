@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0009_expenserollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='feedingschedule',
+            name='last_reminded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='feedingschedule',
+            index=models.Index(fields=['is_active', 'time'], name='feeding_active_time'),
+        ),
+        migrations.AddIndex(
+            model_name='feedingschedule',
+            index=models.Index(fields=['updated_at'], name='feeding_updated_at'),
+        ),
+    ]
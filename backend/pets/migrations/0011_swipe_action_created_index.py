@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0010_feeding_reminders'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='swipe',
+            index=models.Index(fields=['action', 'created_at'], name='swipe_action_created'),
+        ),
+    ]
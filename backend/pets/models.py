@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from datetime import date, timedelta
 
 
 class Pet(models.Model):
@@ -139,6 +140,9 @@ class Swipe(models.Model):
         verbose_name = 'Swipe'
         verbose_name_plural = 'Swipes'
         unique_together = ['swiper_pet', 'swiped_pet']
+        indexes = [
+            models.Index(fields=['action', 'created_at'], name='swipe_action_created'),
+        ]
 
     def __str__(self):
         return f"{self.swiper_pet.name} {self.action}d {self.swiped_pet.name}"
@@ -198,6 +202,146 @@ class Activity(models.Model):
         return f"{self.pet.name} activity on {self.date}"
 
 
+class ActivityRollup(models.Model):
+    """Weekly and monthly activity totals per pet, kept in sync with Activity rows."""
+
+    GRANULARITY_CHOICES = [
+        ('week', 'Week'),
+        ('month', 'Month'),
+    ]
+
+    pet = models.ForeignKey(
+        Pet,
+        on_delete=models.CASCADE,
+        related_name='activity_rollups'
+    )
+    granularity = models.CharField(max_length=10, choices=GRANULARITY_CHOICES)
+    period_start = models.DateField()  # Monday for weeks, 1st for months
+    walking_minutes = models.IntegerField(default=0)
+    steps = models.IntegerField(default=0)
+    play_minutes = models.IntegerField(default=0)
+    active_days = models.IntegerField(default=0)  # Activity rows in the period
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'activity_rollups'
+        verbose_name = 'Activity Rollup'
+        verbose_name_plural = 'Activity Rollups'
+        ordering = ['period_start']
+        unique_together = ['pet', 'granularity', 'period_start']
+
+    def __str__(self):
+        return f"{self.pet.name} {self.granularity} of {self.period_start}"
+
+
+class ActivityGoal(models.Model):
+    """
+    Daily activity goals for a pet plus incrementally maintained streak state.
+    A day meets the goal when either the step or the minutes goal is reached.
+    """
+
+    pet = models.OneToOneField(
+        Pet,
+        on_delete=models.CASCADE,
+        related_name='activity_goal'
+    )
+    daily_steps_goal = models.IntegerField(default=5000)
+    daily_minutes_goal = models.IntegerField(default=30)  # walking + play minutes
+
+    # Latest run of consecutive days meeting the goal
+    streak_start = models.DateField(null=True, blank=True)
+    streak_end = models.DateField(null=True, blank=True)
+    longest_streak = models.IntegerField(default=0)
+
+    # Opt-in to the weekly activity leaderboard
+    leaderboard_opt_in = models.BooleanField(default=False)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'activity_goals'
+        verbose_name = 'Activity Goal'
+        verbose_name_plural = 'Activity Goals'
+
+    def __str__(self):
+        return f"{self.pet.name} activity goal"
+
+    def goal_met(self, steps, active_minutes):
+        """Check whether a day's totals meet either daily goal (a goal of 0 is off)."""
+        return (
+            (self.daily_steps_goal > 0 and steps >= self.daily_steps_goal)
+            or (self.daily_minutes_goal > 0 and active_minutes >= self.daily_minutes_goal)
+        )
+
+    def current_streak(self, today=None):
+        """Length of the running streak; it is broken once yesterday was missed."""
+        today = today or date.today()
+        if not self.streak_end or self.streak_end < today - timedelta(days=1):
+            return 0
+        return (self.streak_end - self.streak_start).days + 1
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Weekly activity totals of a pet that opted in to the leaderboard.
+    Copied from the weekly rollups on every activity write.
+    """
+
+    pet = models.ForeignKey(
+        Pet,
+        on_delete=models.CASCADE,
+        related_name='leaderboard_entries'
+    )
+    week_start = models.DateField()
+    steps = models.IntegerField(default=0)
+    active_minutes = models.IntegerField(default=0)  # walking + play minutes
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'leaderboard_entries'
+        verbose_name = 'Leaderboard Entry'
+        verbose_name_plural = 'Leaderboard Entries'
+        unique_together = ['pet', 'week_start']
+        indexes = [
+            # Top-N pages and "how many are ahead of me" counts per week
+            models.Index(fields=['week_start', '-steps', 'pet'], name='leaderboard_week_steps'),
+            models.Index(fields=['week_start', '-active_minutes', 'pet'], name='leaderboard_week_minutes'),
+        ]
+
+    def __str__(self):
+        return f"{self.pet.name} week of {self.week_start}"
+
+
+class ActivityDeviceCursor(models.Model):
+    """
+    Newest sample timestamp ingested from a tracker for a pet.
+    Samples at or before it are skipped, so re-sent windows are not counted twice.
+    """
+
+    pet = models.ForeignKey(
+        Pet,
+        on_delete=models.CASCADE,
+        related_name='activity_device_cursors'
+    )
+    device_id = models.CharField(max_length=100)
+    last_sample_at = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'activity_device_cursors'
+        verbose_name = 'Activity Device Cursor'
+        verbose_name_plural = 'Activity Device Cursors'
+        unique_together = ['pet', 'device_id']
+
+    def __str__(self):
+        return f"{self.pet.name} device {self.device_id}"
+
+
 class FeedingSchedule(models.Model):
     """Feeding schedule for pets."""
 
@@ -210,6 +354,7 @@ class FeedingSchedule(models.Model):
     food_type = models.CharField(max_length=100, blank=True)  # e.g., "Dry food", "Wet food"
     portion = models.CharField(max_length=50, blank=True)  # e.g., "1 cup", "200g"
     is_active = models.BooleanField(default=True)
+    last_reminded_at = models.DateTimeField(null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -219,6 +364,11 @@ class FeedingSchedule(models.Model):
         verbose_name = 'Feeding Schedule'
         verbose_name_plural = 'Feeding Schedules'
         ordering = ['time']
+        indexes = [
+            # Scheduler start-up load and change polling
+            models.Index(fields=['is_active', 'time'], name='feeding_active_time'),
+            models.Index(fields=['updated_at'], name='feeding_updated_at'),
+        ]
 
     def __str__(self):
         return f"{self.pet.name} feeding at {self.time}"
@@ -271,3 +421,38 @@ class Expense(models.Model):
     def __str__(self):
         pet_name = self.pet.name if self.pet else "General"
         return f"{self.category} - ${self.amount} ({pet_name})"
+
+
+class ExpenseRollup(models.Model):
+    """Monthly expense totals per owner, pet and category, kept in sync with Expense rows."""
+
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='expense_rollups'
+    )
+    pet = models.ForeignKey(
+        Pet,
+        on_delete=models.CASCADE,
+        related_name='expense_rollups',
+        null=True,
+        blank=True  # General expenses not tied to a pet
+    )
+    category = models.CharField(max_length=20, choices=Expense.CATEGORY_CHOICES)
+    month = models.DateField()  # First day of the month
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    expense_count = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'expense_rollups'
+        verbose_name = 'Expense Rollup'
+        verbose_name_plural = 'Expense Rollups'
+        ordering = ['month']
+        indexes = [
+            models.Index(fields=['owner', 'month'], name='expense_rollup_owner_month'),
+        ]
+
+    def __str__(self):
+        return f"{self.owner} {self.category} {self.month:%Y-%m}: {self.total}"
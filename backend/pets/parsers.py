@@ -0,0 +1,183 @@
+"""
+Streaming parsers for activity samples sent by collars and trackers.
+
+The parsers return generators, so the request body is read and decoded
+sample by sample instead of being loaded into memory as a whole.
+"""
+import codecs
+import csv
+import json
+from datetime import datetime, timezone as dt_timezone
+
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+
+SAMPLE_FIELDS = ('steps', 'walking_minutes', 'play_minutes')
+READ_CHUNK_SIZE = 64 * 1024
+MAX_SAMPLE_SIZE = 64 * 1024
+
+
+def parse_sample(item, position):
+    """
+    Turn one decoded sample into a dict.
+
+    Accepts an object {"ts": ..., "steps": ..., "walking_minutes": ...,
+    "play_minutes": ...} or a compact array [ts, steps, walking_minutes,
+    play_minutes]. ts is epoch seconds or an ISO 8601 datetime.
+    """
+    if isinstance(item, list):
+        if not 1 < len(item) <= len(SAMPLE_FIELDS) + 1:
+            raise ParseError(f'Sample {position}: expected [ts, steps, walking_minutes, play_minutes].')
+        ts, values = item[0], item[1:]
+        item = dict(zip(SAMPLE_FIELDS, values), ts=ts)
+    elif not isinstance(item, dict):
+        raise ParseError(f'Sample {position}: expected an object or an array.')
+
+    ts = item.get('ts')
+    timestamp = None
+    try:
+        if isinstance(ts, (int, float)) and not isinstance(ts, bool):
+            timestamp = datetime.fromtimestamp(ts, tz=dt_timezone.utc)
+        elif isinstance(ts, str):
+            timestamp = parse_datetime(ts)
+    except (OverflowError, OSError, ValueError):
+        # Out-of-range or NaN epochs, impossible dates such as Feb 30
+        timestamp = None
+    if timestamp is None:
+        raise ParseError(f'Sample {position}: invalid or missing ts.')
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=dt_timezone.utc)
+
+    sample = {'ts': timestamp}
+    for field in SAMPLE_FIELDS:
+        value = item.get(field) or 0
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            raise ParseError(f'Sample {position}: {field} must be a non-negative integer.')
+        sample[field] = value
+    return sample
+
+
+def _decode_chunks(stream, encoding):
+    decoder = codecs.getincrementaldecoder(encoding)()
+    while True:
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield decoder.decode(chunk)
+    yield decoder.decode(b'', final=True)
+
+
+class NDJSONSampleParser(BaseParser):
+    """Parses newline-delimited JSON samples, one object or array per line."""
+
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        return self._samples(stream, encoding)
+
+    def _samples(self, stream, encoding):
+        if stream is None:
+            return
+        for line_number, line in enumerate(stream, start=1):
+            line = line.decode(encoding).strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                raise ParseError(f'Sample {line_number}: invalid JSON.')
+            yield parse_sample(item, line_number)
+
+
+class JSONArraySampleParser(BaseParser):
+    """
+    Parses a top-level JSON array of samples, e.g. [[ts, steps, walk, play], ...].
+    Elements are decoded one at a time from a small rolling buffer.
+    """
+
+    media_type = 'application/json'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        return self._samples(stream, encoding)
+
+    def _samples(self, stream, encoding):
+        if stream is None:
+            return
+        decoder = json.JSONDecoder()
+        buffer = ''
+        position = 0
+        started = finished = False
+        # After '[' or ',' a sample must follow; after a sample, ',' or ']'
+        expect_sample = True
+
+        for text in _decode_chunks(stream, encoding):
+            # Drop the consumed prefix once per chunk, not once per element
+            buffer = buffer + text
+            index = 0
+            while True:
+                while index < len(buffer) and buffer[index] in ' \t\r\n':
+                    index += 1
+                if index == len(buffer):
+                    break
+                if finished:
+                    raise ParseError('Unexpected data after the sample array.')
+                char = buffer[index]
+                if not started:
+                    if char != '[':
+                        raise ParseError('Expected a JSON array of samples.')
+                    started = True
+                    index += 1
+                    continue
+                if char == ']':
+                    if expect_sample and position:
+                        raise ParseError(f'Sample {position + 1}: expected a sample after ",".')
+                    finished = True
+                    index += 1
+                    continue
+                if char == ',':
+                    if expect_sample:
+                        raise ParseError(f'Sample {position + 1}: unexpected ",".')
+                    expect_sample = True
+                    index += 1
+                    continue
+                if not expect_sample:
+                    raise ParseError(f'Sample {position + 1}: expected "," between samples.')
+                try:
+                    item, end = decoder.raw_decode(buffer, index)
+                except ValueError:
+                    # Element is incomplete; wait for the next chunk
+                    if len(buffer) - index > MAX_SAMPLE_SIZE:
+                        raise ParseError(f'Sample {position + 1}: invalid JSON.')
+                    break
+                position += 1
+                index = end
+                expect_sample = False
+                yield parse_sample(item, position)
+            buffer = buffer[index:]
+
+        if not finished:
+            raise ParseError('Sample array is incomplete.')
+
+
+def decode_lines(lines, encoding='utf-8'):
+    """Decode an iterable of byte lines, dropping a UTF-8 byte order mark."""
+    for line_number, line in enumerate(lines):
+        text = line.decode(encoding)
+        if line_number == 0:
+            text = text.lstrip('\ufeff')
+        yield text
+
+
+class CSVRowParser(BaseParser):
+    """Parses a text/csv body into a generator of row dicts keyed by the header."""
+
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if stream is None:
+            return iter(())
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        return csv.DictReader(decode_lines(stream, encoding))
@@ -0,0 +1,11 @@
+from life_of_pets_api.retention import RetentionPolicy, register
+
+from .models import Swipe
+
+# Forgetting an old dislike lets the pet show up in discovery again
+register(RetentionPolicy(
+    name='swipe_dislikes',
+    description='Dislike swipes older than the retention period',
+    days=180,
+    stale=lambda now, cutoff: Swipe.objects.filter(action='dislike', created_at__lt=cutoff),
+))
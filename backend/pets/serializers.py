@@ -1,5 +1,9 @@
 from rest_framework import serializers
-from .models import Pet, PetPhoto, MatchingPreferences, Swipe, Match, Activity, FeedingSchedule, Expense
+from events.serializers import HealthDueDateSerializer
+from .models import (
+    Pet, PetPhoto, MatchingPreferences, Swipe, Match, Activity, ActivityGoal, ActivityRollup,
+    LeaderboardEntry, FeedingSchedule, Expense,
+)
 
 
 class PetPhotoSerializer(serializers.ModelSerializer):
@@ -32,6 +36,15 @@ class PetSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class OwnPetSerializer(PetSerializer):
+    """Pet details for the owner, including health due dates."""
+
+    health_due = HealthDueDateSerializer(source='health_due_dates', many=True, read_only=True)
+
+    class Meta(PetSerializer.Meta):
+        fields = PetSerializer.Meta.fields + ['health_due']
+
+
 class MatchingPreferencesSerializer(serializers.ModelSerializer):
     """Serializer for matching preferences."""
 
@@ -99,6 +112,72 @@ class ActivitySerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at']
 
 
+class ActivityRollupSerializer(serializers.ModelSerializer):
+    """Serializer for weekly/monthly activity totals."""
+
+    class Meta:
+        model = ActivityRollup
+        fields = [
+            'granularity', 'period_start', 'walking_minutes',
+            'steps', 'play_minutes', 'active_days'
+        ]
+        read_only_fields = fields
+
+
+class ActivityGoalSerializer(serializers.ModelSerializer):
+    """Serializer for activity goals, streaks and this week's progress."""
+
+    pet_name = serializers.CharField(source='pet.name', read_only=True)
+    current_streak = serializers.SerializerMethodField()
+    week = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ActivityGoal
+        fields = [
+            'pet', 'pet_name', 'daily_steps_goal', 'daily_minutes_goal',
+            'current_streak', 'longest_streak', 'streak_start', 'streak_end',
+            'week', 'leaderboard_opt_in', 'updated_at'
+        ]
+        read_only_fields = [
+            'pet', 'longest_streak', 'streak_start', 'streak_end', 'updated_at'
+        ]
+
+    def validate(self, attrs):
+        steps_goal = attrs.get('daily_steps_goal', getattr(self.instance, 'daily_steps_goal', 0))
+        minutes_goal = attrs.get('daily_minutes_goal', getattr(self.instance, 'daily_minutes_goal', 0))
+        if steps_goal < 0 or minutes_goal < 0:
+            raise serializers.ValidationError("Goals cannot be negative.")
+        if not steps_goal and not minutes_goal:
+            raise serializers.ValidationError("Set a step goal, a minutes goal, or both.")
+        return attrs
+
+    def get_current_streak(self, obj):
+        return obj.current_streak()
+
+    def get_week(self, obj):
+        # This week's totals are passed in by the view from the weekly rollups
+        rollup = self.context.get('week_rollups', {}).get(obj.pet_id)
+        steps = rollup.steps if rollup else 0
+        minutes = rollup.walking_minutes + rollup.play_minutes if rollup else 0
+        return {
+            'steps': steps,
+            'steps_goal': obj.daily_steps_goal * 7,
+            'active_minutes': minutes,
+            'minutes_goal': obj.daily_minutes_goal * 7,
+        }
+
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    """Serializer for a pet's row on the weekly leaderboard."""
+
+    pet_name = serializers.CharField(source='pet.name', read_only=True)
+
+    class Meta:
+        model = LeaderboardEntry
+        fields = ['pet', 'pet_name', 'week_start', 'steps', 'active_minutes']
+        read_only_fields = fields
+
+
 class FeedingScheduleSerializer(serializers.ModelSerializer):
     """Serializer for feeding schedules."""
 
@@ -108,9 +187,9 @@ class FeedingScheduleSerializer(serializers.ModelSerializer):
         model = FeedingSchedule
         fields = [
             'id', 'pet', 'pet_name', 'time', 'food_type',
-            'portion', 'is_active', 'created_at', 'updated_at'
+            'portion', 'is_active', 'last_reminded_at', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'last_reminded_at', 'created_at', 'updated_at']
 
 
 class ExpenseSerializer(serializers.ModelSerializer):
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .dashboard import dashboard_changed
+from .models import FeedingSchedule, Pet, PetPhoto
+
+
+@receiver(post_save, sender=Pet)
+@receiver(post_delete, sender=Pet)
+def pet_changed(sender, instance, **kwargs):
+    """Drop the owner's cached dashboard when a pet changes."""
+    dashboard_changed(instance.owner_id)
+
+
+@receiver(post_save, sender=PetPhoto)
+@receiver(post_delete, sender=PetPhoto)
+@receiver(post_save, sender=FeedingSchedule)
+@receiver(post_delete, sender=FeedingSchedule)
+def pet_detail_changed(sender, instance, **kwargs):
+    """Drop the owner's cached dashboard when a photo or feeding schedule changes."""
+    owner_id = Pet.objects.filter(pk=instance.pet_id).values_list('owner_id', flat=True).first()
+    if owner_id is not None:
+        dashboard_changed(owner_id)
@@ -0,0 +1,174 @@
+"""
+Activity streaks maintained incrementally.
+
+ActivityGoal stores the latest run of consecutive goal days. A write to one
+day only looks at that day and, for backdated edits, at the neighbouring run,
+scanning outward in small date windows until a gap is found.
+"""
+from datetime import timedelta
+
+from django.db.models import F, Q
+
+from .models import Activity, ActivityGoal
+
+SCAN_WINDOW_DAYS = 31
+
+
+def goal_met_q(goal):
+    """Q object matching Activity rows that meet the goal."""
+    condition = Q(pk__in=[])
+    if goal.daily_steps_goal > 0:
+        condition |= Q(steps__gte=goal.daily_steps_goal)
+    if goal.daily_minutes_goal > 0:
+        condition |= Q(active_minutes__gte=goal.daily_minutes_goal)
+    return condition
+
+
+def _met_activities(pet_id, goal):
+    return Activity.objects.filter(pet_id=pet_id).annotate(
+        active_minutes=F('walking_minutes') + F('play_minutes')
+    ).filter(goal_met_q(goal))
+
+
+def _scan_run_edge(pet_id, goal, day, step):
+    """
+    Walk from day (a goal day) in direction step (-1 or +1) and return the
+    last consecutive goal day, one window of dates per query.
+    """
+    edge = day
+    while True:
+        if step < 0:
+            window = _met_activities(pet_id, goal).filter(
+                date__lt=edge, date__gte=edge - timedelta(days=SCAN_WINDOW_DAYS)
+            ).order_by('-date')
+        else:
+            window = _met_activities(pet_id, goal).filter(
+                date__gt=edge, date__lte=edge + timedelta(days=SCAN_WINDOW_DAYS)
+            ).order_by('date')
+        consecutive = 0
+        for met_date in window.values_list('date', flat=True):
+            if met_date != edge + timedelta(days=step):
+                return edge
+            edge = met_date
+            consecutive += 1
+        if consecutive < SCAN_WINDOW_DAYS:
+            return edge
+
+
+def _run_around(pet_id, goal, day, backward=True, forward=True):
+    start = _scan_run_edge(pet_id, goal, day, -1) if backward else day
+    end = _scan_run_edge(pet_id, goal, day, 1) if forward else day
+    return start, end
+
+
+def _day_met(pet_id, goal, day):
+    row = Activity.objects.filter(pet_id=pet_id, date=day).values_list(
+        'steps', 'walking_minutes', 'play_minutes'
+    ).first()
+    return bool(row) and goal.goal_met(row[0], row[1] + row[2])
+
+
+def update_streak(pet_id, day):
+    """Fold a write to one day into the pet's streak state."""
+    goal = ActivityGoal.objects.select_for_update().filter(pet_id=pet_id).first()
+    if goal is None:
+        # First write for this pet: initialise from its history once
+        rebuild_streaks(pet_ids=[pet_id])
+        return
+
+    met = _day_met(pet_id, goal, day)
+    start, end = goal.streak_start, goal.streak_end
+    run_length = None
+
+    if end is None or day > end:
+        if met:
+            start = start if end and day == end + timedelta(days=1) else day
+            end = day
+            run_length = (end - start).days + 1
+    elif start <= day <= end:
+        if met:
+            run_length = (end - start).days + 1
+        elif day < end:
+            start = day + timedelta(days=1)
+        else:
+            previous = _met_activities(pet_id, goal).filter(
+                date__lt=day
+            ).order_by('-date').values_list('date', flat=True).first()
+            if previous:
+                start, end = _run_around(pet_id, goal, previous, forward=False)
+            else:
+                start = end = None
+    elif met and day == start - timedelta(days=1):
+        start, _ = _run_around(pet_id, goal, day, forward=False)
+        run_length = (end - start).days + 1
+    elif met:
+        # Backdated edit outside the latest run: only its own run can change
+        run_start, run_end = _run_around(pet_id, goal, day)
+        run_length = (run_end - run_start).days + 1
+
+    goal.streak_start, goal.streak_end = start, end
+    if run_length and run_length > goal.longest_streak:
+        goal.longest_streak = run_length
+    goal.save(update_fields=['streak_start', 'streak_end', 'longest_streak', 'updated_at'])
+
+
+def update_streaks(pet_id, dates):
+    """Fold writes to several days into the pet's streak state, oldest first."""
+    for day in sorted(dates):
+        update_streak(pet_id, day)
+
+
+def rebuild_streaks(pet_ids=None, batch_size=1000):
+    """
+    Recompute streak state from scratch with a single ordered pass over the
+    activity table. Returns the number of goals written.
+    """
+    goals = ActivityGoal.objects.all()
+    activities = Activity.objects.all()
+    if pet_ids is not None:
+        goals = goals.filter(pet_id__in=pet_ids)
+        activities = activities.filter(pet_id__in=pet_ids)
+    goals = {goal.pet_id: goal for goal in goals}
+
+    states = {}
+    rows = activities.order_by('pet_id', 'date').values_list(
+        'pet_id', 'date', 'steps', 'walking_minutes', 'play_minutes'
+    )
+    for pet_id, day, steps, walking_minutes, play_minutes in rows.iterator(chunk_size=5000):
+        goal = goals.get(pet_id)
+        if goal is None:
+            goal = goals[pet_id] = ActivityGoal(pet_id=pet_id)
+        if not goal.goal_met(steps, walking_minutes + play_minutes):
+            continue
+        state = states.setdefault(pet_id, {'start': None, 'end': None, 'longest': 0})
+        if state['end'] and day == state['end'] + timedelta(days=1):
+            state['end'] = day
+        else:
+            state['start'] = state['end'] = day
+        state['longest'] = max(state['longest'], (state['end'] - state['start']).days + 1)
+
+    if pet_ids is not None:
+        for pet_id in pet_ids:
+            goals.setdefault(pet_id, ActivityGoal(pet_id=pet_id))
+
+    # Fresh instances without a pk, so the upsert only conflicts on pet
+    rebuilt = []
+    for pet_id, goal in goals.items():
+        state = states.get(pet_id, {'start': None, 'end': None, 'longest': 0})
+        rebuilt.append(ActivityGoal(
+            pet_id=pet_id,
+            daily_steps_goal=goal.daily_steps_goal,
+            daily_minutes_goal=goal.daily_minutes_goal,
+            streak_start=state['start'],
+            streak_end=state['end'],
+            longest_streak=state['longest'],
+        ))
+
+    ActivityGoal.objects.bulk_create(
+        rebuilt,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=['pet'],
+        update_fields=['streak_start', 'streak_end', 'longest_streak', 'updated_at'],
+    )
+    return len(goals)
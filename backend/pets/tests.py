@@ -1,3 +1,661 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import random
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db.models import Sum
+from django.test import AsyncClient
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.test import APITestCase
+
+from events.health import refresh_health_due_dates
+from events.models import Event
+from notifications.backends import LocmemBackend
+from notifications.event_reminders import EventReminderWorker
+from users.models import User
+from users.tokens import VersionedRefreshToken
+
+from . import parsers
+from .activity_rollups import activity_changed
+from .expense_analytics import expense_analytics
+from .downsampling import lttb_indices, minmax_indices
+from .streaks import rebuild_streaks
+from .leaderboard import LeaderboardPagination
+from .models import (
+    Activity, ActivityGoal, ActivityRollup, Expense, ExpenseRollup, LeaderboardEntry, Match,
+    FeedingSchedule, MatchingPreferences, Pet, PetPhoto, Swipe,
+)
+
+
+class OwnerTestCase(APITestCase):
+    """Two owners with one pet each; requests are made as the first owner."""
+
+    def setUp(self):
+        self.user = User.objects.create_user('owner', 'owner@example.com', 'Str0ngPass!x')
+        self.other = User.objects.create_user('other', 'other@example.com', 'Str0ngPass!x')
+        self.pet = Pet.objects.create(owner=self.user, name='Rex')
+        self.other_pet = Pet.objects.create(owner=self.other, name='Tom')
+        self.client.force_authenticate(self.user)
+
+
+class ActivityRollupTests(OwnerTestCase):
+    """Weekly and monthly rollups follow every activity write."""
+
+    def create_activity(self, day, steps):
+        response = self.client.post('/api/activities/', {
+            'pet': self.pet.id, 'date': str(day), 'steps': steps,
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.data['id']
+
+    def test_rollups_follow_create_update_and_delete(self):
+        first = self.create_activity(date(2025, 3, 5), 50)
+        self.create_activity(date(2025, 3, 6), 25)
+        week = ActivityRollup.objects.get(pet=self.pet, granularity='week', period_start=date(2025, 3, 3))
+        self.assertEqual((week.steps, week.active_days), (75, 2))
+
+        self.client.patch(f'/api/activities/{first}/', {'date': '2025-04-01'}, format='json')
+        week.refresh_from_db()
+        self.assertEqual((week.steps, week.active_days), (25, 1))
+        april = ActivityRollup.objects.get(pet=self.pet, granularity='month', period_start=date(2025, 4, 1))
+        self.assertEqual(april.steps, 50)
+
+        self.client.delete(f'/api/activities/{first}/')
+        self.assertFalse(ActivityRollup.objects.filter(period_start=date(2025, 4, 1)).exists())
+
+    def test_series_endpoint(self):
+        self.create_activity(date(2025, 3, 20), 25)
+        self.create_activity(date(2025, 4, 2), 50)
+        response = self.client.get('/api/activities/series/', {
+            'pet': self.pet.id, 'granularity': 'month', 'start': '2025-03-15', 'end': '2025-04-30',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['steps'] for row in response.data], [25, 50])
+
+        response = self.client.get('/api/activities/series/', {'pet': self.other_pet.id})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get('/api/activities/series/', {'pet': self.pet.id, 'start': 'x'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_rebuild_matches_incremental_rollups(self):
+        for offset in range(0, 60, 3):
+            self.create_activity(date(2025, 1, 1) + timedelta(days=offset), offset)
+
+        def rollups():
+            return sorted(ActivityRollup.objects.values_list(
+                'granularity', 'period_start', 'steps', 'active_days'
+            ))
+
+        before = rollups()
+        call_command('rebuild_activity_rollups')
+        self.assertEqual(rollups(), before)
+        self.assertEqual(Activity.objects.count(), 20)
+
+
+class IngestionTests(OwnerTestCase):
+    """Streaming tracker samples into daily activities."""
+
+    def setUp(self):
+        super().setUp()
+        self.url = f'/api/activities/ingest/?pet={self.pet.id}&device=collar1'
+        self.start = int(datetime(2025, 5, 1, 10, tzinfo=dt_timezone.utc).timestamp())
+
+    def ingest(self, body, content_type='application/x-ndjson'):
+        return self.client.post(self.url, body, content_type=content_type)
+
+    def test_ndjson_samples_are_summed_per_day(self):
+        lines = [json.dumps([self.start + i * 30, 10, 1, 0]) for i in range(1000)]
+        lines.append(json.dumps({'ts': '2025-05-02T08:00:00Z', 'steps': 7, 'play_minutes': 3}))
+        response = self.ingest('\n'.join(lines))
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data['accepted'], 1001)
+        day = Activity.objects.get(pet=self.pet, date='2025-05-01')
+        self.assertEqual((day.steps, day.walking_minutes), (10000, 1000))
+
+    def test_resent_samples_are_skipped(self):
+        self.ingest('\n'.join(json.dumps([self.start + i * 30, 10, 1, 0]) for i in range(1000)))
+        samples = [[self.start + i * 30, 10, 1, 0] for i in range(990, 1100)]
+        response = self.ingest(json.dumps(samples), 'application/json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual((response.data['accepted'], response.data['skipped']), (100, 10))
+        self.assertEqual(Activity.objects.get(pet=self.pet, date='2025-05-01').steps, 11000)
+        self.assertEqual(ActivityRollup.objects.get(pet=self.pet, granularity='month').steps, 11000)
+
+    def test_malformed_bodies_are_rejected(self):
+        self.assertEqual(self.ingest('[[1,2],', 'application/json').status_code, 400)
+        self.assertEqual(self.ingest('nope').status_code, 400)
+        for ts in ('1e20', 'NaN', '"2024-02-30T00:00"', '"soon"'):
+            response = self.ingest(f'[{ts}, 1]')
+            self.assertEqual(response.status_code, 400, ts)
+            self.assertIn('invalid or missing ts', response.data['detail'])
+        self.assertFalse(Activity.objects.exists())
+
+    def test_other_owners_pet(self):
+        url = f'/api/activities/ingest/?pet={self.other_pet.id}&device=x'
+        response = self.client.post(url, '[]', content_type='application/json')
+        self.assertEqual(response.status_code, 404)
+
+    def test_array_parser_reads_in_small_chunks(self):
+        samples = [[1700000000 + i, i, 0, 0] for i in range(200)]
+        with mock.patch.object(parsers, 'READ_CHUNK_SIZE', 7):
+            parsed = list(parsers.JSONArraySampleParser().parse(io.BytesIO(json.dumps(samples).encode())))
+        self.assertEqual([sample['steps'] for sample in parsed], list(range(200)))
+
+    def test_array_parser_requires_one_comma_between_samples(self):
+        parse = parsers.JSONArraySampleParser().parse
+        self.assertEqual(list(parse(io.BytesIO(b'[]'))), [])
+        self.assertEqual(len(list(parse(io.BytesIO(b' [ [1700000000, 1] , [1700000001, 2] ] ')))), 2)
+        for body in (
+            b'[[1700000000, 1],,[1700000001, 2]]',
+            b'[[1700000000, 1][1700000001, 2]]',
+            b'[[1700000000, 1],]',
+            b'[,[1700000000, 1]]',
+        ):
+            with self.assertRaises(ParseError, msg=body):
+                list(parse(io.BytesIO(body)))
+            response = self.ingest(body.decode(), 'application/json')
+            self.assertEqual(response.status_code, 400, body)
+        self.assertFalse(Activity.objects.exists())
+
+
+class ActivityHistoryTests(OwnerTestCase):
+    """Downsampled daily history."""
+
+    def setUp(self):
+        super().setUp()
+        self.first_day = date(2020, 1, 1)
+        Activity.objects.bulk_create([
+            Activity(pet=self.pet, date=self.first_day + timedelta(days=i), steps=(i * 37) % 1000)
+            for i in range(1500)
+        ])
+
+    def history(self, **params):
+        return self.client.get('/api/activities/history/', {'pet': self.pet.id, **params})
+
+    def test_downsampled_to_requested_points(self):
+        response = self.history(points=100)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertTrue(response.data['downsampled'])
+        self.assertEqual(len(response.data['results']), 100)
+        self.assertEqual(response.data['results'][0]['date'], self.first_day)
+        self.assertLessEqual(len(self.history(points=100, mode='minmax').data['results']), 102)
+
+    def test_cache_is_invalidated_by_writes(self):
+        self.history()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/activities/log/', {'pet': self.pet.id, 'steps': 5}, format='json')
+        self.assertEqual(self.history().data['total_points'], 1501)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.history(points=2).status_code, 400)
+        self.assertEqual(self.history(metric='x').status_code, 400)
+
+    def test_algorithms_keep_peaks(self):
+        y = np.array([0, 5, 0, 0, 9, 0, 0, 1, 0, 0])
+        indices = lttb_indices(np.arange(10), y, 5)
+        self.assertEqual(len(indices), 5)
+        self.assertIn(4, indices.tolist())
+        self.assertIn(4, minmax_indices(y, 4).tolist())
+
+
+class StreakTests(OwnerTestCase):
+    """Incremental streak updates agree with a full rebuild."""
+
+    def test_incremental_matches_rebuild(self):
+        rnd = random.Random(1)
+        first_day = date.today() - timedelta(days=120)
+        for step in range(300):
+            day = first_day + timedelta(days=rnd.randrange(121))
+            if rnd.random() < 0.2:
+                Activity.objects.filter(pet=self.pet, date=day).delete()
+            else:
+                Activity.objects.update_or_create(pet=self.pet, date=day, defaults={
+                    'steps': rnd.choice([0, 6000]), 'walking_minutes': rnd.choice([0, 0, 40]),
+                })
+            activity_changed(self.pet.id, [day])
+            goal = ActivityGoal.objects.get(pet=self.pet)
+            incremental = (goal.streak_start, goal.streak_end, goal.longest_streak)
+
+            rebuild_streaks([self.pet.id])
+            goal.refresh_from_db()
+            self.assertEqual(incremental[:2], (goal.streak_start, goal.streak_end), step)
+            # Deletes never shorten the recorded longest streak incrementally
+            self.assertGreaterEqual(incremental[2], goal.longest_streak)
+            ActivityGoal.objects.filter(pet=self.pet).update(longest_streak=incremental[2])
+
+    def test_goals_endpoint(self):
+        for offset in range(3):
+            self.client.post('/api/activities/', {
+                'pet': self.pet.id, 'date': str(date.today() - timedelta(days=offset)), 'steps': 6000,
+            }, format='json')
+        response = self.client.get('/api/activities/goals/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['current_streak'], 3)
+        self.assertEqual(response.data[0]['week']['steps_goal'], 35000)
+
+        url = f'/api/activities/goals/?pet={self.pet.id}'
+        response = self.client.patch(url, {'daily_steps_goal': 7000}, format='json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data['current_streak'], 0)
+        response = self.client.patch(url, {'daily_steps_goal': 0, 'daily_minutes_goal': 0}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        other_url = f'/api/activities/goals/?pet={self.other_pet.id}'
+        self.assertEqual(self.client.patch(other_url, {'daily_steps_goal': 1}, format='json').status_code, 404)
+
+    def test_invalid_patch_creates_no_goal(self):
+        pet = Pet.objects.create(owner=self.user, name='New')
+        response = self.client.patch(f'/api/activities/goals/?pet={pet.id}', {
+            'daily_steps_goal': -5,
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ActivityGoal.objects.filter(pet=pet).exists())
+        response = self.client.patch(f'/api/activities/goals/?pet={pet.id}', {
+            'daily_steps_goal': 9000,
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(ActivityGoal.objects.get(pet=pet).daily_steps_goal, 9000)
+
+
+class LeaderboardTests(OwnerTestCase):
+    """Weekly leaderboard of opted-in pets."""
+
+    def setUp(self):
+        super().setUp()
+        self.pets = [self.pet] + [Pet.objects.create(owner=self.user, name=f'Pet {i}') for i in range(30)]
+        for i, pet in enumerate(self.pets):
+            self.client.patch(
+                f'/api/activities/goals/?pet={pet.id}', {'leaderboard_opt_in': i % 2 == 0}, format='json'
+            )
+            self.client.post('/api/activities/log/', {
+                'pet': pet.id, 'steps': i * 10, 'walking_minutes': 30 - i,
+            }, format='json')
+
+    def board(self, **params):
+        response = self.client.get('/api/activities/leaderboard/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def test_ranks(self):
+        data = self.board(pet=self.pets[4].id)
+        self.assertEqual(len(data['results']), 16)
+        self.assertEqual(data['results'][0]['steps'], 300)
+        self.assertEqual(data['my_rank'], 14)
+        self.assertEqual(self.board(pet=self.pets[4].id, metric='minutes')['my_rank'], 3)
+
+        Match.objects.create(pet1=self.pets[4], pet2=self.pets[10])
+        data = self.board(pet=self.pets[4].id, scope='matches')
+        self.assertEqual([row['pet'] for row in data['results']], [self.pets[10].id, self.pets[4].id])
+        self.assertEqual(data['my_rank'], 2)
+
+        self.client.patch(
+            f'/api/activities/goals/?pet={self.pets[4].id}', {'leaderboard_opt_in': False}, format='json'
+        )
+        self.assertIsNone(self.board(pet=self.pets[4].id)['my_rank'])
+
+    def test_tied_ranks_follow_page_order(self):
+        LeaderboardEntry.objects.update(steps=100)
+        order = [row['pet'] for row in self.board()['results']]
+        for position, pet_id in enumerate(order, start=1):
+            self.assertEqual(self.board(pet=pet_id)['my_rank'], position)
+
+    def test_cursor_pages_cover_the_board_once(self):
+        with mock.patch.object(LeaderboardPagination, 'page_size', 5):
+            data = self.board()
+            seen = [row['pet'] for row in data['results']]
+            while data['next']:
+                data = self.client.get(data['next']).data
+                seen += [row['pet'] for row in data['results']]
+        self.assertEqual(len(seen), 16)
+        self.assertEqual(len(set(seen)), 16)
+
+
+class ExpenseSummaryTests(OwnerTestCase):
+    """Summary from monthly rollups must match aggregating raw expenses."""
+
+    def setUp(self):
+        super().setUp()
+        self.rnd = random.Random(3)
+        ids = []
+        for _ in range(60):
+            day = date(2024, 1, 1) + timedelta(days=self.rnd.randrange(400))
+            response = self.client.post('/api/expenses/', {
+                'pet': self.rnd.choice([self.pet.id, None]),
+                'category': self.rnd.choice(['food', 'vet', 'toys']),
+                'amount': f'{self.rnd.randrange(1, 10000) / 100:.2f}',
+                'date': str(day),
+            }, format='json')
+            self.assertEqual(response.status_code, 201, response.content)
+            ids.append(response.data['id'])
+        for expense_id in ids[:10]:
+            self.client.patch(f'/api/expenses/{expense_id}/', {'date': '2024-02-29', 'amount': '1.11'}, format='json')
+        for expense_id in ids[10:15]:
+            self.client.delete(f'/api/expenses/{expense_id}/')
+
+    def test_summary_matches_raw_expenses(self):
+        for trial in range(40):
+            start = date(2024, 1, 1) + timedelta(days=self.rnd.randrange(400))
+            end = start + timedelta(days=self.rnd.randrange(200))
+            params = {'start_date': str(start), 'end_date': str(end)}
+            if trial % 3 == 0:
+                params.pop('start_date')
+            if trial % 5 == 0:
+                params.pop('end_date')
+            if trial % 2:
+                params['pet'] = self.pet.id
+            if trial % 7 == 0:
+                params['category'] = 'vet'
+            response = self.client.get('/api/expenses/summary/', params)
+            self.assertEqual(response.status_code, 200, response.content)
+
+            expenses = Expense.objects.filter(owner=self.user)
+            if 'start_date' in params:
+                expenses = expenses.filter(date__gte=start)
+            if 'end_date' in params:
+                expenses = expenses.filter(date__lte=end)
+            if 'pet' in params:
+                expenses = expenses.filter(pet=self.pet)
+            if 'category' in params:
+                expenses = expenses.filter(category='vet')
+            expected = {
+                row['category']: row['total']
+                for row in expenses.values('category').annotate(total=Sum('amount'))
+            }
+            got = {row['category']: Decimal(row['total']) for row in response.data['categories']}
+            self.assertEqual(got, expected, params)
+
+    def test_reconcile_command(self):
+        out = io.StringIO()
+        call_command('reconcile_expense_rollups', stdout=out)
+        self.assertIn('expense rollups match', out.getvalue())
+
+        ExpenseRollup.objects.first().delete()
+        out = io.StringIO()
+        call_command('reconcile_expense_rollups', '--fix', stdout=out)
+        self.assertIn('1 expense rollups differ', out.getvalue())
+        out = io.StringIO()
+        call_command('reconcile_expense_rollups', stdout=out)
+        self.assertIn('expense rollups match', out.getvalue())
+
+
+class ExportTests(OwnerTestCase):
+    """Streaming CSV and NDJSON exports."""
+
+    def setUp(self):
+        super().setUp()
+        Expense.objects.bulk_create([
+            Expense(
+                owner=self.user, pet=self.pet if i % 2 else None, category='food', amount='1.50',
+                date=date(2024, 1, 1) + timedelta(days=i), description='a,"b"',
+            )
+            for i in range(1234)
+        ])
+        Expense.objects.create(owner=self.other, category='food', amount=1, date=date(2024, 1, 1))
+
+    def body(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export(self):
+        rows = list(csv.reader(io.StringIO(self.body(self.client.get('/api/expenses/export/')))))
+        self.assertEqual(rows[0][0], 'id')
+        self.assertEqual(len(rows), 1235)
+        self.assertEqual(rows[1][4], 'a,"b"')
+
+    def test_ndjson_export(self):
+        response = self.client.get('/api/expenses/export/', {'format': 'ndjson', 'pet': self.pet.id})
+        lines = self.body(response).splitlines()
+        self.assertEqual(len(lines), 617)
+        self.assertEqual(json.loads(lines[0])['pet_name'], 'Rex')
+
+        response = self.client.get('/api/expenses/export/', HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        Activity.objects.create(pet=self.pet, date=date(2024, 1, 1), steps=3)
+        self.assertEqual(len(self.body(self.client.get('/api/activities/export/')).splitlines()), 2)
+
+    def test_errors_are_json(self):
+        self.client.force_authenticate(None)
+        for params in ({}, {'format': 'ndjson'}):
+            response = self.client.get('/api/activities/export/', params)
+            self.assertEqual(response.status_code, 401)
+            self.assertEqual(response['Content-Type'], 'application/json')
+            self.assertIn('detail', response.json())
+
+
+class ExpenseImportTests(OwnerTestCase):
+    """Bulk CSV import with per-row errors."""
+
+    def csv_lines(self):
+        lines = ['date,category,amount,description,pet']
+        for i in range(1200):
+            lines.append(f'2024-03-{i % 28 + 1:02d},food,{i % 50}.25,row {i},{self.pet.id if i % 2 else ""}')
+        lines.append('2024-13-01,food,1,bad date,')
+        lines.append('2024-01-01,nope,1.234,bad,')
+        lines.append(f'2024-01-01,Vet Bills,3,"quoted, desc",{self.other_pet.id}')
+        lines.append('2024-01-01,Vet Bills,3,"quoted, desc",')
+        return lines
+
+    def test_import_reports_bad_rows(self):
+        body = '﻿' + '\n'.join(self.csv_lines()) + '\n'
+        response = self.client.post('/api/expenses/import/', body.encode(), content_type='text/csv')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data['imported'], 1201)
+        self.assertEqual(response.data['failed'], 3)
+        self.assertEqual([error['row'] for error in response.data['errors']], [1202, 1203, 1204])
+        self.assertIn('amount', response.data['errors'][1]['errors'])
+        self.assertIn('pet', response.data['errors'][2]['errors'])
+        self.assertEqual(Expense.objects.filter(owner=self.user, category='vet').count(), 1)
+        self.assertEqual(sum(rollup.expense_count for rollup in ExpenseRollup.objects.all()), 1201)
+
+    def test_multipart_upload(self):
+        upload = SimpleUploadedFile('expenses.csv', '\n'.join(self.csv_lines()[:3]).encode())
+        response = self.client.post('/api/expenses/import/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.data['imported'], 2)
+
+    def test_bad_encoding(self):
+        response = self.client.post(
+            '/api/expenses/import/', b'date,category,amount\n\xff\xfe,x,1\n', content_type='text/csv'
+        )
+        self.assertEqual(response.data['imported'], 0)
+        self.assertIn('Could not read CSV', response.data['error'])
+
+
+class ExpenseAnalyticsTests(OwnerTestCase):
+    """Monthly totals, year-over-year deltas and forecasts."""
+
+    def setUp(self):
+        super().setUp()
+        expenses = [
+            Expense(owner=self.user, category='food', amount=month * 10,
+                    date=date(2025 if month <= 6 else 2024, month, 3))
+            for month in range(1, 13)
+        ]
+        expenses.append(Expense(owner=self.user, category='vet', amount='20.50', date=date(2024, 6, 1)))
+        Expense.objects.bulk_create(expenses)
+
+    def test_monthly_totals(self):
+        result = expense_analytics(self.user.id, 12, 3, today=date(2025, 6, 15))
+        self.assertEqual(result['months'][0], '2024-07')
+        self.assertEqual(result['months'][-1], '2025-06')
+        self.assertEqual(result['total']['monthly'][-1], 60.0)
+        self.assertEqual(result['total']['previous_year'][-1], 20.5)
+        self.assertEqual(result['total']['yoy_delta'][-1], 39.5)
+        self.assertEqual(set(result['categories']), {'food', 'vet'})
+        self.assertEqual(len(result['forecast']['total']), 3)
+
+    def test_endpoint(self):
+        self.assertEqual(self.client.get('/api/expenses/analytics/').status_code, 200)
+        self.assertEqual(self.client.get('/api/expenses/analytics/', {'months': 1}).status_code, 400)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/expenses/', {
+                'category': 'toys', 'amount': '5', 'date': str(date.today()),
+            }, format='json')
+        self.assertIn('toys', self.client.get('/api/expenses/analytics/').data['categories'])
+
+
+class DiscoveryTests(OwnerTestCase):
+    """Async discovery, matches and today's activities."""
+
+    def setUp(self):
+        super().setUp()
+        MatchingPreferences.objects.create(pet=self.pet, looking_for='friends')
+        self.others = [
+            Pet.objects.create(owner=self.other, name=f'Pet {i}', personality='playful') for i in range(5)
+        ]
+        MatchingPreferences.objects.create(pet=self.others[0], looking_for='friends')
+        Swipe.objects.create(swiper_pet=self.pet, swiped_pet=self.others[1], action='like')
+        Match.objects.create(pet1=self.pet, pet2=self.others[2])
+        Activity.objects.create(pet=self.pet, date=date.today(), steps=10)
+
+    def test_discovery(self):
+        with self.assertNumQueries(3):
+            response = self.client.get(f'/api/pets/discover/{self.pet.id}/')
+        self.assertEqual(response.status_code, 200, response.content)
+        scores = {pet['id']: pet['compatibility_score'] for pet in response.data}
+        self.assertEqual(len(scores), 5)
+        self.assertNotIn(self.others[1].id, scores)
+        self.assertNotIn(self.pet.id, scores)
+        self.assertGreater(scores[self.others[0].id], scores[self.others[3].id])
+
+        response = self.client.get(f'/api/pets/discover/{self.pet.id}/', {'limit': 2})
+        self.assertEqual(len(response.data), 2)
+
+    def test_other_owners_pet_is_not_scanned(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(f'/api/pets/discover/{self.other_pet.id}/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_invalid_limit(self):
+        for limit in ('abc', '0', '101'):
+            response = self.client.get(f'/api/pets/discover/{self.pet.id}/', {'limit': limit})
+            self.assertEqual(response.status_code, 400, limit)
+            self.assertIn('limit', response.data['error'])
+
+    def test_matches_and_today(self):
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/pets/matches/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['pet2_details']['owner_username'], 'other')
+
+        response = self.client.get('/api/activities/today/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data[0]['pet_name'], 'Rex')
+        self.assertEqual(self.client.options('/api/pets/matches/').status_code, 200)
+
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get('/api/pets/matches/').status_code, 401)
+        self.assertEqual(self.client.post('/api/pets/matches/').status_code, 401)
+
+    async def test_served_over_asgi(self):
+        token = await sync_to_async(lambda: str(VersionedRefreshToken.for_user(self.user).access_token))()
+        client, headers = AsyncClient(), {'Authorization': f'Bearer {token}'}
+        response = await client.get(f'/api/pets/discover/{self.pet.id}/', headers=headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        response = await client.get('/api/pets/matches/', headers=headers)
+        self.assertEqual(response.status_code, 200, response.content)
+        response = await client.post('/api/pets/matches/', headers=headers)
+        self.assertEqual(response.status_code, 405)
+
+
+class DashboardTests(OwnerTestCase):
+    """Cached single-request dashboard and its invalidation."""
+
+    def setUp(self):
+        cache.clear()
+        super().setUp()
+        self.cat = Pet.objects.create(owner=self.user, name='Cat')
+        PetPhoto.objects.create(pet=self.pet, image='pet_photos/rex.jpg', is_main=True)
+        Activity.objects.create(pet=self.pet, date=date.today(), steps=100)
+        Activity.objects.create(pet=self.other_pet, date=date.today(), steps=5)
+        FeedingSchedule.objects.create(pet=self.cat, time=time(8, 0), food_type='kibble')
+        Event.objects.create(owner=self.user, pet=self.pet, title='Vet', event_type='vet',
+                             event_date=timezone.now() + timedelta(days=2))
+        Event.objects.create(owner=self.user, pet=self.pet, title='Walk', event_type='other',
+                             event_date=timezone.now() - timedelta(days=30), rrule='FREQ=DAILY')
+        self.post('/api/expenses/', {
+            'pet': self.pet.id, 'category': 'food', 'amount': '12.50', 'date': date.today().isoformat(),
+        })
+
+    def get(self, **extra):
+        response = self.client.get('/api/dashboard/', **extra)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.data
+
+    def post(self, path, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(path, data, format='json')
+        self.assertLess(response.status_code, 300, response.content)
+
+    def dashboard_pet(self, data, name):
+        return next(pet for pet in data['pets'] if pet['name'] == name)
+
+    def test_contents_and_queries(self):
+        with self.assertNumQueries(8):
+            data = self.get()
+        self.assertEqual({pet['name'] for pet in data['pets']}, {'Rex', 'Cat'})
+        self.assertEqual([activity['pet_name'] for activity in data['today_activities']], ['Rex'])
+        self.assertEqual(data['feeding_schedules'][0]['pet_name'], 'Cat')
+        titles = [event['title'] for event in data['upcoming_events']]
+        self.assertIn('Vet', titles)
+        self.assertGreaterEqual(titles.count('Walk'), 7)
+        self.assertEqual(data['expense_summary']['total'], Decimal('12.50'))
+        with self.assertNumQueries(0):
+            self.get()
+
+    def test_photo_urls_follow_the_request_host(self):
+        for host in ('localhost', '127.0.0.1', 'localhost'):
+            [photo] = self.dashboard_pet(self.get(HTTP_HOST=host), 'Rex')['photos']
+            self.assertEqual(photo['image'], f'http://{host}/media/pet_photos/rex.jpg')
+
+    def test_writes_invalidate(self):
+        self.get()
+        self.post('/api/pets/', {'name': 'Fish'})
+        self.assertIn('Fish', [pet['name'] for pet in self.get()['pets']])
+        self.post('/api/activities/log/', {'pet': self.cat.id, 'steps': 7})
+        self.assertEqual(len(self.get()['today_activities']), 2)
+        self.post('/api/feeding-schedules/', {'pet': self.pet.id, 'time': '18:00'})
+        self.assertEqual(len(self.get()['feeding_schedules']), 2)
+        self.post('/api/events/', {
+            'pet': self.cat.id, 'title': 'Groom', 'event_type': 'grooming',
+            'event_date': (timezone.now() + timedelta(days=1)).isoformat(),
+        })
+        self.assertIn('Groom', [event['title'] for event in self.get()['upcoming_events']])
+        self.post('/api/expenses/', {
+            'pet': self.pet.id, 'category': 'vet', 'amount': '10', 'date': date.today().isoformat(),
+        })
+        self.assertEqual(self.get()['expense_summary']['total'], Decimal('22.50'))
+
+        before = self.dashboard_pet(self.get(), 'Rex')['health_due']
+        Event.objects.filter(title='Vet').update(
+            event_type='vaccination', event_date=timezone.now() - timedelta(days=1)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            refresh_health_due_dates(pet_ids=[self.pet.id])
+        self.assertNotEqual(self.dashboard_pet(self.get(), 'Rex')['health_due'], before)
+
+    def test_sent_reminders_do_not_change_the_dashboard(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Event.objects.create(owner=self.user, pet=self.cat, title='Pill', event_type='medication',
+                                 event_date=timezone.now() + timedelta(hours=2))
+        cached = self.get()
+        self.assertEqual(EventReminderWorker(backend=LocmemBackend()).run_until_idle(), 1)
+        cache.clear()
+        self.assertEqual(self.get()['upcoming_events'], cached['upcoming_events'])
+
+    def test_owners_are_cached_separately(self):
+        self.get()
+        self.client.force_authenticate(self.other)
+        self.assertEqual([pet['name'] for pet in self.get()['pets']], ['Tom'])
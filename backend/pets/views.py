@@ -2,23 +2,53 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.parsers import MultiPartParser
 from rest_framework.views import APIView
-from django.db.models import Q, Sum
+from django.db import transaction
+from django.db.models import Q
+from django.utils.dateparse import parse_date
 from datetime import date
-from .models import Pet, PetPhoto, MatchingPreferences, Swipe, Match, Activity, FeedingSchedule, Expense
+import csv
+from asgiref.sync import sync_to_async
+from life_of_pets_api.async_views import AsyncAPIView, alist
+from .models import (
+    Pet, PetPhoto, MatchingPreferences, Swipe, Match, Activity, ActivityGoal, ActivityRollup,
+    LeaderboardEntry, FeedingSchedule, Expense,
+)
+from .activity_rollups import activity_changed, period_bounds, week_start
+from .dashboard import dashboard
+from .downsampling import HISTORY_FIELDS, activity_history
+from .expense_analytics import expense_analytics
+from .expense_rollups import expense_summary, expenses_changed
+from .exports import CSVRenderer, ExportViewMixin, NDJSONRenderer, streaming_export
+from .imports import import_expenses
+from .ingestion import ingest_samples
+from .leaderboard import (
+    LEADERBOARD_METRICS,
+    LeaderboardPagination,
+    leaderboard_rank,
+    set_leaderboard_opt_in,
+)
+from .parsers import CSVRowParser, JSONArraySampleParser, NDJSONSampleParser, decode_lines
+from .streaks import rebuild_streaks
 from .serializers import (
-    PetSerializer,
+    OwnPetSerializer,
     PetPhotoSerializer,
     MatchingPreferencesSerializer,
     SwipeSerializer,
     MatchSerializer,
     DiscoveryPetSerializer,
     ActivitySerializer,
+    ActivityGoalSerializer,
+    ActivityRollupSerializer,
+    LeaderboardEntrySerializer,
     FeedingScheduleSerializer,
     ExpenseSerializer,
     ExpenseSummarySerializer,
 )
 
+MAX_DISCOVERY_LIMIT = 100
+
 
 def calculate_compatibility(pet1, pet2, preferences=None):
     """
@@ -62,17 +92,59 @@ def calculate_compatibility(pet1, pet2, preferences=None):
     return min(score, 100)
 
 
+def parse_date_param(request, name):
+    """
+    Parse an optional YYYY-MM-DD query parameter.
+    Returns (date or None, error Response or None).
+    """
+    value = request.query_params.get(name)
+    if not value:
+        return None, None
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is None:
+        return None, Response(
+            {'error': f'Invalid {name} date. Use YYYY-MM-DD'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return day, None
+
+
+def parse_int_param(request, name, default, minimum, maximum):
+    """
+    Parse an optional integer query parameter in [minimum, maximum].
+    Returns (int or default, error Response or None).
+    """
+    value = request.query_params.get(name)
+    if value is None:
+        return default, None
+    try:
+        number = int(value)
+    except ValueError:
+        number = None
+    if number is None or not minimum <= number <= maximum:
+        return None, Response(
+            {'error': f'{name} must be between {minimum} and {maximum}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return number, None
+
+
 class PetViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing pets.
     Provides CRUD operations for pets.
     """
-    serializer_class = PetSerializer
+    serializer_class = OwnPetSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         """Return only pets owned by the current user."""
-        return Pet.objects.filter(owner=self.request.user).prefetch_related('photos')
+        return Pet.objects.filter(owner=self.request.user).prefetch_related(
+            'photos', 'health_due_dates'
+        )
 
     def perform_create(self, serializer):
         """Set the owner to the current user when creating a pet."""
@@ -125,32 +197,32 @@ class PetViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class DiscoveryView(APIView):
+class DiscoveryView(AsyncAPIView):
     """Get pets for discovery/matching feed."""
     permission_classes = [IsAuthenticated]
 
-    def get(self, request, pet_id):
+    async def get(self, request, pet_id):
         """Get potential matches for a specific pet."""
-        try:
-            my_pet = Pet.objects.get(id=pet_id, owner=request.user)
-        except Pet.DoesNotExist:
+        limit, error = parse_int_param(request, 'limit', 20, 1, MAX_DISCOVERY_LIMIT)
+        if error:
+            return error
+
+        # Check ownership first so nobody else's pet costs a candidate scan
+        my_pet = await Pet.objects.select_related('matching_preferences').filter(
+            id=pet_id, owner_id=request.user.id
+        ).afirst()
+        if my_pet is None:
             return Response(
                 {'error': 'Pet not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Get IDs of pets already swiped on
-        swiped_pet_ids = Swipe.objects.filter(
-            swiper_pet=my_pet
-        ).values_list('swiped_pet_id', flat=True)
-
-        # Get IDs of user's own pets
-        my_pet_ids = Pet.objects.filter(owner=request.user).values_list('id', flat=True)
-
-        # Get potential matches (exclude own pets and already swiped)
-        potential_matches = Pet.objects.exclude(
-            Q(id__in=swiped_pet_ids) | Q(id__in=my_pet_ids)
-        ).prefetch_related('photos')
+        # Exclude own pets and pets already swiped on
+        potential_matches = await alist(
+            Pet.objects.exclude(owner_id=request.user.id).exclude(
+                id__in=Swipe.objects.filter(swiper_pet_id=pet_id).values('swiped_pet_id')
+            ).select_related('matching_preferences').prefetch_related('photos')
+        )
 
         # Get preferences
         try:
@@ -168,7 +240,6 @@ class DiscoveryView(APIView):
         pets_with_scores.sort(key=lambda x: x.compatibility_score, reverse=True)
 
         # Limit results
-        limit = int(request.query_params.get('limit', 20))
         pets_with_scores = pets_with_scores[:limit]
 
         serializer = DiscoveryPetSerializer(pets_with_scores, many=True)
@@ -248,26 +319,48 @@ class SwipeView(APIView):
         return Response(response_data, status=status.HTTP_201_CREATED)
 
 
-class MatchesView(APIView):
+class MatchesView(AsyncAPIView):
     """Get all matches for a user's pets."""
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
+    async def get(self, request):
         """Get all matches for all of the user's pets."""
-        my_pet_ids = Pet.objects.filter(owner=request.user).values_list('id', flat=True)
+        my_pet_ids = Pet.objects.filter(owner_id=request.user.id).values('id')
 
         matches = Match.objects.filter(
             Q(pet1_id__in=my_pet_ids) | Q(pet2_id__in=my_pet_ids),
             is_active=True
-        ).select_related('pet1', 'pet2').prefetch_related(
+        ).select_related('pet1__owner', 'pet2__owner').prefetch_related(
             'pet1__photos', 'pet2__photos'
         )
 
-        serializer = MatchSerializer(matches, many=True)
+        serializer = MatchSerializer(await alist(matches), many=True)
         return Response(serializer.data)
 
 
-class ActivityViewSet(viewsets.ModelViewSet):
+class TodayActivitiesView(AsyncAPIView):
+    """Get today's activities for all user's pets."""
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request):
+        activities = Activity.objects.filter(
+            pet__owner_id=request.user.id,
+            date=date.today()
+        ).select_related('pet')
+        serializer = ActivitySerializer(await alist(activities), many=True)
+        return Response(serializer.data)
+
+
+class DashboardView(AsyncAPIView):
+    """Everything the app's home screens show, in one cached response."""
+    permission_classes = [IsAuthenticated]
+
+    async def get(self, request):
+        data = await sync_to_async(dashboard)(request.user.id, context={'request': request})
+        return Response(data)
+
+
+class ActivityViewSet(ExportViewMixin, viewsets.ModelViewSet):
     """ViewSet for managing pet activities."""
     serializer_class = ActivitySerializer
     permission_classes = [IsAuthenticated]
@@ -294,18 +387,49 @@ class ActivityViewSet(viewsets.ModelViewSet):
         pet = serializer.validated_data.get('pet')
         if pet.owner != self.request.user:
             raise PermissionError("You can only add activities for your own pets.")
-        serializer.save()
-
-    @action(detail=False, methods=['get'], url_path='today')
-    def today(self, request):
-        """Get today's activities for all user's pets."""
-        user_pet_ids = Pet.objects.filter(owner=request.user).values_list('id', flat=True)
-        activities = Activity.objects.filter(
-            pet_id__in=user_pet_ids,
-            date=date.today()
-        ).select_related('pet')
-        serializer = self.get_serializer(activities, many=True)
-        return Response(serializer.data)
+        with transaction.atomic():
+            activity = serializer.save()
+            activity_changed(activity.pet_id, [activity.date])
+
+    def perform_update(self, serializer):
+        """Validate pet ownership and refresh the rollups of old and new dates."""
+        previous = serializer.instance
+        old_pet_id, old_date = previous.pet_id, previous.date
+        pet = serializer.validated_data.get('pet', previous.pet)
+        if pet.owner != self.request.user:
+            raise PermissionError("You can only add activities for your own pets.")
+        with transaction.atomic():
+            activity = serializer.save()
+            if activity.pet_id != old_pet_id:
+                activity_changed(old_pet_id, [old_date])
+                activity_changed(activity.pet_id, [activity.date])
+            else:
+                activity_changed(activity.pet_id, [old_date, activity.date])
+
+    def perform_destroy(self, instance):
+        """Delete the activity and refresh its rollups."""
+        pet_id, activity_date = instance.pet_id, instance.date
+        with transaction.atomic():
+            instance.delete()
+            activity_changed(pet_id, [activity_date])
+
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path='export',
+        renderer_classes=[CSVRenderer, NDJSONRenderer],
+    )
+    def export(self, request):
+        """Stream the filtered activities as CSV (default) or NDJSON (?format=ndjson)."""
+        return streaming_export(
+            self.get_queryset(),
+            fields=['id', 'pet_id', 'pet__name', 'date', 'walking_minutes',
+                    'steps', 'play_minutes', 'notes'],
+            columns=['id', 'pet', 'pet_name', 'date', 'walking_minutes',
+                     'steps', 'play_minutes', 'notes'],
+            export_format=request.accepted_renderer.format,
+            filename='activities',
+        )
 
     @action(detail=False, methods=['post'], url_path='log')
     def log_activity(self, request):
@@ -319,19 +443,242 @@ class ActivityViewSet(viewsets.ModelViewSet):
         except Pet.DoesNotExist:
             return Response({'error': 'Pet not found'}, status=status.HTTP_404_NOT_FOUND)
 
-        activity, created = Activity.objects.update_or_create(
-            pet=pet,
-            date=date.today(),
-            defaults={
-                'walking_minutes': request.data.get('walking_minutes', 0),
-                'steps': request.data.get('steps', 0),
-                'play_minutes': request.data.get('play_minutes', 0),
-                'notes': request.data.get('notes', ''),
-            }
-        )
+        with transaction.atomic():
+            activity, created = Activity.objects.update_or_create(
+                pet=pet,
+                date=date.today(),
+                defaults={
+                    'walking_minutes': request.data.get('walking_minutes', 0),
+                    'steps': request.data.get('steps', 0),
+                    'play_minutes': request.data.get('play_minutes', 0),
+                    'notes': request.data.get('notes', ''),
+                }
+            )
+            activity_changed(pet.id, [activity.date])
         serializer = self.get_serializer(activity)
         return Response(serializer.data, status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
 
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='ingest',
+        parser_classes=[NDJSONSampleParser, JSONArraySampleParser],
+    )
+    def ingest(self, request):
+        """
+        Ingest tracker samples for a pet (?pet=&device=).
+        Body is NDJSON or a JSON array of samples; re-sent samples are skipped.
+        """
+        pet_id = request.query_params.get('pet')
+        device_id = request.query_params.get('device')
+        if not pet_id or not device_id:
+            return Response(
+                {'error': 'pet and device are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            pet = Pet.objects.get(id=pet_id, owner=request.user)
+        except (Pet.DoesNotExist, ValueError):
+            return Response({'error': 'Pet not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        result = ingest_samples(pet, device_id[:100], request.data)
+        return Response(result, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='series')
+    def series(self, request):
+        """Get weekly or monthly activity totals for a pet from the rollups."""
+        pet_id = request.query_params.get('pet')
+        if not pet_id:
+            return Response({'error': 'pet is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        granularity = request.query_params.get('granularity', 'week')
+        if granularity not in dict(ActivityRollup.GRANULARITY_CHOICES):
+            return Response(
+                {'error': 'Invalid granularity. Must be week or month'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            pet = Pet.objects.get(id=pet_id, owner=request.user)
+        except (Pet.DoesNotExist, ValueError):
+            return Response({'error': 'Pet not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        rollups = ActivityRollup.objects.filter(pet=pet, granularity=granularity)
+
+        # Include the buckets that overlap the start/end dates
+        for param in ('start', 'end'):
+            day, error = parse_date_param(request, param)
+            if error:
+                return error
+            if day is None:
+                continue
+            bucket_start, _ = period_bounds(granularity, day)
+            if param == 'start':
+                rollups = rollups.filter(period_start__gte=bucket_start)
+            else:
+                rollups = rollups.filter(period_start__lte=bucket_start)
+
+        serializer = ActivityRollupSerializer(rollups, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['get', 'patch'], url_path='goals')
+    def goals(self, request):
+        """
+        GET: goals, streaks and this week's progress for the user's pets (?pet= optional).
+        PATCH ?pet=: update a pet's daily goals and recompute its streaks.
+        """
+        pet_id = request.query_params.get('pet')
+        pets = Pet.objects.filter(owner=request.user)
+        if pet_id:
+            try:
+                pets = pets.filter(id=int(pet_id))
+            except ValueError:
+                pets = pets.none()
+        elif request.method == 'PATCH':
+            return Response({'error': 'pet is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.method == 'PATCH':
+            pet = pets.first()
+            if pet is None:
+                return Response({'error': 'Pet not found'}, status=status.HTTP_404_NOT_FOUND)
+            # Validate against an unsaved goal so a rejected PATCH creates no row
+            goal = ActivityGoal.objects.filter(pet=pet).first() or ActivityGoal(pet=pet)
+            was_opted_in = goal.leaderboard_opt_in
+            serializer = ActivityGoalSerializer(goal, data=request.data, partial=True)
+            serializer.is_valid(raise_exception=True)
+            with transaction.atomic():
+                serializer.instance, _ = ActivityGoal.objects.get_or_create(pet=pet)
+                goal = serializer.save()
+                if {'daily_steps_goal', 'daily_minutes_goal'} & set(serializer.validated_data):
+                    # Which days meet the goal has changed, so recompute from history
+                    rebuild_streaks(pet_ids=[pet.id])
+                if goal.leaderboard_opt_in != was_opted_in:
+                    set_leaderboard_opt_in(pet.id, goal.leaderboard_opt_in)
+            pets = [pet]
+
+        goals = {
+            goal.pet_id: goal
+            for goal in ActivityGoal.objects.filter(pet__in=pets).select_related('pet')
+        }
+        week_rollups = {
+            rollup.pet_id: rollup
+            for rollup in ActivityRollup.objects.filter(
+                pet__in=pets,
+                granularity='week',
+                period_start=week_start(date.today()),
+            )
+        }
+        results = [goals.get(pet.id) or ActivityGoal(pet=pet) for pet in pets]
+        serializer = ActivityGoalSerializer(
+            results, many=True, context={'week_rollups': week_rollups}
+        )
+        if request.method == 'PATCH':
+            return Response(serializer.data[0])
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['get'], url_path='leaderboard')
+    def leaderboard(self, request):
+        """
+        Weekly leaderboard of opted-in pets (?metric=steps|minutes&week=&scope=global|matches&pet=).
+        scope=matches ranks a pet against its matches; pet also adds my_rank.
+        """
+        metric = request.query_params.get('metric', 'steps')
+        if metric not in LEADERBOARD_METRICS:
+            return Response(
+                {'error': 'Invalid metric. Must be steps or minutes'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        field = LEADERBOARD_METRICS[metric]
+
+        scope = request.query_params.get('scope', 'global')
+        if scope not in ('global', 'matches'):
+            return Response(
+                {'error': 'Invalid scope. Must be global or matches'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        week, error = parse_date_param(request, 'week')
+        if error:
+            return error
+        week = week_start(week or date.today())
+
+        my_pet = None
+        pet_id = request.query_params.get('pet')
+        if pet_id:
+            try:
+                my_pet = Pet.objects.get(id=pet_id, owner=request.user)
+            except (Pet.DoesNotExist, ValueError):
+                return Response({'error': 'Pet not found'}, status=status.HTTP_404_NOT_FOUND)
+        elif scope == 'matches':
+            return Response(
+                {'error': 'pet is required for the matches scope'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        entries = LeaderboardEntry.objects.filter(week_start=week)
+        if scope == 'matches':
+            matched_pet_ids = {my_pet.id}
+            for pet1_id, pet2_id in Match.objects.filter(
+                Q(pet1=my_pet) | Q(pet2=my_pet), is_active=True
+            ).values_list('pet1_id', 'pet2_id'):
+                matched_pet_ids.update((pet1_id, pet2_id))
+            entries = entries.filter(pet_id__in=matched_pet_ids)
+
+        paginator = LeaderboardPagination()
+        page = paginator.paginate_queryset(entries.select_related('pet'), request, view=self)
+        response = paginator.get_paginated_response(
+            LeaderboardEntrySerializer(page, many=True).data
+        )
+        response.data['week_start'] = week
+        response.data['metric'] = metric
+        if my_pet:
+            response.data['my_rank'] = leaderboard_rank(entries, my_pet.id, field)
+        return response
+
+    @action(detail=False, methods=['get'], url_path='history')
+    def history(self, request):
+        """
+        Get a pet's daily activity history (?pet=&start=&end=).
+        With points=N the series is downsampled to about N days using
+        mode=lttb (default) or mode=minmax on the chosen metric.
+        """
+        pet_id = request.query_params.get('pet')
+        if not pet_id:
+            return Response({'error': 'pet is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            pet = Pet.objects.get(id=pet_id, owner=request.user)
+        except (Pet.DoesNotExist, ValueError):
+            return Response({'error': 'Pet not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        start, error = parse_date_param(request, 'start')
+        if error:
+            return error
+        end, error = parse_date_param(request, 'end')
+        if error:
+            return error
+
+        points, error = parse_int_param(request, 'points', None, 3, 5000)
+        if error:
+            return error
+
+        metric = request.query_params.get('metric', 'steps')
+        if metric not in HISTORY_FIELDS:
+            return Response(
+                {'error': f'Invalid metric. Must be one of {", ".join(HISTORY_FIELDS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        mode = request.query_params.get('mode', 'lttb')
+        if mode not in ('lttb', 'minmax'):
+            return Response(
+                {'error': 'Invalid mode. Must be lttb or minmax'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(activity_history(pet.id, start, end, points, metric, mode))
+
 
 class FeedingScheduleViewSet(viewsets.ModelViewSet):
     """ViewSet for managing feeding schedules."""
@@ -358,7 +705,7 @@ class FeedingScheduleViewSet(viewsets.ModelViewSet):
         serializer.save()
 
 
-class ExpenseViewSet(viewsets.ModelViewSet):
+class ExpenseViewSet(ExportViewMixin, viewsets.ModelViewSet):
     """ViewSet for managing expenses."""
     serializer_class = ExpenseSerializer
     permission_classes = [IsAuthenticated]
@@ -392,22 +739,112 @@ class ExpenseViewSet(viewsets.ModelViewSet):
         pet = serializer.validated_data.get('pet')
         if pet and pet.owner != self.request.user:
             raise PermissionError("You can only add expenses for your own pets.")
-        serializer.save(owner=self.request.user)
+        with transaction.atomic():
+            expense = serializer.save(owner=self.request.user)
+            expenses_changed(expense.owner_id, [expense.date])
 
-    @action(detail=False, methods=['get'], url_path='summary')
-    def summary(self, request):
-        """Get expense summary by category."""
-        queryset = self.get_queryset()
+    def perform_update(self, serializer):
+        """Validate pet ownership and refresh the rollups of the old and new months."""
+        pet = serializer.validated_data.get('pet')
+        if pet and pet.owner != self.request.user:
+            raise PermissionError("You can only add expenses for your own pets.")
+        old_date = serializer.instance.date
+        with transaction.atomic():
+            expense = serializer.save()
+            expenses_changed(expense.owner_id, [old_date, expense.date])
+
+    def perform_destroy(self, instance):
+        """Delete the expense and refresh its month's rollups."""
+        owner_id, expense_date = instance.owner_id, instance.date
+        with transaction.atomic():
+            instance.delete()
+            expenses_changed(owner_id, [expense_date])
+
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path='export',
+        renderer_classes=[CSVRenderer, NDJSONRenderer],
+    )
+    def export(self, request):
+        """Stream the filtered expenses as CSV (default) or NDJSON (?format=ndjson)."""
+        return streaming_export(
+            self.get_queryset(),
+            fields=['id', 'date', 'category', 'amount', 'description',
+                    'pet_id', 'pet__name'],
+            columns=['id', 'date', 'category', 'amount', 'description',
+                     'pet', 'pet_name'],
+            export_format=request.accepted_renderer.format,
+            filename='expenses',
+        )
 
-        # Group by category and sum
-        summary = queryset.values('category').annotate(
-            total=Sum('amount')
-        ).order_by('-total')
+    @action(
+        detail=False,
+        methods=['post'],
+        url_path='import',
+        parser_classes=[CSVRowParser, MultiPartParser],
+    )
+    def import_csv(self, request):
+        """
+        Import expenses from CSV with columns date, category, amount,
+        description, pet. Send a text/csv body or a multipart "file" field.
+        Invalid rows are reported and skipped.
+        """
+        if request.content_type.startswith('multipart/'):
+            upload = request.data.get('file')
+            if upload is None:
+                return Response({'error': 'file is required'}, status=status.HTTP_400_BAD_REQUEST)
+            rows = csv.DictReader(decode_lines(upload))
+        else:
+            rows = request.data
+
+        report = import_expenses(request.user, rows)
+        return Response(report, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='analytics')
+    def analytics(self, request):
+        """
+        Monthly spend per category with moving averages, year-over-year
+        deltas and a linear forecast (?months=12&forecast=3).
+        """
+        try:
+            months = int(request.query_params.get('months', 12))
+            forecast = int(request.query_params.get('forecast', 3))
+        except ValueError:
+            months = forecast = 0
+        if not (3 <= months <= 60 and 1 <= forecast <= 12):
+            return Response(
+                {'error': 'months must be between 3 and 60 and forecast between 1 and 12'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(expense_analytics(request.user.id, months, forecast))
 
-        # Calculate grand total
-        grand_total = sum(item['total'] for item in summary)
+    @action(detail=False, methods=['get'], url_path='summary')
+    def summary(self, request):
+        """Get expense summary by category, answered from the monthly rollups."""
+        pet_id = request.query_params.get('pet')
+        if pet_id:
+            try:
+                pet_id = int(pet_id)
+            except ValueError:
+                return Response({'error': 'Invalid pet'}, status=status.HTTP_400_BAD_REQUEST)
+
+        start_date, error = parse_date_param(request, 'start_date')
+        if error:
+            return error
+        end_date, error = parse_date_param(request, 'end_date')
+        if error:
+            return error
+
+        categories, grand_total = expense_summary(
+            request.user.id,
+            pet_id=pet_id or None,
+            category=request.query_params.get('category'),
+            start=start_date,
+            end=end_date,
+        )
 
         return Response({
-            'categories': list(summary),
+            'categories': categories,
             'total': grand_total
         })
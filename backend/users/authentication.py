@@ -0,0 +1,96 @@
+"""
+JWT authentication with an in-process cache of users.
+
+JWTAuthentication loads the user row on every request. CachedJWTAuthentication
+keeps recently seen users in a bounded LRU cache with a TTL, keyed by user id
+and checked against the token's auth version claim. Tokens issued before a
+password change or deactivation carry an older version and are rejected.
+Saving or deleting a user drops its entry in this process; other processes
+pick up profile changes when their entry expires (AUTH_USER_CACHE_TTL).
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+from .tokens import AUTH_VERSION_CLAIM
+
+
+class UserCache:
+    """Thread-safe LRU cache of users with per-entry expiry and hit counters."""
+
+    def __init__(self, max_entries=1024, ttl=30, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()  # user id -> (auth version, user, expires at)
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, user_id, version):
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is None or entry[0] != version or entry[2] <= self.clock():
+                self.misses += 1
+                return None
+            self.entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, user_id, version, user):
+        with self.lock:
+            self.entries[user_id] = (version, user, self.clock() + self.ttl)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+            }
+
+
+user_cache = UserCache(
+    max_entries=getattr(settings, 'AUTH_USER_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'AUTH_USER_CACHE_TTL', 30),
+)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that serves users from user_cache when it can."""
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        version = validated_token.get(AUTH_VERSION_CLAIM, 0)
+        user = user_cache.get(str(user_id), version)
+        if user is None:
+            user = super().get_user(validated_token)
+            if user.auth_version != version:
+                raise AuthenticationFailed(_('Token has been revoked'), code='token_revoked')
+            user_cache.set(str(user_id), version, user)
+        # Views may modify request.user, so each request gets its own copy
+        return copy.copy(user)
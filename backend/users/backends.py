@@ -0,0 +1,28 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from .hashing import hash_password, needs_rehash, verify_password
+
+
+class PooledHashingBackend(ModelBackend):
+    """ModelBackend that checks passwords in the bounded hashing pool."""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash anyway so response time does not reveal unknown usernames
+            hash_password(password)
+            return None
+        if not verify_password(password, user.password) or not self.user_can_authenticate(user):
+            return None
+        if needs_rehash(user.password):
+            # Saved directly: upgrading the hash must not revoke issued tokens
+            user.password = hash_password(password)
+            user.save(update_fields=['password'])
+        return user
@@ -0,0 +1,73 @@
+"""
+In-process copy of the refresh token blacklist.
+
+simplejwt checks every refresh token against BlacklistedToken with a query.
+BlacklistCache keeps the jti and expiry of blacklisted, unexpired tokens in a
+dict and pulls only rows added since the last sync, at most once every
+TOKEN_BLACKLIST_SYNC_SECONDS, so checking a token is normally a dict lookup.
+Tokens blacklisted by this process are added immediately; tokens blacklisted
+by another process are seen after at most one sync interval. Expired entries
+are dropped on sync, and expired rows are purged by the 'refresh_tokens'
+retention policy (purge_stale_rows).
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+# Re-read a few rows below the highest id seen, so a row whose transaction
+# committed after a later id was synced is not missed; re-adding is harmless.
+SYNC_OVERLAP_ROWS = 100
+
+
+class BlacklistCache:
+    """jti -> expiry (epoch seconds) of blacklisted refresh tokens."""
+
+    def __init__(self, sync_interval=5, clock=time.monotonic):
+        self.sync_interval = sync_interval
+        self.clock = clock
+        self.entries = {}
+        self.last_id = None
+        self.synced_at = None
+        self.lock = threading.Lock()
+        self.syncs = 0
+
+    def sync(self):
+        """Load blacklist rows added since the last sync and drop expired entries."""
+        now = timezone.now()
+        rows = BlacklistedToken.objects.filter(token__expires_at__gt=now)
+        if self.last_id is not None:
+            rows = rows.filter(id__gt=self.last_id - SYNC_OVERLAP_ROWS)
+        rows = rows.order_by('id').values_list('id', 'token__jti', 'token__expires_at')
+        with self.lock:
+            for row_id, jti, expires_at in rows:
+                self.entries[jti] = expires_at.timestamp()
+                if self.last_id is None or row_id > self.last_id:
+                    self.last_id = row_id
+            if self.last_id is None:
+                self.last_id = 0
+            cutoff = now.timestamp()
+            self.entries = {jti: exp for jti, exp in self.entries.items() if exp > cutoff}
+            self.synced_at = self.clock()
+            self.syncs += 1
+
+    def contains(self, jti):
+        if self.synced_at is None or self.clock() - self.synced_at >= self.sync_interval:
+            self.sync()
+        return jti in self.entries
+
+    def add(self, jti, exp):
+        with self.lock:
+            self.entries[jti] = exp
+
+    def clear(self):
+        with self.lock:
+            self.entries = {}
+            self.last_id = self.synced_at = None
+
+
+blacklist_cache = BlacklistCache(
+    sync_interval=getattr(settings, 'TOKEN_BLACKLIST_SYNC_SECONDS', 5),
+)
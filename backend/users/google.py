@@ -0,0 +1,156 @@
+"""
+Offline verification of Google ID tokens.
+
+Tokens are checked locally against Google's published signing keys (JWKS)
+instead of calling the tokeninfo endpoint on every login. Keys are cached for
+the lifetime Google gives in its Cache-Control header and refetched early
+only when a token names a key id that is not cached (key rotation). The
+fetcher is pluggable, so tests can verify tokens signed with local keys.
+"""
+import re
+import threading
+import time
+
+import jwt
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+from .providers import ProviderUnavailable, get_provider_client
+
+GOOGLE_CERTS_PATH = '/oauth2/v3/certs'
+GOOGLE_ISSUERS = ['accounts.google.com', 'https://accounts.google.com']
+DEFAULT_KEY_MAX_AGE = 60 * 60
+# Unknown key ids trigger a refetch at most this often
+MIN_REFRESH_INTERVAL = 60
+CLOCK_SKEW_SECONDS = 60
+
+
+class InvalidGoogleToken(Exception):
+    """The ID token is malformed, expired, forged or not meant for this app."""
+
+
+def cache_max_age(cache_control):
+    match = re.search(r'max-age=(\d+)', cache_control or '')
+    return int(match.group(1)) if match else DEFAULT_KEY_MAX_AGE
+
+
+class HTTPKeyFetcher:
+    """Fetches the JWKS document from Google. Returns (jwks, max age seconds)."""
+
+    def __init__(self, path=GOOGLE_CERTS_PATH):
+        self.path = path
+
+    def __call__(self):
+        response = get_provider_client('google').get(self.path)
+        if response.status_code != 200:
+            raise ProviderUnavailable(f'Google returned {response.status_code} for its signing keys')
+        return response.json(), cache_max_age(response.headers.get('Cache-Control'))
+
+
+class StaticKeyFetcher:
+    """Serves a fixed JWKS document, e.g. public keys generated in tests."""
+
+    def __init__(self, jwks, max_age=DEFAULT_KEY_MAX_AGE):
+        self.jwks = jwks
+        self.max_age = max_age
+
+    def __call__(self):
+        return self.jwks, self.max_age
+
+
+class SigningKeyCache:
+    """Public keys by key id, refreshed when they expire or a kid is unknown."""
+
+    def __init__(self, fetcher, clock=time.monotonic):
+        self.fetcher = fetcher
+        self.clock = clock
+        self.keys = {}
+        self.expires_at = 0
+        self.fetched_at = None
+        self.lock = threading.Lock()
+
+    def _refresh(self):
+        jwks, max_age = self.fetcher()
+        keys = {}
+        for jwk in jwks.get('keys', []):
+            try:
+                keys[jwk['kid']] = jwt.PyJWK(jwk).key
+            except (KeyError, jwt.PyJWKError):
+                continue
+        now = self.clock()
+        self.keys, self.fetched_at, self.expires_at = keys, now, now + max_age
+
+    def get(self, kid):
+        key = self.keys.get(kid)
+        if key is not None and self.clock() < self.expires_at:
+            return key
+        with self.lock:
+            now = self.clock()
+            expired = now >= self.expires_at
+            may_refetch = self.fetched_at is None or now - self.fetched_at >= MIN_REFRESH_INTERVAL
+            if expired or (kid not in self.keys and may_refetch):
+                try:
+                    self._refresh()
+                except (ProviderUnavailable, ValueError) as exc:
+                    # Keep serving known keys if Google cannot be reached
+                    if not self.keys:
+                        raise ProviderUnavailable(f'Could not load Google signing keys: {exc}')
+            return self.keys.get(kid)
+
+
+class GoogleIDTokenVerifier:
+    """Validates signature, audience, issuer and expiry of Google ID tokens."""
+
+    def __init__(self, key_cache, audiences):
+        if not audiences:
+            raise ImproperlyConfigured('GOOGLE_CLIENT_IDS must list the OAuth client ids')
+        self.key_cache = key_cache
+        self.audiences = list(audiences)
+
+    def verify(self, token):
+        """Return the token's claims or raise InvalidGoogleToken."""
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError:
+            raise InvalidGoogleToken('Malformed token')
+        key = self.key_cache.get(header.get('kid'))
+        if key is None:
+            raise InvalidGoogleToken('Unknown signing key')
+        try:
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=['RS256'],
+                audience=self.audiences,
+                issuer=GOOGLE_ISSUERS,
+                leeway=CLOCK_SKEW_SECONDS,
+                options={'require': ['exp', 'iat', 'iss', 'aud', 'sub']},
+            )
+        except jwt.PyJWTError as exc:
+            raise InvalidGoogleToken(str(exc))
+        # Accounts are matched by email, so it must be one Google has verified
+        if claims.get('email') and claims.get('email_verified') not in (True, 'true'):
+            raise InvalidGoogleToken('Email address is not verified')
+        return claims
+
+
+_verifier = None
+
+
+def get_google_verifier():
+    """The process-wide verifier built from settings."""
+    global _verifier
+    if _verifier is None:
+        fetcher = getattr(settings, 'GOOGLE_JWKS_FETCHER', None)
+        fetcher = import_string(fetcher)() if fetcher else HTTPKeyFetcher()
+        _verifier = GoogleIDTokenVerifier(
+            SigningKeyCache(fetcher), getattr(settings, 'GOOGLE_CLIENT_IDS', [])
+        )
+    return _verifier
+
+
+def set_google_verifier(verifier):
+    """Replace the process-wide verifier, e.g. with one using local keys."""
+    global _verifier
+    _verifier = verifier
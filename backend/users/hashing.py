@@ -0,0 +1,102 @@
+"""
+Password hashing off the request thread.
+
+PBKDF2 and friends are deliberately slow. Hashing runs in a bounded thread
+pool (hashlib releases the GIL, so threads hash in parallel) with a cap on
+queued work: when the pool is saturated, callers get a 503 right away
+instead of every worker piling up behind a login spike. Login (through
+PooledHashingBackend), registration and password reset all hash here. Sync
+code waits on the future; async (ASGI) code awaits it without blocking the
+event loop.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher, make_password
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class HashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many sign-in requests right now, please retry shortly.'
+    default_code = 'hashing_busy'
+
+
+class HashingPool:
+    """Thread pool that refuses work beyond workers + max_queue pending jobs."""
+
+    def __init__(self, workers=None, max_queue=32):
+        self.workers = workers or os.cpu_count() or 2
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hashing')
+        self.slots = threading.BoundedSemaphore(self.workers + max_queue)
+        self.rejected = 0
+
+    def submit(self, fn, *args):
+        if not self.slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HashingBusy()
+        try:
+            future = self.executor.submit(fn, *args)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda _: self.slots.release())
+        return future
+
+    def run(self, fn, *args):
+        """Run fn in the pool and wait for its result."""
+        return self.submit(fn, *args).result()
+
+    async def arun(self, fn, *args):
+        """Run fn in the pool and await its result."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_hashing_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = HashingPool(
+                workers=getattr(settings, 'PASSWORD_HASHING_WORKERS', None),
+                max_queue=getattr(settings, 'PASSWORD_HASHING_QUEUE', 32),
+            )
+        return _pool
+
+
+def hash_password(raw_password):
+    return get_hashing_pool().run(make_password, raw_password)
+
+
+def verify_password(raw_password, encoded):
+    return get_hashing_pool().run(check_password, raw_password, encoded)
+
+
+async def ahash_password(raw_password):
+    return await get_hashing_pool().arun(make_password, raw_password)
+
+
+async def averify_password(raw_password, encoded):
+    return await get_hashing_pool().arun(check_password, raw_password, encoded)
+
+
+def set_password(user, raw_password):
+    """user.set_password() with the hashing done in the pool."""
+    get_hashing_pool().run(user.set_password, raw_password)
+
+
+def needs_rehash(encoded):
+    """Whether a stored hash uses an outdated hasher or work factor."""
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    preferred = get_hasher('default')
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
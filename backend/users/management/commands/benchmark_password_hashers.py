@@ -0,0 +1,68 @@
+import math
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand
+
+
+def time_encode(hasher, rounds):
+    """Median seconds for one hash with the hasher's current settings."""
+    salt = hasher.salt()
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hasher.encode('benchmark-password', salt)
+        timings.append(time.perf_counter() - started)
+    return sorted(timings)[len(timings) // 2]
+
+
+def recommend(hasher, seconds, target):
+    """Work factor expected to take about target seconds on this host."""
+    scale = target / seconds
+    if hasattr(hasher, 'iterations'):
+        # PBKDF2: cost is linear in iterations
+        return 'iterations', max(int(hasher.iterations * scale) // 10000 * 10000, 10000)
+    if hasattr(hasher, 'rounds'):
+        # bcrypt: cost doubles with each round
+        return 'rounds', max(hasher.rounds + round(math.log2(scale)), 4)
+    if hasattr(hasher, 'time_cost'):
+        # Argon2: cost is roughly linear in time_cost
+        return 'time_cost', max(round(hasher.time_cost * scale), 1)
+    if hasattr(hasher, 'work_factor'):
+        # scrypt: N must stay a power of two
+        return 'work_factor', max(2 ** round(math.log2(hasher.work_factor * scale)), 2 ** 14)
+    return None, None
+
+
+class Command(BaseCommand):
+    """Helps choose hasher work factors for the hardware the API runs on."""
+
+    help = 'Time the configured PASSWORD_HASHERS and recommend work factors for a target latency.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target-ms', type=float, default=250,
+                            help='Desired time for one hash in milliseconds.')
+        parser.add_argument('--rounds', type=int, default=5)
+
+    def handle(self, *args, **options):
+        target = options['target_ms'] / 1000
+        workers = getattr(settings, 'PASSWORD_HASHING_WORKERS', None) or 'cpu count'
+        self.stdout.write(f"Target {options['target_ms']:.0f} ms per hash, hashing pool workers: {workers}")
+        for index, hasher in enumerate(get_hashers()):
+            label = f"{hasher.algorithm}{' (default)' if index == 0 else ''}"
+            try:
+                seconds = time_encode(hasher, options['rounds'])
+            except (ValueError, ImportError) as exc:
+                self.stdout.write(f'{label}: skipped ({exc})')
+                continue
+            parameter, value = recommend(hasher, seconds, target)
+            line = f'{label}: {seconds * 1000:.1f} ms, about {1 / seconds:.1f} hashes/s per worker'
+            if parameter:
+                current = getattr(hasher, parameter)
+                line += f'; {parameter} {current} -> {value} for ~{options["target_ms"]:.0f} ms'
+            self.stdout.write(line)
+        self.stdout.write(
+            'Apply a recommendation by subclassing the hasher with the new value and '
+            'listing it first in PASSWORD_HASHERS.'
+        )
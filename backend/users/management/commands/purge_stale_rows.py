@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from life_of_pets_api.retention import discover, purge
+
+
+class Command(BaseCommand):
+    """Runs the retention policies declared in each app's retention.py."""
+
+    help = 'Delete expired tokens and other rows past their retention period, in small batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('policies', nargs='*', help='Policy names to run (default: all).')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--pause', type=float, default=0.1,
+                            help='Seconds to sleep between delete batches.')
+        parser.add_argument('--dry-run', action='store_true', help='Only count stale rows.')
+
+    def handle(self, *args, **options):
+        registry = discover()
+        names = options['policies'] or sorted(registry)
+        unknown = set(names) - registry.keys()
+        if unknown:
+            raise CommandError(f"Unknown policies: {', '.join(sorted(unknown))}. "
+                               f"Available: {', '.join(sorted(registry))}")
+        for name in names:
+            policy = registry[name]
+            if options['dry_run']:
+                count = policy.queryset().count()
+                self.stdout.write(f'{name}: {count} stale rows ({policy.description})')
+                continue
+            deleted = purge(policy, batch_size=options['batch_size'], pause=options['pause'])
+            self.stdout.write(self.style.SUCCESS(f'{name}: deleted {deleted} rows'))
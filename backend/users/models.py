@@ -19,12 +19,35 @@ class User(AbstractUser):
     is_profile_public = models.BooleanField(default=True)
     share_location = models.BooleanField(default=True)
 
+    # Carried in JWTs as the 'ver' claim; bumping it revokes issued tokens
+    auth_version = models.PositiveIntegerField(default=0, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.username or self.email
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_is_active = instance.is_active
+        return instance
+
+    def set_password(self, raw_password):
+        super().set_password(raw_password)
+        self.auth_version += 1
+
+    def save(self, *args, **kwargs):
+        # Deactivating an account revokes its tokens like a password change
+        if getattr(self, '_loaded_is_active', False) and not self.is_active:
+            self.auth_version += 1
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'password', 'is_active'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'auth_version'}
+        super().save(*args, **kwargs)
+        self._loaded_is_active = self.is_active
+
     class Meta:
         db_table = 'users'
         verbose_name = 'User'
@@ -51,3 +74,6 @@ class PasswordResetToken(models.Model):
 
     class Meta:
         db_table = 'password_reset_tokens'
+        indexes = [
+            models.Index(fields=['expires_at'], name='reset_token_expires_at'),
+        ]
@@ -0,0 +1,186 @@
+"""
+Shared HTTP clients for social login providers.
+
+One pooled requests.Session per provider is kept for the life of the process,
+so logins reuse keep-alive connections. Every call has strict connect and
+read timeouts and a small retry budget for idempotent GETs. A circuit
+breaker per provider fails fast after repeated errors, so a slow or failing
+provider cannot tie up every worker. Base URLs come from settings, which
+lets tests point a provider at a local stub server.
+"""
+import threading
+import time
+from collections import deque
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_PROVIDER_URLS = {
+    'google': 'https://www.googleapis.com',
+    'facebook': 'https://graph.facebook.com',
+}
+LATENCY_SAMPLES = 500
+
+
+class ProviderUnavailable(Exception):
+    """The provider is failing or its circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures. While open, calls
+    fail immediately; after reset_timeout one trial call is let through and
+    its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        with self.lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+
+
+class ProviderClient:
+    """Pooled, timeout-bounded HTTP client for one provider."""
+
+    def __init__(self, name, base_url, connect_timeout=2, read_timeout=5, retries=2,
+                 pool_size=20, breaker=None):
+        self.name = name
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=retries,
+                connect=retries,
+                read=retries,
+                status=retries,
+                backoff_factor=0.1,
+                status_forcelist=(502, 503, 504),
+                allowed_methods=frozenset(['GET']),
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)
+        self.requests = self.failures = self.short_circuits = 0
+
+    def get(self, path, **kwargs):
+        """GET base_url + path. Raises ProviderUnavailable on failure or open circuit."""
+        if not self.breaker.allow():
+            with self.lock:
+                self.short_circuits += 1
+            raise ProviderUnavailable(f'{self.name} is temporarily unavailable')
+        started = time.perf_counter()
+        try:
+            response = self.session.get(self.base_url + path, timeout=self.timeout, **kwargs)
+        except requests.RequestException as exc:
+            self._record(started, failed=True)
+            raise ProviderUnavailable(f'{self.name} request failed: {exc}')
+        # Client errors (e.g. a bad token) are the caller's problem, not the provider's
+        failed = response.status_code >= 500
+        self._record(started, failed=failed)
+        if failed:
+            raise ProviderUnavailable(f'{self.name} returned {response.status_code}')
+        return response
+
+    def _record(self, started, failed):
+        elapsed = (time.perf_counter() - started) * 1000
+        with self.lock:
+            self.requests += 1
+            self.latencies.append(elapsed)
+            if failed:
+                self.failures += 1
+        if failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def stats(self):
+        with self.lock:
+            latencies = sorted(self.latencies)
+            requests_made, failures, short_circuits = self.requests, self.failures, self.short_circuits
+
+        def percentile(fraction):
+            if not latencies:
+                return None
+            return round(latencies[min(int(len(latencies) * fraction), len(latencies) - 1)], 2)
+
+        return {
+            'requests': requests_made,
+            'failures': failures,
+            'short_circuits': short_circuits,
+            'circuit': self.breaker.state,
+            'latency_ms': {'p50': percentile(0.5), 'p95': percentile(0.95), 'max': percentile(1)},
+        }
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_provider_client(name):
+    """The process-wide client for a provider, created on first use."""
+    with _clients_lock:
+        client = _clients.get(name)
+        if client is None:
+            urls = {**DEFAULT_PROVIDER_URLS, **getattr(settings, 'SOCIAL_PROVIDER_URLS', {})}
+            options = getattr(settings, 'SOCIAL_PROVIDER_HTTP', {})
+            client = _clients[name] = ProviderClient(name, urls[name], **options)
+        return client
+
+
+def set_provider_client(name, client):
+    """Replace a provider's client (None to rebuild from settings), e.g. in tests."""
+    with _clients_lock:
+        if client is None:
+            _clients.pop(name, None)
+        else:
+            _clients[name] = client
+
+
+def provider_stats():
+    with _clients_lock:
+        clients = dict(_clients)
+    return {name: client.stats() for name, client in clients.items()}
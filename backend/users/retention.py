@@ -0,0 +1,19 @@
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+
+from life_of_pets_api.retention import RetentionPolicy, register
+
+from .models import PasswordResetToken
+
+register(RetentionPolicy(
+    name='password_reset_tokens',
+    description='Password reset tokens past their expiry (used ones included)',
+    days=1,
+    stale=lambda now, cutoff: PasswordResetToken.objects.filter(expires_at__lt=cutoff),
+))
+
+register(RetentionPolicy(
+    name='refresh_tokens',
+    description='Issued and blacklisted refresh tokens past their expiry',
+    days=1,
+    stale=lambda now, cutoff: OutstandingToken.objects.filter(expires_at__lt=cutoff),
+))
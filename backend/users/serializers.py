@@ -1,6 +1,15 @@
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import (
+    TokenBlacklistSerializer,
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
 from django.contrib.auth.password_validation import validate_password
+from django.db import transaction
+from .hashing import hash_password
 from .models import User
+from .tokens import AUTH_VERSION_CLAIM, VersionedRefreshToken
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -43,7 +52,13 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data.pop('password2')
-        user = User.objects.create_user(**validated_data)
+        encoded = hash_password(validated_data.pop('password'))
+        with transaction.atomic():
+            # create_user would hash on the request thread; give it no password
+            # and store the one hashed in the pool
+            user = User.objects.create_user(password=None, **validated_data)
+            user.password = encoded
+            user.save(update_fields=['password'])
         return user
 
 
@@ -76,3 +91,27 @@ class ResetPasswordSerializer(serializers.Serializer):
 class VerifyResetTokenSerializer(serializers.Serializer):
     """Serializer to verify if a reset token is valid."""
     token = serializers.CharField(required=True)
+
+
+class VersionedTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Login serializer issuing tokens that carry the user's auth version."""
+    token_class = VersionedRefreshToken
+
+
+class VersionedTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refuses refresh tokens issued before the user's tokens were revoked."""
+    token_class = VersionedRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        current = User.objects.filter(pk=refresh.get('user_id')).values_list(
+            'auth_version', flat=True
+        ).first()
+        if current is not None and current != refresh.get(AUTH_VERSION_CLAIM, 0):
+            raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+        return super().validate(attrs)
+
+
+class VersionedTokenBlacklistSerializer(TokenBlacklistSerializer):
+    """Logout: blacklists the refresh token and records it in the blacklist cache."""
+    token_class = VersionedRefreshToken
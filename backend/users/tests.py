@@ -1,3 +1,504 @@
-from django.test import TestCase
+import asyncio
+import io
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from life_of_pets_api.retention import discover, purge
+from notifications.models import OutboxEmail
+from pets.models import Pet, Swipe
+
+from . import throttling
+from .authentication import user_cache
+from .blacklist import BlacklistCache, blacklist_cache
+from .google import (
+    MIN_REFRESH_INTERVAL, GoogleIDTokenVerifier, SigningKeyCache, StaticKeyFetcher, set_google_verifier,
+)
+from .hashing import HashingBusy, HashingPool, ahash_password, averify_password
+from .models import PasswordResetToken, User
+from .providers import CircuitBreaker, ProviderClient, set_provider_client
+from .tokens import VersionedRefreshToken
+
+PASSWORD = 'Secretpw123!'
+
+
+class AuthTestCase(APITestCase):
+    def setUp(self):
+        user_cache.clear()
+        # Fresh throttle counters, so logins in one test don't count against the next
+        stores = mock.patch.dict(throttling._stores, {'local': throttling.LocalWindowStore()})
+        stores.start()
+        self.addCleanup(stores.stop)
+        self.user = User.objects.create_user('owner', 'owner@example.com', PASSWORD)
+
+    def login(self, username='owner', password=PASSWORD):
+        return self.client.post('/api/auth/login/', {'username': username, 'password': password}, format='json')
+
+    def bearer(self, access):
+        return {'HTTP_AUTHORIZATION': f'Bearer {access}'}
+
+
+class AuthVersionTests(AuthTestCase):
+    """Cached JWT users and revocation through auth_version."""
+
+    def setUp(self):
+        super().setUp()
+        tokens = self.login().data
+        self.auth = self.bearer(tokens['access'])
+        self.refresh = tokens['refresh']
+
+    def test_cached_user_needs_no_query(self):
+        self.client.get('/api/pets/', **self.auth)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/pets/', **self.auth)
+        self.assertEqual(response.status_code, 200)
+        queries = [query['sql'] for query in ctx.captured_queries]
+        self.assertFalse(any('FROM "users"' in sql for sql in queries), queries)
+
+    def test_profile_update_invalidates(self):
+        self.client.get('/api/auth/me/', **self.auth)
+        self.assertEqual(self.client.patch('/api/auth/me/', {'bio': 'hi'}, format='json', **self.auth).data['bio'], 'hi')
+        self.assertEqual(self.client.get('/api/auth/me/', **self.auth).data['bio'], 'hi')
+
+    def test_password_change_revokes_tokens(self):
+        self.client.get('/api/pets/', **self.auth)
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('Newpw12345!')
+        user.save()
+        self.assertEqual(self.client.get('/api/pets/', **self.auth).status_code, 401)
+        response = self.client.post('/api/auth/token/refresh/', {'refresh': self.refresh}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+        tokens = self.login(password='Newpw12345!').data
+        self.assertEqual(self.client.get('/api/pets/', **self.bearer(tokens['access'])).status_code, 200)
+        response = self.client.post('/api/auth/token/refresh/', {'refresh': tokens['refresh']}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_deactivation_revokes_tokens(self):
+        self.client.get('/api/pets/', **self.auth)
+        user = User.objects.get(pk=self.user.pk)
+        user.is_active = False
+        user.save()
+        self.assertEqual(self.client.get('/api/pets/', **self.auth).status_code, 401)
+
+    def test_cache_stats_are_staff_only(self):
+        self.assertEqual(self.client.get('/api/auth/auth-cache/', **self.auth).status_code, 403)
+        User.objects.create_user('admin', 'admin@example.com', PASSWORD, is_staff=True)
+        staff = self.bearer(self.login('admin').data['access'])
+        response = self.client.get('/api/auth/auth-cache/', **staff)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('hit_rate', response.data)
+
+
+def signing_key(kid):
+    """An RSA private key and the matching public JWK."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update(kid=kid, alg='RS256', use='sig')
+    return private_key, jwk
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class GoogleLoginTests(AuthTestCase):
+    """Sign-in with Google ID tokens verified against cached signing keys."""
+
+    def setUp(self):
+        super().setUp()
+        self.key, jwk = signing_key('k1')
+        self.fetches = 0
+        fetcher = StaticKeyFetcher({'keys': [jwk]})
+
+        def counting_fetcher():
+            self.fetches += 1
+            return fetcher()
+
+        self.clock = Clock()
+        self.verifier = GoogleIDTokenVerifier(SigningKeyCache(counting_fetcher, clock=self.clock), ['my-client'])
+        set_google_verifier(self.verifier)
+        self.addCleanup(set_google_verifier, None)
+        now = int(time.time())
+        self.claims = {
+            'iss': 'https://accounts.google.com', 'aud': 'my-client', 'sub': '1234567890',
+            'email': 'g@example.com', 'email_verified': True, 'iat': now, 'exp': now + 3600, 'given_name': 'G',
+        }
+
+    def token(self, key=None, kid='k1', algorithm='RS256', **claims):
+        return jwt.encode({**self.claims, **claims}, key or self.key, algorithm=algorithm, headers={'kid': kid})
+
+    def google_login(self, id_token):
+        return self.client.post('/api/auth/google/', {'id_token': id_token}, format='json')
+
+    def test_login_creates_account_once(self):
+        response = self.google_login(self.token())
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertTrue(response.data['created'])
+        response = self.google_login(self.token())
+        self.assertFalse(response.data['created'])
+        self.assertEqual(User.objects.filter(email='g@example.com').count(), 1)
+        self.assertEqual(self.fetches, 1)
+
+    def test_invalid_tokens(self):
+        for claims in ({'aud': 'other'}, {'iss': 'evil'}, {'exp': self.claims['iat'] - 3600}, {'email_verified': False}):
+            self.assertEqual(self.google_login(self.token(**claims)).status_code, 400, claims)
+        other_key, _ = signing_key('k1')
+        self.assertEqual(self.google_login(self.token(key=other_key)).status_code, 400)
+        self.assertEqual(self.google_login(self.token(key='secret', algorithm='HS256')).status_code, 400)
+        self.assertEqual(self.google_login('garbage').status_code, 400)
+
+    def test_unknown_kid_refetch_is_rate_limited(self):
+        self.verifier.verify(self.token())
+        self.assertEqual(self.google_login(self.token(kid='k9')).status_code, 400)
+        self.assertEqual(self.google_login(self.token(kid='k9')).status_code, 400)
+        self.assertEqual(self.fetches, 1)
+        self.clock.now += MIN_REFRESH_INTERVAL
+        self.assertEqual(self.google_login(self.token(kid='k9')).status_code, 400)
+        self.assertEqual(self.fetches, 2)
+
+    def test_not_configured(self):
+        set_google_verifier(None)
+        self.assertEqual(self.google_login(self.token()).status_code, 503)
+
+
+class FakeGraphAPI(BaseHTTPRequestHandler):
+    """Local stand-in for the Facebook Graph API; `mode` is set by the test."""
+
+    protocol_version = 'HTTP/1.1'
+    mode = 'ok'
+    hits = 0
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        type(self).hits += 1
+        if self.mode == 'slow':
+            time.sleep(1.0)
+        if self.mode == 'error':
+            body = b'{}'
+            self.send_response(503)
+        else:
+            body = json.dumps({
+                'id': '123456789012345', 'email': 'fb@example.com', 'first_name': 'F', 'last_name': 'B',
+            }).encode()
+            self.send_response(400 if 'bad' in self.path else 200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class QuietHTTPServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        pass  # The client hanging up on the slow handler is expected
+
+
+class ProviderClientTests(AuthTestCase):
+    """Timeouts and the circuit breaker around social login providers."""
+
+    def setUp(self):
+        super().setUp()
+        FakeGraphAPI.mode, FakeGraphAPI.hits = 'ok', 0
+        server = QuietHTTPServer(('127.0.0.1', 0), FakeGraphAPI)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.clock = Clock()
+        client = ProviderClient(
+            'facebook', f'http://127.0.0.1:{server.server_port}',
+            connect_timeout=0.5, read_timeout=0.3, retries=1,
+            breaker=CircuitBreaker(failure_threshold=3, reset_timeout=30, clock=self.clock),
+        )
+        set_provider_client('facebook', client)
+        self.addCleanup(set_provider_client, 'facebook', None)
+
+    def facebook_login(self, access_token='token'):
+        return self.client.post('/api/auth/facebook/', {'access_token': access_token}, format='json')
+
+    def test_login(self):
+        response = self.facebook_login()
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self.facebook_login('bad').status_code, 400)
+
+    def test_slow_provider_times_out(self):
+        FakeGraphAPI.mode = 'slow'
+        started = time.monotonic()
+        self.assertEqual(self.facebook_login().status_code, 503)
+        self.assertLess(time.monotonic() - started, 1.0)
+
+    def test_breaker_opens_and_recovers(self):
+        FakeGraphAPI.mode = 'error'
+        for _ in range(3):
+            self.assertEqual(self.facebook_login().status_code, 503)
+        hits = FakeGraphAPI.hits
+        self.assertEqual(self.facebook_login().status_code, 503)
+        self.assertEqual(FakeGraphAPI.hits, hits)
+
+        FakeGraphAPI.mode = 'ok'
+        self.clock.now += 30
+        self.assertEqual(self.facebook_login().status_code, 200)
+
+
+class PasswordHashingTests(AuthTestCase):
+    """Registration and login hash passwords in the bounded pool."""
+
+    def test_register_and_login(self):
+        response = self.client.post('/api/auth/register/', {
+            'username': 'newuser', 'email': 'New@EXAMPLE.COM', 'password': PASSWORD, 'password2': PASSWORD,
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        user = User.objects.get(username='newuser')
+        self.assertTrue(user.check_password(PASSWORD))
+        self.assertEqual(user.email, 'New@example.com')
+
+        self.assertEqual(self.login('newuser').status_code, 200)
+        self.assertEqual(self.login('newuser', 'wrong').status_code, 401)
+        self.assertEqual(self.login('nobody', 'wrong').status_code, 401)
+
+    def test_outdated_hash_is_upgraded_without_revoking(self):
+        self.user.password = make_password(PASSWORD, hasher='pbkdf2_sha1')
+        self.user.save(update_fields=['password'])
+        version = User.objects.get(pk=self.user.pk).auth_version
+        self.assertEqual(self.login().status_code, 200)
+        user = User.objects.get(pk=self.user.pk)
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$'))
+        self.assertEqual(user.auth_version, version)
+
+    def test_pool_refuses_work_beyond_its_queue(self):
+        pool = HashingPool(workers=1, max_queue=1)
+        release = threading.Event()
+        blocked = [pool.submit(release.wait), pool.submit(release.wait)]
+        with self.assertRaises(HashingBusy):
+            pool.submit(release.wait)
+        self.assertEqual(pool.rejected, 1)
+        # Done callbacks run in order, so these fire after the pool frees the slot
+        finished = threading.Semaphore(0)
+        for future in blocked:
+            future.add_done_callback(lambda _: finished.release())
+        release.set()
+        for _ in blocked:
+            self.assertTrue(finished.acquire(timeout=5))
+        self.assertTrue(pool.run(lambda: True))
+
+    async def test_async_hashing_refuses_work_without_blocking_the_loop(self):
+        pool = HashingPool(workers=1, max_queue=1)
+        release = threading.Event()
+        blocked = [asyncio.ensure_future(pool.arun(release.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with mock.patch('users.hashing.get_hashing_pool', return_value=pool):
+            with self.assertRaises(HashingBusy):
+                await pool.arun(release.wait)
+            with self.assertRaises(HashingBusy):
+                await ahash_password(PASSWORD)
+            with self.assertRaises(HashingBusy):
+                await averify_password(PASSWORD, make_password(PASSWORD))
+            self.assertEqual(pool.rejected, 3)
+            # The loop keeps running while the saturating jobs are still waiting
+            await asyncio.sleep(0.01)
+            self.assertFalse(any(task.done() for task in blocked))
+            release.set()
+            self.assertEqual(await asyncio.wait_for(asyncio.gather(*blocked), timeout=5), [True, True])
+
+            encoded = await ahash_password(PASSWORD)
+            self.assertTrue(await averify_password(PASSWORD, encoded))
+            self.assertFalse(await averify_password('wrong', encoded))
+
+
+class RetentionTests(AuthTestCase):
+    """purge_stale_rows runs every app's retention policies."""
+
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        PasswordResetToken.objects.bulk_create([
+            PasswordResetToken(user=self.user, token=f'expired-{i}', expires_at=now - timedelta(days=2))
+            for i in range(1203)
+        ])
+        self.token = PasswordResetToken.objects.create(user=self.user)
+
+        other = User.objects.create_user('other', 'other@example.com', PASSWORD)
+        pet = Pet.objects.create(owner=self.user, name='Rex')
+        others = [Pet.objects.create(owner=other, name=f'Pet {i}') for i in range(3)]
+        old_dislike = Swipe.objects.create(swiper_pet=pet, swiped_pet=others[0], action='dislike')
+        Swipe.objects.create(swiper_pet=pet, swiped_pet=others[1], action='dislike')
+        old_like = Swipe.objects.create(swiper_pet=pet, swiped_pet=others[2], action='like')
+        Swipe.objects.filter(pk__in=[old_dislike.pk, old_like.pk]).update(created_at=now - timedelta(days=400))
+
+        OutboxEmail.objects.create(subject='Sent', body='body', to='a@example.com', status='sent',
+                                   sent_at=now - timedelta(days=40), next_attempt_at=now)
+        OutboxEmail.objects.create(subject='Pending', body='body', to='a@example.com',
+                                   next_attempt_at=now - timedelta(days=40))
+
+    def test_dry_run_only_counts(self):
+        out = io.StringIO()
+        call_command('purge_stale_rows', '--dry-run', stdout=out)
+        self.assertIn('password_reset_tokens: 1203 stale rows', out.getvalue())
+        self.assertEqual(PasswordResetToken.objects.count(), 1204)
+
+    def test_purge(self):
+        call_command('purge_stale_rows', '--pause', '0', stdout=io.StringIO())
+        self.assertEqual(list(PasswordResetToken.objects.all()), [self.token])
+        self.assertEqual(sorted(Swipe.objects.values_list('action', flat=True)), ['dislike', 'like'])
+        self.assertEqual(list(OutboxEmail.objects.values_list('subject', flat=True)), ['Pending'])
+
+    def test_unknown_policy(self):
+        with self.assertRaises(CommandError):
+            call_command('purge_stale_rows', 'nope', stdout=io.StringIO())
+
+
+TEST_THROTTLE_SETTINGS = {
+    'DEFAULT_AUTHENTICATION_CLASSES': ['users.authentication.CachedJWTAuthentication'],
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated'],
+    'DEFAULT_THROTTLE_RATES': {'auth_ip': '10/min', 'auth_account': '3/min'},
+}
+
+
+class FixedKeyThrottle(throttling.SlidingWindowThrottle):
+    scope = 'auth_account'
+    now = 1000 * 60.0
+
+    def timer(self):
+        return FixedKeyThrottle.now
+
+    def get_key(self, request, view):
+        return 'key'
+
+
+@override_settings(REST_FRAMEWORK=TEST_THROTTLE_SETTINGS)
+class ThrottleTests(AuthTestCase):
+    """Sliding-window limits on the unauthenticated auth endpoints."""
+
+    def setUp(self):
+        super().setUp()
+        # A fixed time keeps every request in one window
+        timer = mock.patch.object(throttling.SlidingWindowThrottle, 'timer', lambda self: 1000 * 60.0 + 1)
+        timer.start()
+        self.addCleanup(timer.stop)
+        FixedKeyThrottle.now = 1000 * 60.0
+
+    def test_account_is_locked_before_hashing(self):
+        for _ in range(3):
+            self.assertEqual(self.login(password='bad').status_code, 401)
+        with mock.patch('users.backends.PooledHashingBackend.authenticate') as authenticate:
+            response = self.client.post('/api/auth/login/', {'username': 'OWNER', 'password': 'bad'},
+                                        format='json', REMOTE_ADDR='10.0.0.9')
+            self.assertEqual(response.status_code, 429)
+            self.assertGreaterEqual(int(response['Retry-After']), 1)
+            authenticate.assert_not_called()
+        # Other accounts from the same address are unaffected
+        self.assertEqual(self.login('other', 'bad').status_code, 401)
+
+    def test_ip_limit(self):
+        codes = [
+            self.client.post('/api/auth/forgot-password/', {'email': f'a{i}@example.com'}, format='json').status_code
+            for i in range(12)
+        ]
+        self.assertEqual(codes.count(429), 2, codes)
+
+    def test_previous_window_decays(self):
+        self.assertEqual([FixedKeyThrottle().allow_request(None, None) for _ in range(4)], [True, True, True, False])
+        # Start of the next window: the previous window still weighs 3
+        FixedKeyThrottle.now += 60
+        throttle = FixedKeyThrottle()
+        self.assertFalse(throttle.allow_request(None, None))
+        self.assertTrue(0 < throttle.wait() <= 60)
+        # Half way through it weighs 1.5, which leaves room for two requests
+        FixedKeyThrottle.now += 30
+        self.assertEqual([FixedKeyThrottle().allow_request(None, None) for _ in range(3)], [True, True, False])
+        FixedKeyThrottle.now += 120
+        self.assertTrue(FixedKeyThrottle().allow_request(None, None))
+
+    def test_concurrent_requests_cannot_exceed_the_limit(self):
+        start = threading.Barrier(20)
+
+        def attempt():
+            start.wait()
+            return FixedKeyThrottle().allow_request(None, None)
+
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            allowed = list(executor.map(lambda _: attempt(), range(20)))
+        self.assertEqual(allowed.count(True), 3)
+        # Rejected requests were not left counted
+        self.assertEqual(throttling.get_store().hit('auth_account:key', int(FixedKeyThrottle.now // 60), 60), (4, 0))
+
+    @override_settings(THROTTLE_STORE='cache')
+    def test_cache_store(self):
+        cache.clear()
+        self.assertEqual([self.login('nobody', 'bad').status_code for _ in range(4)], [401, 401, 401, 429])
+
+
+class RefreshBlacklistTests(AuthTestCase):
+    """Rotated and logged-out refresh tokens, checked against an in-process blacklist."""
+
+    def setUp(self):
+        super().setUp()
+        blacklist_cache.clear()
+        self.addCleanup(blacklist_cache.clear)
+
+    def refresh_token(self):
+        response = self.login()
+        self.assertEqual(response.status_code, 200)
+        return response.data['refresh']
+
+    def refresh(self, token):
+        return self.client.post('/api/auth/token/refresh/', {'refresh': token}, format='json')
+
+    def test_rotation_and_logout(self):
+        first = self.refresh_token()
+        response = self.refresh(first)
+        self.assertEqual(response.status_code, 200, response.data)
+        second = response.data['refresh']
+        self.assertNotEqual(first, second)
+        self.assertEqual(self.refresh(first).status_code, 401)
+
+        response = self.client.post('/api/auth/logout/', {'refresh': second}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(self.refresh(second).status_code, 401)
+
+    def test_check_needs_no_query(self):
+        token = str(VersionedRefreshToken(self.refresh_token()))
+        blacklist_cache.sync()
+        with self.assertNumQueries(0):
+            for _ in range(100):
+                VersionedRefreshToken(token)
+
+    def test_other_processes_sync_incrementally(self):
+        token = VersionedRefreshToken(self.refresh_token())
+        other = BlacklistCache(sync_interval=0)
+        self.assertFalse(other.contains(token['jti']))
+        token.blacklist()
+        self.assertTrue(blacklist_cache.contains(token['jti']))
+        self.assertTrue(other.contains(token['jti']))
+        with CaptureQueriesContext(connection) as ctx:
+            other.contains('unknown')
+        self.assertIn('"id" >', ctx.captured_queries[0]['sql'])
+
+    def test_expired_tokens_are_pruned(self):
+        VersionedRefreshToken(self.refresh_token()).blacklist()
+        OutstandingToken.objects.update(expires_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(purge(discover()['refresh_tokens'], pause=0), 1)
+        self.assertFalse(BlacklistedToken.objects.exists())
+        blacklist_cache.add('expired', timezone.now().timestamp() - 1)
+        blacklist_cache.sync()
+        self.assertNotIn('expired', blacklist_cache.entries)
@@ -0,0 +1,174 @@
+"""
+Sliding-window throttles for the unauthenticated auth endpoints.
+
+Each key keeps two counters, the current and the previous fixed window, and
+the request rate is estimated by weighting the previous window by how much of
+it still overlaps the sliding window. That is O(1) memory per key, and keys
+expire on their own after two windows. A request is counted with one atomic
+increment that returns the new count, and the check uses that count, so
+concurrent requests cannot all pass on the same stale reading; a rejected
+request's increment is taken back. Counters live in process memory by
+default; set THROTTLE_STORE = 'cache' to share them across workers through
+Django's cache. Throttles run in DRF's initial(), so rejected requests never
+reach password hashing.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+SWEEP_EVERY = 1024
+
+
+class LocalWindowStore:
+    """Per-process counters: key -> (window number, current count, previous count)."""
+
+    def __init__(self):
+        self.counters = {}
+        self.lock = threading.Lock()
+        self.writes = 0
+
+    def _counts(self, key, window_number):
+        entry = self.counters.get(key)
+        if entry is None or entry[0] < window_number - 1:
+            return 0, 0
+        if entry[0] == window_number - 1:
+            return 0, entry[1]
+        return entry[1], entry[2]
+
+    def hit(self, key, window_number, duration):
+        """Count a request; returns (current count including it, previous count)."""
+        with self.lock:
+            current, previous = self._counts(key, window_number)
+            self.counters[key] = (window_number, current + 1, previous)
+            self.writes += 1
+            if self.writes % SWEEP_EVERY == 0:
+                # Keys idle for two windows carry no weight any more
+                self.counters = {
+                    k: v for k, v in self.counters.items() if v[0] >= window_number - 1
+                }
+            return current + 1, previous
+
+    def undo(self, key, window_number):
+        """Take back a hit in window_number."""
+        with self.lock:
+            entry = self.counters.get(key)
+            if entry is not None and entry[0] == window_number and entry[1] > 0:
+                self.counters[key] = (window_number, entry[1] - 1, entry[2])
+
+
+class CacheWindowStore:
+    """Counters in Django's cache, one key per fixed window with a two-window timeout."""
+
+    def _key(self, key, window_number):
+        return f'throttle:{key}:{window_number}'
+
+    def hit(self, key, window_number, duration):
+        """Count a request; returns (current count including it, previous count)."""
+        cache_key = self._key(key, window_number)
+        if cache.add(cache_key, 1, timeout=duration * 2):
+            current = 1
+        else:
+            try:
+                current = cache.incr(cache_key)
+            except ValueError:  # Expired between add() and incr()
+                cache.set(cache_key, 1, timeout=duration * 2)
+                current = 1
+        return current, cache.get(self._key(key, window_number - 1), 0)
+
+    def undo(self, key, window_number):
+        """Take back a hit in window_number."""
+        try:
+            cache.decr(self._key(key, window_number))
+        except ValueError:
+            pass
+
+
+_stores = {'local': LocalWindowStore(), 'cache': CacheWindowStore()}
+
+
+def get_store():
+    return _stores[getattr(settings, 'THROTTLE_STORE', 'local')]
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """
+    Allows `rate` requests (DRF 'N/period' syntax, from DEFAULT_THROTTLE_RATES
+    by scope) per sliding window for each key from get_key().
+    """
+
+    scope = None
+    timer = time.time
+
+    def __init__(self):
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        self.num_requests, self.duration = self.parse_rate(rate)
+        self.wait_seconds = None
+
+    @staticmethod
+    def parse_rate(rate):
+        if rate is None:
+            return None, None
+        num, period = rate.split('/')
+        return int(num), {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+
+    def get_key(self, request, view):
+        raise NotImplementedError('Subclasses must implement get_key().')
+
+    def allow_request(self, request, view):
+        if self.num_requests is None:
+            return True
+        key = self.get_key(request, view)
+        if key is None:
+            return True
+        key = f'{self.scope}:{key}'
+        now = self.timer()
+        window_number, offset = divmod(now, self.duration)
+        window_number = int(window_number)
+        store = get_store()
+        counted, previous = store.hit(key, window_number, self.duration)
+        current = counted - 1  # Requests in this window before this one
+        overlap = 1 - offset / self.duration
+        if previous * overlap + current >= self.num_requests:
+            store.undo(key, window_number)
+            # Time until the previous window's weight has decayed enough
+            if previous and current < self.num_requests:
+                needed = (previous * overlap + current - self.num_requests + 1) / previous
+                self.wait_seconds = max(needed * self.duration, 1)
+            else:
+                self.wait_seconds = self.duration - offset
+            return False
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AuthIPThrottle(SlidingWindowThrottle):
+    """Limits auth attempts per client IP."""
+    scope = 'auth_ip'
+
+    def get_key(self, request, view):
+        return self.get_ident(request)
+
+
+class AuthAccountThrottle(SlidingWindowThrottle):
+    """Limits auth attempts per targeted account, whatever IP they come from."""
+    scope = 'auth_account'
+    account_fields = ('username', 'email', 'token')
+
+    def get_key(self, request, view):
+        if request.method != 'POST':
+            return None
+        try:
+            data = request.data
+        except Exception:  # Unparseable bodies are rejected by the view itself
+            return None
+        for field in self.account_fields:
+            value = data.get(field) if hasattr(data, 'get') else None
+            if isinstance(value, str) and value.strip():
+                return f'{field}:{value.strip().lower()}'
+        return None
@@ -0,0 +1,31 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .blacklist import blacklist_cache
+
+AUTH_VERSION_CLAIM = 'ver'
+
+
+class VersionedRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the user's auth_version. Access tokens made from
+    it copy the claim, so bumping auth_version revokes both. Blacklist checks
+    go through the in-process blacklist cache instead of a query per token.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[AUTH_VERSION_CLAIM] = user.auth_version
+        return token
+
+    def check_blacklist(self):
+        if blacklist_cache.contains(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_('Token is blacklisted'))
+
+    def blacklist(self):
+        result = super().blacklist()
+        blacklist_cache.add(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+        return result
@@ -7,6 +7,8 @@ from .views import (
     ResetPasswordView,
     GoogleAuthView,
     FacebookAuthView,
+    AuthCacheStatsView,
+    ProviderStatsView,
 )
 
 urlpatterns = [
@@ -17,4 +19,6 @@ urlpatterns = [
     path('reset-password/', ResetPasswordView.as_view(), name='reset-password'),
     path('google/', GoogleAuthView.as_view(), name='google-auth'),
     path('facebook/', FacebookAuthView.as_view(), name='facebook-auth'),
+    path('auth-cache/', AuthCacheStatsView.as_view(), name='auth-cache-stats'),
+    path('provider-stats/', ProviderStatsView.as_view(), name='provider-stats'),
 ]
@@ -1,12 +1,20 @@
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
-from django.core.mail import send_mail
+from rest_framework_simplejwt.views import TokenObtainPairView
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
 from django.conf import settings
+from notifications.outbox import enqueue_email
+from .authentication import user_cache
+from .hashing import set_password
+from .google import InvalidGoogleToken, get_google_verifier
+from .providers import ProviderUnavailable, get_provider_client, provider_stats
 from .models import User, PasswordResetToken
+from .throttling import AuthAccountThrottle, AuthIPThrottle
+from .tokens import VersionedRefreshToken
 from .serializers import (
     UserSerializer,
     UserRegistrationSerializer,
@@ -15,11 +23,20 @@ from .serializers import (
     VerifyResetTokenSerializer,
 )
 
+# Unauthenticated endpoints that hash passwords or write rows
+AUTH_THROTTLES = [AuthIPThrottle, AuthAccountThrottle]
+
+
+class LoginView(TokenObtainPairView):
+    """Obtain a JWT pair; throttled before the password is checked."""
+    throttle_classes = AUTH_THROTTLES
+
 
 class RegisterView(generics.CreateAPIView):
     """User registration endpoint."""
     queryset = User.objects.all()
     permission_classes = [AllowAny]
+    throttle_classes = AUTH_THROTTLES
     serializer_class = UserRegistrationSerializer
 
     def create(self, request, *args, **kwargs):
@@ -28,7 +45,7 @@ class RegisterView(generics.CreateAPIView):
         user = serializer.save()
 
         # Generate JWT tokens
-        refresh = RefreshToken.for_user(user)
+        refresh = VersionedRefreshToken.for_user(user)
 
         return Response({
             'user': UserSerializer(user).data,
@@ -51,6 +68,7 @@ class CurrentUserView(generics.RetrieveUpdateAPIView):
 class ForgotPasswordView(APIView):
     """Request a password reset token."""
     permission_classes = [AllowAny]
+    throttle_classes = AUTH_THROTTLES
     serializer_class = ForgotPasswordSerializer
 
     def post(self, request):
@@ -62,11 +80,21 @@ class ForgotPasswordView(APIView):
         try:
             user = User.objects.get(email=email)
 
-            # Invalidate any existing tokens
-            PasswordResetToken.objects.filter(user=user, used=False).update(used=True)
+            with transaction.atomic():
+                # Invalidate any existing tokens
+                PasswordResetToken.objects.filter(user=user, used=False).update(used=True)
 
-            # Create new token
-            reset_token = PasswordResetToken.objects.create(user=user)
+                # Create new token
+                reset_token = PasswordResetToken.objects.create(user=user)
+
+                if not settings.DEBUG:
+                    # Queued with the token and sent by the drain_email_outbox worker
+                    reset_link = f"yourapp://reset-password?token={reset_token.token}"
+                    enqueue_email(
+                        'Password Reset Request',
+                        f'Use this link to reset your password: {reset_link}\n\nThis link expires in 1 hour.',
+                        [email],
+                    )
 
             # For development, we'll return the token directly
             # In production, you'd send this via email
@@ -76,19 +104,9 @@ class ForgotPasswordView(APIView):
                     'token': reset_token.token,  # Only in DEBUG mode
                     'note': 'In production, this token would be sent via email.'
                 }, status=status.HTTP_200_OK)
-            else:
-                # Send email (configure EMAIL settings in production)
-                reset_link = f"yourapp://reset-password?token={reset_token.token}"
-                send_mail(
-                    'Password Reset Request',
-                    f'Use this link to reset your password: {reset_link}\n\nThis link expires in 1 hour.',
-                    settings.DEFAULT_FROM_EMAIL,
-                    [email],
-                    fail_silently=False,
-                )
-                return Response({
-                    'message': 'If an account with this email exists, a reset link has been sent.'
-                }, status=status.HTTP_200_OK)
+            return Response({
+                'message': 'If an account with this email exists, a reset link has been sent.'
+            }, status=status.HTTP_200_OK)
 
         except User.DoesNotExist:
             # Return same message to prevent email enumeration
@@ -100,6 +118,7 @@ class ForgotPasswordView(APIView):
 class VerifyResetTokenView(APIView):
     """Verify if a password reset token is valid."""
     permission_classes = [AllowAny]
+    throttle_classes = AUTH_THROTTLES
     serializer_class = VerifyResetTokenSerializer
 
     def post(self, request):
@@ -130,6 +149,7 @@ class VerifyResetTokenView(APIView):
 class ResetPasswordView(APIView):
     """Reset password using a valid token."""
     permission_classes = [AllowAny]
+    throttle_classes = AUTH_THROTTLES
     serializer_class = ResetPasswordSerializer
 
     def post(self, request):
@@ -149,7 +169,7 @@ class ResetPasswordView(APIView):
 
             # Reset the password
             user = reset_token.user
-            user.set_password(password)
+            set_password(user, password)
             user.save()
 
             # Mark token as used
@@ -169,6 +189,7 @@ class ResetPasswordView(APIView):
 class GoogleAuthView(APIView):
     """Authenticate with Google OAuth."""
     permission_classes = [AllowAny]
+    throttle_classes = AUTH_THROTTLES
 
     def post(self, request):
         id_token = request.data.get('id_token')
@@ -179,18 +200,22 @@ class GoogleAuthView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            # Verify the token with Google
-            import requests
-            google_response = requests.get(
-                f'https://oauth2.googleapis.com/tokeninfo?id_token={id_token}'
-            )
-
-            if google_response.status_code != 200:
+            # Verify the token locally against Google's cached signing keys
+            try:
+                google_data = get_google_verifier().verify(id_token)
+            except InvalidGoogleToken:
                 return Response({
                     'error': 'Invalid Google token'
                 }, status=status.HTTP_400_BAD_REQUEST)
+            except ImproperlyConfigured:
+                return Response({
+                    'error': 'Google sign-in is not configured'
+                }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            except ProviderUnavailable:
+                return Response({
+                    'error': 'Google is not reachable, please try again later'
+                }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
-            google_data = google_response.json()
             email = google_data.get('email')
             google_id = google_data.get('sub')
             first_name = google_data.get('given_name', '')
@@ -212,7 +237,7 @@ class GoogleAuthView(APIView):
             )
 
             # Generate JWT tokens
-            refresh = RefreshToken.for_user(user)
+            refresh = VersionedRefreshToken.for_user(user)
 
             return Response({
                 'user': UserSerializer(user).data,
@@ -232,6 +257,7 @@ class GoogleAuthView(APIView):
 class FacebookAuthView(APIView):
     """Authenticate with Facebook OAuth."""
     permission_classes = [AllowAny]
+    throttle_classes = AUTH_THROTTLES
 
     def post(self, request):
         access_token = request.data.get('access_token')
@@ -243,10 +269,15 @@ class FacebookAuthView(APIView):
 
         try:
             # Verify the token with Facebook
-            import requests
-            fb_response = requests.get(
-                f'https://graph.facebook.com/me?fields=id,email,first_name,last_name&access_token={access_token}'
-            )
+            try:
+                fb_response = get_provider_client('facebook').get('/me', params={
+                    'fields': 'id,email,first_name,last_name',
+                    'access_token': access_token,
+                })
+            except ProviderUnavailable:
+                return Response({
+                    'error': 'Facebook is not reachable, please try again later'
+                }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
             if fb_response.status_code != 200:
                 return Response({
@@ -275,7 +306,7 @@ class FacebookAuthView(APIView):
             )
 
             # Generate JWT tokens
-            refresh = RefreshToken.for_user(user)
+            refresh = VersionedRefreshToken.for_user(user)
 
             return Response({
                 'user': UserSerializer(user).data,
@@ -290,3 +321,19 @@ class FacebookAuthView(APIView):
             return Response({
                 'error': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class AuthCacheStatsView(APIView):
+    """Hit-rate statistics of this process's authenticated-user cache."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(user_cache.stats())
+
+
+class ProviderStatsView(APIView):
+    """Latency, failure and circuit state of this process's social login clients."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(provider_stats())
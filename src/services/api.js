@@ -55,6 +55,18 @@ api.interceptors.request.use(
   }
 );
 
+// Refresh tokens are rotated and single-use, so concurrent 401s share one refresh call
+let refreshPromise = null;
+
+const refreshAccessToken = async (refreshToken) => {
+  const response = await axios.post(`${API_BASE_URL}/auth/token/refresh/`, {
+    refresh: refreshToken,
+  });
+  const { access, refresh } = response.data;
+  await tokenManager.setTokens(access, refresh);
+  return access;
+};
+
 // Response interceptor to handle token refresh
 api.interceptors.response.use(
   (response) => response,
@@ -68,12 +80,12 @@ api.interceptors.response.use(
       try {
         const refreshToken = await tokenManager.getRefreshToken();
         if (refreshToken) {
-          const response = await axios.post(`${API_BASE_URL}/auth/token/refresh/`, {
-            refresh: refreshToken,
-          });
-
-          const { access } = response.data;
-          await tokenManager.setTokens(access, refreshToken);
+          if (!refreshPromise) {
+            refreshPromise = refreshAccessToken(refreshToken).finally(() => {
+              refreshPromise = null;
+            });
+          }
+          const access = await refreshPromise;
 
           // Retry original request with new token
           originalRequest.headers.Authorization = `Bearer ${access}`;
@@ -110,6 +122,11 @@ export const authAPI = {
   },
 
   async logout() {
+    const refreshToken = await tokenManager.getRefreshToken();
+    if (refreshToken) {
+      // Revoke the refresh token; local tokens are cleared even if this fails
+      await api.post('/auth/logout/', { refresh: refreshToken }).catch(() => {});
+    }
     await tokenManager.clearTokens();
   },
 
@@ -258,6 +275,15 @@ export const eventsAPI = {
   },
 };
 
+// Dashboard API
+export const dashboardAPI = {
+  // Pets, today's activities, feeding schedules, upcoming events and expense totals
+  async get() {
+    const response = await api.get('/dashboard/');
+    return response.data;
+  },
+};
+
 // Activities API
 export const activitiesAPI = {
   async getAll(petId = null) {